@@ -40,6 +40,7 @@ try:
     from utils.news_sentiment import NewsSentimentAnalyzer
     from utils.ui_components import UIComponents
     from utils.model_info import ModelInfo
+    from utils.engine import get_engine
     from styles.custom_css import get_custom_css
     from config.settings import INDIAN_STOCKS, INDIAN_INDICES, DEFAULT_STOCK
     print("All custom modules imported successfully")
@@ -75,27 +76,42 @@ if 'selected_period' not in st.session_state:
     st.session_state.selected_period = '1y'
 if 'last_update' not in st.session_state:
     st.session_state.last_update = None
-if 'stock_data' not in st.session_state:
-    st.session_state.stock_data = None
 if 'predictions' not in st.session_state:
     st.session_state.predictions = None
 
 
 class StockTrendAI:
+    MODEL_ICONS = {
+        'XGBoost': '🚀',
+        'LSTM': '🧠',
+        'Prophet': '📈',
+        'Ensemble': '🎯',
+        'Transformer': '⚡',
+        'GRU': '🔥',
+        'Stacking': '🏆'
+    }
+    
     def __init__(self):
-        self.data_fetcher = DataFetcher()
-        self.tech_indicators = TechnicalIndicators()
-        self.xgb_predictor = XGBoostPredictor()
-        self.lstm_predictor = LSTMPredictor()
-        self.prophet_predictor = ProphetPredictor()
-        self.ensemble_predictor = EnsemblePredictor()
-        self.transformer_predictor = TransformerPredictor()
-        self.gru_predictor = GRUPredictor()
-        self.stacking_predictor = StackingEnsemblePredictor()
-        self.model_utils = ModelUtils()
+        # Heavy components (data cache, trained models, analytics caches) live in the
+        # process-wide engine so that a rerun does not rebuild or retrain them
+        self.engine = get_engine()
+        self.engine.orchestrator.start()  # Prediction workers boot while the page renders
+        self.data_fetcher = self.engine.data_fetcher
+        self.market_calendar = self.data_fetcher.calendar
+        self.tech_indicators = self.engine.tech_indicators
+        self.xgb_predictor = self.engine.predictors['XGBoost']
+        self.lstm_predictor = self.engine.predictors['LSTM']
+        self.prophet_predictor = self.engine.predictors['Prophet']
+        self.ensemble_predictor = self.engine.predictors['Ensemble']
+        self.transformer_predictor = self.engine.predictors['Transformer']
+        self.gru_predictor = self.engine.predictors['GRU']
+        self.stacking_predictor = self.engine.predictors['Stacking']
+        self.model_utils = self.engine.model_utils
+        self.advanced_analytics = self.engine.advanced_analytics
+        self.news_sentiment = self.engine.news_sentiment
+        
+        # Lightweight, per-session helpers
         self.portfolio_tracker = PortfolioTracker()
-        self.advanced_analytics = AdvancedAnalytics()
-        self.news_sentiment = NewsSentimentAnalyzer()
         self.ui_components = UIComponents()
         self.model_info = ModelInfo()
     
@@ -253,7 +269,6 @@ class StockTrendAI:
         # Update session state if selection changed
         if selected_symbol != st.session_state.get('selected_stock', DEFAULT_STOCK):
             st.session_state.selected_stock = selected_symbol
-            st.session_state.stock_data = None
             st.session_state.predictions = None
         
         # Add new stock feature
@@ -335,7 +350,7 @@ class StockTrendAI:
         
         # Manual refresh button
         if st.sidebar.button("🔄 Refresh Data", type="primary"):
-            st.session_state.stock_data = None
+            self.engine.invalidate(selected_symbol)
             st.session_state.predictions = None
             st.rerun()
         
@@ -388,177 +403,98 @@ class StockTrendAI:
         return selected_symbol, period, use_xgboost, use_lstm, use_prophet, use_ensemble, use_transformer, use_gru, use_stacking, auto_refresh
     
     def load_and_process_data(self, symbol, period):
-        """Load and process stock data with caching"""
-        current_time = time.time()
-        
-        # Check if symbol or period changed - this forces cache refresh
+        """Load and process stock data through the shared engine cache"""
+        # Check if symbol or period changed - this invalidates the session's predictions
         if (st.session_state.selected_stock != symbol or 
             st.session_state.selected_period != period):
-            st.session_state.stock_data = None
             st.session_state.predictions = None
             st.session_state.selected_stock = symbol
             st.session_state.selected_period = period
         
-        # Check if we need to refresh data (cache for 5 minutes)
-        if (st.session_state.stock_data is None or 
-            st.session_state.last_update is None or 
-            current_time - st.session_state.last_update > 300):
-            
-            with st.spinner("🔄 Fetching live stock data..."):
-                try:
-                    # Fetch stock data with reduced timeout and better error handling
-                    stock_data = self.data_fetcher.get_stock_data(symbol, period)
-                    
-                    if stock_data is None or stock_data.empty:
-                        st.error(f"❌ Unable to fetch data for {symbol}. Please check the stock symbol.")
-                        return None
-                    
-                    # Validate data integrity
-                    required_columns = ['Open', 'High', 'Low', 'Close', 'Volume']
-                    missing_columns = [col for col in required_columns if col not in stock_data.columns]
-                    if missing_columns:
-                        st.error(f"❌ Missing required data columns: {missing_columns}")
-                        return None
-                    
-                    # Calculate technical indicators with error handling
-                    try:
-                        stock_data = self.tech_indicators.add_all_indicators(stock_data)
-                    except Exception as tech_error:
-                        st.warning(f"⚠️ Technical indicators calculation failed: {str(tech_error)}")
-                        # Continue with basic data if technical indicators fail
-                    
-                    # Cache the data
-                    st.session_state.stock_data = stock_data
-                    st.session_state.last_update = current_time
-                    
-                except Exception as e:
-                    st.error(f"❌ Error loading data: {str(e)}")
-                    st.info("💡 Try refreshing the page or selecting a different stock symbol.")
+        with st.spinner("🔄 Fetching live stock data..."):
+            try:
+                # The engine caches processed frames for all sessions (5 minute TTL)
+                stock_data = self.engine.get_processed_data(symbol, period)
+                
+                if stock_data is None or stock_data.empty:
+                    st.error(f"❌ Unable to fetch data for {symbol}. Please check the stock symbol.")
+                    return None
+                
+                # Validate data integrity
+                required_columns = ['Open', 'High', 'Low', 'Close', 'Volume']
+                missing_columns = [col for col in required_columns if col not in stock_data.columns]
+                if missing_columns:
+                    st.error(f"❌ Missing required data columns: {missing_columns}")
                     return None
+                
+                st.session_state.last_update = time.time()
+                
+            except Exception as e:
+                st.error(f"❌ Error loading data: {str(e)}")
+                st.info("💡 Try refreshing the page or selecting a different stock symbol.")
+                return None
         
-        return st.session_state.stock_data
+        return stock_data
     
     def get_market_status(self):
         """Get current market status for Indian markets"""
-        from datetime import datetime, time
-        import pytz
-        
-        # Indian timezone
-        ist = pytz.timezone('Asia/Kolkata')
-        now = datetime.now(ist)
-        current_time = now.time()
-        
-        # Indian market hours: 9:15 AM to 3:30 PM IST
-        market_open = time(9, 15)
-        market_close = time(15, 30)
-        
-        # Check if it's a weekday (Monday=0, Sunday=6)
-        if now.weekday() < 5:  # Monday to Friday
-            if market_open <= current_time <= market_close:
-                return "OPEN"
-            else:
-                return "CLOSED"
-        else:
-            return "CLOSED"
+        return self.market_calendar.status()
     
     def get_market_status_detailed(self):
         """Get detailed market status information"""
-        from datetime import datetime, time
-        import pytz
-        
-        # Indian timezone
-        ist = pytz.timezone('Asia/Kolkata')
-        now = datetime.now(ist)
-        current_time = now.time()
-        
-        # Indian market hours: 9:15 AM to 3:30 PM IST
-        market_open = time(9, 15)
-        market_close = time(15, 30)
-        
-        # Format current time
-        current_time_str = now.strftime("%I:%M %p IST")
-        
-        # Determine market status
-        if now.weekday() < 5:  # Monday to Friday
-            if market_open <= current_time <= market_close:
-                status = "OPEN"
-            else:
-                status = "CLOSED"
-        else:
-            status = "CLOSED"
+        now = self.market_calendar.now()
         
         return {
-            "status": status,
-            "current_time": current_time_str,
-            "market_hours": "9:15 AM - 3:30 PM IST"
+            "status": self.market_calendar.status(now),
+            "current_time": now.strftime("%I:%M %p IST"),
+            "market_hours": self.market_calendar.hours_label()
         }
     
     def generate_predictions(self, stock_data, use_xgboost, use_lstm, use_prophet, use_ensemble, use_transformer, use_gru, use_stacking):
         """Generate predictions using selected models"""
-        # Create a unique key based on the data, symbol, and period
-        data_key = f"{st.session_state.selected_stock}_{st.session_state.selected_period}_{len(stock_data)}"
+        # Create a unique key based on the data, symbol, and period; a model finishing
+        # background training changes it too, so fallback predictions get replaced
+        data_key = (f"{st.session_state.selected_stock}_{st.session_state.selected_period}_{len(stock_data)}"
+                    f"_{self.engine.training_queue.generation}")
         
         # Force recalculation if data key changed or predictions are None
         if (st.session_state.predictions is None or 
             getattr(st.session_state, 'last_data_key', None) != data_key):
             
-            predictions = {}
-            
-            if use_xgboost:
-                with st.spinner("🤖 Running XGBoost prediction..."):
-                    try:
-                        xgb_pred = self.xgb_predictor.predict(stock_data)
-                        predictions['XGBoost'] = xgb_pred
-                    except Exception as e:
-                        st.warning(f"XGBoost prediction failed: {str(e)}")
-            
-            if use_lstm:
-                with st.spinner("🧠 Running LSTM prediction..."):
-                    try:
-                        lstm_pred = self.lstm_predictor.predict(stock_data)
-                        predictions['LSTM'] = lstm_pred
-                    except Exception as e:
-                        st.warning(f"LSTM prediction failed: {str(e)}")
-            
-            if use_prophet:
-                with st.spinner("📈 Running Prophet prediction..."):
-                    try:
-                        prophet_pred = self.prophet_predictor.predict(stock_data)
-                        predictions['Prophet'] = prophet_pred
-                    except Exception as e:
-                        st.warning(f"Prophet prediction failed: {str(e)}")
-            
-            if use_ensemble:
-                with st.spinner("🎯 Running Ensemble prediction..."):
-                    try:
-                        ensemble_pred = self.ensemble_predictor.predict(stock_data)
-                        predictions['Ensemble'] = ensemble_pred
-                    except Exception as e:
-                        st.warning(f"Ensemble prediction failed: {str(e)}")
-            
-            if use_transformer:
-                with st.spinner("⚡ Running Transformer prediction..."):
-                    try:
-                        transformer_pred = self.transformer_predictor.predict(stock_data)
-                        predictions['Transformer'] = transformer_pred
-                    except Exception as e:
-                        st.warning(f"Transformer prediction failed: {str(e)}")
-            
-            if use_gru:
-                with st.spinner("🔥 Running GRU prediction..."):
-                    try:
-                        gru_pred = self.gru_predictor.predict(stock_data)
-                        predictions['GRU'] = gru_pred
-                    except Exception as e:
-                        st.warning(f"GRU prediction failed: {str(e)}")
+            selected = {
+                'XGBoost': use_xgboost,
+                'LSTM': use_lstm,
+                'Prophet': use_prophet,
+                'Ensemble': use_ensemble,
+                'Transformer': use_transformer,
+                'GRU': use_gru,
+                'Stacking': use_stacking
+            }
+            model_names = [name for name, use in selected.items() if use]
+            current_price = stock_data['Close'].iloc[-1]
+            results = {}
+            
+            # The models run in parallel worker processes; each card is shown as soon as its model finishes
+            progress = st.empty()
+            if model_names:
+                with progress.container():
+                    st.markdown(f"#### ⏳ Running {len(model_names)} AI models...")
+                    slots = {name: col.empty() for name, col in zip(model_names, st.columns(len(model_names)))}
+                for model_name in model_names:
+                    slots[model_name].info(f"{self.MODEL_ICONS[model_name]} {model_name} running...")
+                
+                for model_name, result, error, _ in self.engine.predict_many(model_names, stock_data):
+                    if error is None and isinstance(result, dict):
+                        results[model_name] = result
+                        slots[model_name].markdown(self.prediction_card_html(model_name, result, current_price),
+                                                   unsafe_allow_html=True)
+                    else:
+                        slots[model_name].empty()
+                        st.warning(f"{model_name} prediction failed: {error or 'no result'}")
+            progress.empty()
             
-            if use_stacking:
-                with st.spinner("🏆 Running Stacking Ensemble prediction..."):
-                    try:
-                        stacking_pred = self.stacking_predictor.predict(stock_data)
-                        predictions['Stacking'] = stacking_pred
-                    except Exception as e:
-                        st.warning(f"Stacking Ensemble prediction failed: {str(e)}")
+            # Keep the sidebar's model order regardless of which model finished first
+            predictions = {name: results[name] for name in model_names if name in results}
             
             st.session_state.predictions = predictions
             st.session_state.last_data_key = data_key
@@ -604,10 +540,10 @@ class StockTrendAI:
                     predicted_price = pred_data.get('predicted_price', current_price)
                     
                     # Validate numeric values
-                    if not isinstance(confidence, (int, float)) or confidence < 0 or confidence > 100:
+                    if not isinstance(confidence, (int, float, np.number)) or confidence < 0 or confidence > 100:
                         confidence = 50  # Default confidence
                     
-                    if not isinstance(predicted_price, (int, float)) or predicted_price <= 0:
+                    if not isinstance(predicted_price, (int, float, np.number)) or predicted_price <= 0:
                         predicted_price = current_price
                     
                     if direction not in ['UP', 'DOWN', 'HOLD']:
@@ -831,57 +767,51 @@ class StockTrendAI:
         
         for i, (model_name, pred_data) in enumerate(predictions.items()):
             with cols[i]:
-                direction = pred_data['direction']
-                confidence = pred_data['confidence']
-                predicted_price = pred_data.get('predicted_price', current_price)
-                
-                # Determine colors and icons
-                if direction == 'UP':
-                    color_class = "prediction-card-up"
-                    arrow = "⬆️"
-                else:
-                    color_class = "prediction-card-down"
-                    arrow = "⬇️"
-                
-                # Model-specific icons
-                model_icons = {
-                    'XGBoost': '🚀',
-                    'LSTM': '🧠',
-                    'Prophet': '📈',
-                    'Ensemble': '🎯',
-                    'Transformer': '⚡',
-                    'GRU': '🔥',
-                    'Stacking': '🏆'
-                }
-                icon = model_icons.get(model_name, '🤖')
-                
-                # Calculate price change
-                price_change = predicted_price - current_price
-                change_percent = (price_change / current_price) * 100
-                
-                # Generate confidence indicator
-                confidence_indicator = self.get_confidence_indicator(confidence)
-                confidence_color = self.get_confidence_color(confidence)
-                
-                st.markdown(f"""
-                <div class="prediction-card {color_class}">
-                    <div class="model-name">{icon} {model_name}</div>
-                    <div class="prediction-direction">{arrow} {direction}</div>
-                    <div class="confidence" style="color: {confidence_color}">
-                        {confidence_indicator} Confidence: {confidence:.1f}%
-                        <span class="confidence-bar">
-                            <span class="confidence-fill" style="width: {confidence}%; background-color: {confidence_color}"></span>
-                        </span>
-                    </div>
-                    <div class="price-prediction">
-                        <div class="current-price">Current: ₹{current_price:.2f}</div>
-                        <div class="predicted-price">Predicted: ₹{predicted_price:.2f}</div>
-                        <div class="price-change">
-                            Change: {price_change:+.2f} ({change_percent:+.2f}%)
-                        </div>
-                    </div>
+                st.markdown(self.prediction_card_html(model_name, pred_data, current_price), unsafe_allow_html=True)
+    
+    def prediction_card_html(self, model_name, pred_data, current_price):
+        """HTML of a single model's prediction card"""
+        direction = pred_data['direction']
+        confidence = pred_data['confidence']
+        predicted_price = pred_data.get('predicted_price', current_price)
+        
+        # Determine colors and icons
+        if direction == 'UP':
+            color_class = "prediction-card-up"
+            arrow = "⬆️"
+        else:
+            color_class = "prediction-card-down"
+            arrow = "⬇️"
+        
+        icon = self.MODEL_ICONS.get(model_name, '🤖')
+        
+        # Calculate price change
+        price_change = predicted_price - current_price
+        change_percent = (price_change / current_price) * 100
+        
+        # Generate confidence indicator
+        confidence_indicator = self.get_confidence_indicator(confidence)
+        confidence_color = self.get_confidence_color(confidence)
+        
+        return f"""
+        <div class="prediction-card {color_class}">
+            <div class="model-name">{icon} {model_name}</div>
+            <div class="prediction-direction">{arrow} {direction}</div>
+            <div class="confidence" style="color: {confidence_color}">
+                {confidence_indicator} Confidence: {confidence:.1f}%
+                <span class="confidence-bar">
+                    <span class="confidence-fill" style="width: {confidence}%; background-color: {confidence_color}"></span>
+                </span>
+            </div>
+            <div class="price-prediction">
+                <div class="current-price">Current: ₹{current_price:.2f}</div>
+                <div class="predicted-price">Predicted: ₹{predicted_price:.2f}</div>
+                <div class="price-change">
+                    Change: {price_change:+.2f} ({change_percent:+.2f}%)
                 </div>
-                """, unsafe_allow_html=True)
+            </div>
+        </div>
+        """
     
     def get_confidence_indicator(self, confidence):
         """Get confidence indicator icon and text"""
@@ -1170,6 +1100,9 @@ class StockTrendAI:
                 if predictions:
                     self.render_confidence_meter(predictions)
                 
+                # Models still training for this stock
+                self.render_training_status()
+                
                 # Render stock chart
                 self.render_stock_chart(stock_data, selected_stock)
                 
@@ -1425,8 +1358,18 @@ class StockTrendAI:
                 
                 if st.button("🧹 Clear Cache"):
                     st.cache_data.clear()
+                    self.engine.invalidate()
                     st.success("Cache cleared successfully!")
-                
+
+                with st.expander("📦 Cache Usage"):
+                    for cache_stats in self.engine.cache_stats():
+                        st.markdown(
+                            f"**{cache_stats['name'].title()}:** {cache_stats['entries']} entries, "
+                            f"{cache_stats['bytes'] / 1024 / 1024:.1f} MB, "
+                            f"hit rate {cache_stats['hit_rate']:.0%}, "
+                            f"{cache_stats['evictions']} evictions"
+                        )
+
                 st.markdown("### 📝 App Information")
                 st.markdown("""
                 **Version:** 2.0 - Advanced AI Edition
@@ -1449,6 +1392,30 @@ class StockTrendAI:
                 - Monitor news sentiment
                 """)
     
+    def render_training_status(self):
+        """Show background training jobs and what they mean for the predictions above"""
+        jobs = self.engine.training_queue.status()
+        if not jobs:
+            return
+        
+        active = [job for job in jobs if job['status'] in ('queued', 'running')]
+        title = f"🛠️ Background Training ({len(active)} active)" if active else "🛠️ Background Training"
+        with st.expander(title, expanded=bool(active)):
+            if active:
+                st.info("Models still training show quick fallback predictions. "
+                        "They switch to the trained model on the next refresh after their job is done.")
+            
+            status_icons = {'queued': '⏳', 'running': '⚙️', 'done': '✅', 'failed': '❌'}
+            for job in jobs:
+                if job['status'] == 'done':
+                    detail = f"trained in {job['seconds']:.1f}s"
+                elif job['status'] == 'failed':
+                    detail = job['error']
+                else:
+                    detail = f"{time.time() - job['submitted']:.0f}s since queued"
+                st.markdown(f"{status_icons[job['status']]} **{job['model']}** · {job['symbol']} "
+                            f"({job['interval']}) · {job['status']} - {detail}")
+    
     def render_confidence_meter(self, predictions):
         """Render enhanced confidence meter for predictions"""
         if not predictions:
@@ -1500,7 +1467,8 @@ class StockTrendAI:
         st.info(interpretation)
         
         # Combined prediction analysis
-        current_price = st.session_state.stock_data['Close'].iloc[-1] if st.session_state.stock_data is not None else 100
+        stock_data = self.engine.get_processed_data(st.session_state.selected_stock, st.session_state.selected_period)
+        current_price = stock_data['Close'].iloc[-1] if stock_data is not None and not stock_data.empty else 100
         combined_prediction = self.generate_combined_prediction(predictions, current_price)
         
         if combined_prediction:
@@ -1867,13 +1835,15 @@ class StockTrendAI:
                 st.warning("⚠️ Please select at least 2 stocks to compare.")
                 return
             
-            # Get data for all selected stocks
+            # Get data for all selected stocks (fetched in parallel, then served from cache)
             comparison_data = {}
             failed_stocks = []
+            self.data_fetcher.fetch_parallel(compare_stocks, '6mo')
             
             for stock in compare_stocks:
                 try:
-                    data = self.load_and_process_data(stock, '6mo')
+                    # Read straight from the engine so the session's selection is left untouched
+                    data = self.engine.get_processed_data(stock, '6mo')
                     if data is not None and not data.empty and 'Close' in data.columns:
                         comparison_data[stock] = data['Close']
                     else:
@@ -2074,7 +2044,13 @@ class StockTrendAI:
             
             # Calculate technical indicators with error handling
             try:
-                chart_data = self.tech_indicators.add_all_indicators(stock_data.copy())
+                if 'RSI' in stock_data.columns and 'MACD' in stock_data.columns:
+                    # Engine data already carries the (incrementally maintained) indicators
+                    chart_data = stock_data.copy()
+                else:
+                    # Only the overlays and panels drawn below
+                    chart_data = self.tech_indicators.add_indicators(
+                        stock_data, ['SMA_20', 'SMA_50', 'BB_Upper', 'BB_Lower', 'RSI', 'MACD'])
             except Exception as tech_error:
                 st.warning(f"⚠️ Technical indicators calculation issue: {str(tech_error)}")
                 # Fallback to basic chart with just price data
@@ -2402,7 +2378,7 @@ if __name__ == "__main__":
                     # Run selected models
                     if use_xgboost:
                         try:
-                            xgb_pred = app.xgb_predictor.predict(stock_data)
+                            xgb_pred = app.engine.predict('XGBoost', stock_data)
                             if xgb_pred:
                                 predictions['XGBoost'] = xgb_pred
                         except Exception as e:
@@ -2410,7 +2386,7 @@ if __name__ == "__main__":
                     
                     if use_lstm:
                         try:
-                            lstm_pred = app.lstm_predictor.predict(stock_data)
+                            lstm_pred = app.engine.predict('LSTM', stock_data)
                             if lstm_pred:
                                 predictions['LSTM'] = lstm_pred
                         except Exception as e:
@@ -2418,7 +2394,7 @@ if __name__ == "__main__":
                     
                     if use_prophet:
                         try:
-                            prophet_pred = app.prophet_predictor.predict(stock_data)
+                            prophet_pred = app.engine.predict('Prophet', stock_data)
                             if prophet_pred:
                                 predictions['Prophet'] = prophet_pred
                         except Exception as e:
@@ -2426,7 +2402,7 @@ if __name__ == "__main__":
                     
                     if use_ensemble:
                         try:
-                            ensemble_pred = app.ensemble_predictor.predict(stock_data)
+                            ensemble_pred = app.engine.predict('Ensemble', stock_data)
                             if ensemble_pred:
                                 predictions['Ensemble'] = ensemble_pred
                         except Exception as e:
@@ -2434,7 +2410,7 @@ if __name__ == "__main__":
                     
                     if use_transformer:
                         try:
-                            transformer_pred = app.transformer_predictor.predict(stock_data)
+                            transformer_pred = app.engine.predict('Transformer', stock_data)
                             if transformer_pred:
                                 predictions['Transformer'] = transformer_pred
                         except Exception as e:
@@ -2442,7 +2418,7 @@ if __name__ == "__main__":
                     
                     if use_gru:
                         try:
-                            gru_pred = app.gru_predictor.predict(stock_data)
+                            gru_pred = app.engine.predict('GRU', stock_data)
                             if gru_pred:
                                 predictions['GRU'] = gru_pred
                         except Exception as e:
@@ -2450,7 +2426,7 @@ if __name__ == "__main__":
                     
                     if use_stacking:
                         try:
-                            stacking_pred = app.stacking_predictor.predict(stock_data)
+                            stacking_pred = app.engine.predict('Stacking', stock_data)
                             if stacking_pred:
                                 predictions['Stacking'] = stacking_pred
                         except Exception as e:
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for StockTrendAI
+Times data fetching, technical indicators and model predictions on
+deterministic synthetic market data - no network access needed
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+warnings.filterwarnings('ignore')
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.data_fetcher import DataFetcher
+from utils.data_providers import SyntheticProvider
+from utils.technical_indicators import TechnicalIndicators, to_panel
+
+
+def timed(label, func, *args, **kwargs):
+    """Run func once and print how long it took"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<45} {elapsed * 1000:>10.1f} ms")
+    return result
+
+
+def benchmark_data(fetcher, symbols):
+    print(f"\n📥 Data fetching ({symbols} symbols)")
+    universe = [f"SYN{i:04d}" for i in range(symbols)]
+    timed("get_many 1y daily (cold)", fetcher.get_many, universe, '1y')
+    universe_data = timed("get_many 1y daily (cached)", fetcher.get_many, universe, '1y')
+    timed("get_stock_data 5d intraday (cold)", fetcher.get_stock_data, universe[0], '5d')
+    timed("get_stock_data 1d intraday (derived)", fetcher.get_stock_data, universe[0], '1d')
+    return universe_data
+
+
+def benchmark_panel(universe_data):
+    print(f"\n🧮 Universe indicators ({len(universe_data)} symbols)")
+    indicators = TechnicalIndicators()
+    panel = timed("to_panel", to_panel, universe_data)
+    timed("add_panel_indicators (one pass)", indicators.add_panel_indicators, panel)
+    sample = list(universe_data)[:max(1, len(universe_data) // 10)]
+    start = time.perf_counter()
+    for symbol in sample:
+        indicators.add_all_indicators(universe_data[symbol])
+    per_symbol = (time.perf_counter() - start) / len(sample)
+    print(f"  {'add_all_indicators loop (extrapolated)':<45} {per_symbol * len(universe_data) * 1000:>10.1f} ms")
+
+
+def benchmark_indicators(fetcher, bars, backends):
+    print(f"\n📊 Technical indicators ({bars} bars)")
+    data = fetcher.get_stock_data('SYNTHETIC', 'max')
+    for backend in backends:
+        indicators = TechnicalIndicators(backend)
+        indicators.add_all_indicators(data.iloc[:100])  # Compile/warm the kernels first
+        timed(f"add_all_indicators [{indicators.backend}]", indicators.add_all_indicators, data)
+    return TechnicalIndicators().add_all_indicators(data)
+
+
+def benchmark_models(data, models):
+    print(f"\n🤖 Model predictions ({len(data)} bars)")
+    from utils.engine import StockTrendEngine
+    from utils.model_registry import ModelRegistry
+
+    # Train in the foreground into a throwaway registry: the background queue would answer
+    # with fallbacks and write synthetic models into the real models/ directory
+    with tempfile.TemporaryDirectory() as registry_root:
+        engine = StockTrendEngine()
+        engine.model_registry = ModelRegistry(root=registry_root)
+        engine.training_queue.enabled = False
+        try:
+            for name in models:
+                try:
+                    timed(f"{name} predict (train + predict)", engine.predict, name, data)
+                    timed(f"{name} predict (registered model)", engine.predict, name, data)
+                except Exception as e:
+                    print(f"  {name} failed: {e}")
+        finally:
+            engine.orchestrator.shutdown()
+            engine.training_queue.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark StockTrendAI on synthetic data")
+    parser.add_argument('--bars', type=int, default=10000, help="Daily bars per symbol")
+    parser.add_argument('--symbols', type=int, default=2000, help="Symbols for the batch fetch benchmark")
+    parser.add_argument('--models', nargs='*', default=['XGBoost', 'Ensemble', 'Stacking'],
+                        help="Models to benchmark (engine predictor names)")
+    parser.add_argument('--backends', nargs='*', default=['auto', 'numpy', 'pandas'],
+                        help="Indicator kernel backends to compare")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    # Pin the end date so every run sees identical bars
+    provider = SyntheticProvider(seed=args.seed, history_bars=args.bars, end='2024-12-31')
+    fetcher = DataFetcher(provider=provider)
+
+    print("=" * 60)
+    print("⏱️  STOCKTRENDAI BENCHMARK (synthetic data)")
+    print("=" * 60)
+
+    universe_data = benchmark_data(fetcher, args.symbols)
+    benchmark_panel(universe_data)
+    data = benchmark_indicators(fetcher, args.bars, args.backends)
+    if args.models:
+        benchmark_models(data, args.models)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Nightly feature builder for StockTrendAI
+Reads OHLCV history from the local Parquet store and writes the model
+feature matrices to memory-mappable .npy partitions, appending only the
+bars added since the last run. Run it after market close.
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+warnings.filterwarnings('ignore')
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config.settings import INDIAN_STOCKS
+from utils.data_fetcher import DataFetcher
+from utils.feature_partitions import FeaturePartitions
+from utils.feature_store import FeatureStore
+from utils.ohlcv_store import OHLCVStore
+
+
+def build(symbols, interval='1d', rebuild=False, fetch=False, ohlcv_root=None, feature_root=None):
+    """Update the feature partitions of every symbol; returns {symbol: rows written or None}"""
+    store = OHLCVStore(root=ohlcv_root)
+    fetcher = DataFetcher()
+    if fetcher.store.enabled:
+        fetcher.store = store  # --fetch must top up the store this build reads
+    features = FeatureStore()
+    features.partitions = FeaturePartitions(root=feature_root)
+    results = {}
+
+    for symbol in symbols:
+        yf_symbol = fetcher._normalize_symbol(symbol)
+        if fetch:
+            fetcher.get_stock_data(symbol, 'max', interval)  # Tops up the OHLCV store with new bars
+        data, _ = store.read(yf_symbol, interval)
+        if data is None or data.empty:
+            print(f"  {symbol:<15} no local OHLCV data - skipped")
+            results[symbol] = None
+            continue
+        try:
+            start = time.perf_counter()
+            rows = features.persist(yf_symbol, data, interval, rebuild=rebuild)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"  {symbol:<15} {rows:>6} new rows of {len(data):>6} bars  {elapsed:>8.1f} ms")
+            results[symbol] = rows
+        except Exception as e:
+            print(f"  {symbol:<15} failed: {str(e)}")
+            results[symbol] = None
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the on-disk feature store from local OHLCV data")
+    parser.add_argument('--symbols', nargs='*', default=list(INDIAN_STOCKS),
+                        help="Symbols to build (default: every INDIAN_STOCKS symbol)")
+    parser.add_argument('--interval', default='1d', help="Bar interval of the OHLCV partitions to read")
+    parser.add_argument('--rebuild', action='store_true', help="Rewrite partitions instead of appending")
+    parser.add_argument('--fetch', action='store_true', help="Download new bars into the OHLCV store first")
+    parser.add_argument('--ohlcv-root', default=None, help="OHLCV store directory (default from DATA_CONFIG)")
+    parser.add_argument('--feature-root', default=None, help="Feature store directory (default from DATA_CONFIG)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"🧱 FEATURE STORE BUILD ({len(args.symbols)} symbols, {args.interval})")
+    print("=" * 60)
+
+    results = build(args.symbols, args.interval, args.rebuild, args.fetch, args.ohlcv_root, args.feature_root)
+    failed = [symbol for symbol, rows in results.items() if rows is None]
+    print(f"\n✅ {len(results) - len(failed)} symbols up to date, {len(failed)} skipped or failed")
+    return 1 if failed and len(failed) == len(results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -72,10 +72,16 @@ DEFAULT_STOCK = 'RELIANCE'
 # Model Configuration
 MODEL_CONFIG = {
     'xgboost': {
-        'n_estimators': 100,
-        'max_depth': 10,
-        'min_samples_split': 5,
-        'min_samples_leaf': 2,
+        'n_estimators': 400,  # Upper bound on boosting rounds; early stopping picks the count
+        'max_depth': 4,
+        'learning_rate': 0.05,
+        'subsample': 0.8,
+        'colsample_bytree': 0.8,
+        'min_child_weight': 5,
+        'tree_method': 'hist',
+        'max_bin': 256,
+        'early_stopping_rounds': 30,
+        'validation_fraction': 0.2,  # Most recent bars, held out for early stopping
         'random_state': 42
     },
     'lstm': {
@@ -103,7 +109,10 @@ TECHNICAL_INDICATORS = {
     'volatility_period': 20,
     'momentum_period': 10,
     'roc_period': 12,
-    'cci_period': 20
+    'cci_period': 20,
+    'volume_sma_period': 20,
+    'streaming_max_bars': 500,  # Longer gaps are recomputed in batch instead of streamed
+    'kernel_backend': 'auto'  # Rolling kernels: auto | numba | numpy | pandas (reference)
 }
 
 # Data Configuration
@@ -115,6 +124,34 @@ DATA_CONFIG = {
     'realtime_cache_duration': 60,  # 1 minute cache for real-time data
     'max_retries': 3,
     'timeout': 30,
+    'download_batch_size': 25,  # Tickers per batched yfinance download
+    'intraday_base': {
+        'period': '5d',  # Finest bars are fetched once per symbol over this window...
+        'interval': '5m'  # ...and coarser intraday intervals are resampled locally
+    },
+    'provider': {
+        'name': 'yfinance',  # yfinance | record | replay | synthetic (env: STOCKTRENDAI_DATA_PROVIDER)
+        'replay_path': 'data/replay',  # Responses captured by the 'record' provider
+        'synthetic': {
+            'seed': 42,
+            'history_bars': 2520,  # ~10 years of daily bars per symbol
+            'intraday_sessions': 60  # Sessions of intraday bars per symbol
+        }
+    },
+    'ohlcv_store': {
+        'enabled': True,
+        'path': 'data/ohlcv'  # Parquet partitions: interval=<interval>/symbol=<symbol>/
+    },
+    'feature_store': {
+        'enabled': True,
+        'path': 'data/features',  # .npy partitions: version=<version>/interval=<interval>/symbol=<symbol>/
+        'max_parts': 8  # Appended parts per partition before they are compacted into one
+    },
+    'compact_schema': {
+        'enabled': True,  # float32 prices/indicators, int8 flags, int32 volume in cached indicator frames
+        'copy_on_write': True,  # pandas copy-on-write, so copies between pipeline stages are lazy
+        'drop_columns': ['Dividends', 'Stock Splits', 'Capital Gains']  # Never read by the app
+    },
     'period_intervals': {
         '5m': '1m',
         '15m': '5m', 
@@ -133,6 +170,38 @@ DATA_CONFIG = {
     }
 }
 
+# In-memory cache budgets (bytes are measured with DataFrame.memory_usage(deep=True))
+CACHE_CONFIG = {
+    'data': {
+        'max_bytes': 256 * 1024 * 1024,  # Raw OHLCV frames in DataFetcher
+        'max_entries': 500
+    },
+    'processed': {
+        'max_bytes': 512 * 1024 * 1024,  # OHLCV + indicator frames shared by the engine
+        'max_entries': 200
+    },
+    'indicator_streams': {
+        'max_bytes': 512 * 1024 * 1024,  # Streaming indicator state and the frame it extends
+        'max_entries': 200
+    },
+    'feature_store': {
+        'max_bytes': 256 * 1024 * 1024,  # float32 feature matrices shared by the predictors
+        'max_entries': 200
+    },
+    'indicator_memo': {
+        'max_bytes': 256 * 1024 * 1024,  # Indicator frames/blocks keyed by the content of their input
+        'max_entries': 500
+    },
+    'news': {
+        'max_bytes': 32 * 1024 * 1024,
+        'max_entries': 500
+    },
+    'analysis': {
+        'max_bytes': 128 * 1024 * 1024,
+        'max_entries': 100
+    }
+}
+
 # UI Configuration
 UI_CONFIG = {
     'auto_refresh_interval': 30,  # seconds
@@ -150,7 +219,8 @@ MARKET_CONFIG = {
     },
     'timezone': 'Asia/Kolkata',
     'market_days': ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday'],
-    'holidays': []  # Can be populated with Indian market holidays
+    'holidays': [],  # Can be populated with Indian market holidays ('YYYY-MM-DD')
+    'post_close_grace_minutes': 15  # Keep live cache TTLs while closing bars settle
 }
 
 # Risk Management
@@ -171,7 +241,17 @@ API_CONFIG = {
     },
     'rate_limits': {
         'requests_per_minute': 60,
-        'requests_per_hour': 1000
+        'requests_per_hour': 1000,
+        'max_wait': 30  # seconds to wait for a token before giving up
+    },
+    'executor': {
+        'max_workers': 8,
+        'backoff_base': 0.5,  # seconds, doubled per retry with full jitter
+        'backoff_max': 8,
+        'circuit_breaker': {
+            'failure_threshold': 5,
+            'reset_timeout': 60  # seconds before a half-open probe
+        }
     }
 }
 
@@ -215,7 +295,27 @@ PREDICTION_CONFIG = {
         'volume_factor': 1.1
     },
     'prediction_horizon': 1,  # Days
-    'update_frequency': 'daily'
+    'update_frequency': 'daily',
+    'parallel': {
+        'enabled': True,
+        'max_workers': None,  # None = one per model, capped at the CPU count
+        'start_method': 'spawn',  # Fresh interpreters; forking a process that holds TF/XGBoost threads is unsafe
+        'default_timeout': 120,  # seconds
+        'timeouts': {  # seconds, including a first-use training run
+            'XGBoost': 60,
+            'LSTM': 180,
+            'Prophet': 120,
+            'Ensemble': 120,
+            'Transformer': 180,
+            'GRU': 180,
+            'Stacking': 180
+        }
+    },
+    'background_training': {
+        'enabled': True,  # Cold symbols get fallback predictions while their models train
+        'max_workers': 1,  # Training processes, separate from the prediction workers
+        'retry_after': 3600  # seconds before a failed training job is tried again
+    }
 }
 
 # Backtesting Configuration
@@ -242,5 +342,20 @@ MODEL_PERSISTENCE = {
     'max_model_age': 30,  # days
     'backup_models': True,
     'compression': True,
-    'encryption': False
+    'encryption': False,
+    'registry_path': 'models/registry',  # <model>/<symbol>/<interval>/<schema>/<cutoff>/
+    'max_loaded_models': 32,  # Deserialized predictors kept in memory
+    'keep_cutoffs': 5,  # Latest training cutoffs kept on disk per model, symbol, interval and schema
+    'incremental': {  # Catching registered models up with new bars (max_model_age forces a full refit)
+        'enabled': True,  # False = every catch-up is a full refit
+        # New bars before a catch-up, per bar interval (1 otherwise): about half an hour of intraday bars
+        'min_new_bars': {'1m': 30, '2m': 15, '5m': 6, '15m': 2},
+        # Days since the last full fit that force a refit for short bars (max_model_age otherwise)
+        'max_model_age': {'1m': 5, '2m': 5, '5m': 10, '15m': 15, '30m': 20},
+        'window': 250,  # Most recent bars a warm start trains on
+        'boost_rounds': 20,  # Extra boosting rounds per update (XGBoost/LightGBM)
+        'fine_tune_epochs': 3,  # Keras epochs per update
+        'max_updates': 20,  # Consecutive updates before a full refit
+        'drift_threshold': 1.5  # Full refit when return volatility moves by this factor either way
+    }
 }
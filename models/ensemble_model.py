@@ -4,6 +4,8 @@ from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from utils.feature_store import FEATURE_STORE
+
 try:
     from sklearn.ensemble import VotingClassifier, VotingRegressor
     from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
@@ -19,65 +21,26 @@ except ImportError:
 class EnsemblePredictor:
     """Ensemble model combining multiple ML algorithms for robust predictions"""
     
+    # Technical indicator columns this model reads (computed on demand by the engine)
+    required_indicators = ['SMA_20', 'SMA_50', 'RSI', 'MACD', 'MACD_Signal']
+    # Feature store groups the model trains on
+    feature_groups = ['ohlcv', 'indicators', 'returns', 'ratios', 'moving_averages', 'volatility', 'momentum',
+                      'extremes']
+    
     def __init__(self):
         self.classification_ensemble = None
         self.regression_ensemble = None
         self.scaler = StandardScaler()
         self.sklearn_available = SKLEARN_AVAILABLE
         self.feature_columns = []
+    
+    @property
+    def is_trained(self):
+        return self.classification_ensemble is not None and self.regression_ensemble is not None
         
     def prepare_features(self, data):
-        """Prepare comprehensive feature set"""
-        features = pd.DataFrame(index=data.index)
-        
-        # Price-based features
-        features['open'] = data['Open']
-        features['high'] = data['High']
-        features['low'] = data['Low']
-        features['volume'] = data['Volume']
-        features['close'] = data['Close']
-        
-        # Technical indicators
-        if 'SMA_20' in data.columns:
-            features['sma_20'] = data['SMA_20']
-        if 'SMA_50' in data.columns:
-            features['sma_50'] = data['SMA_50']
-        if 'RSI' in data.columns:
-            features['rsi'] = data['RSI']
-        if 'MACD' in data.columns:
-            features['macd'] = data['MACD']
-        if 'MACD_Signal' in data.columns:
-            features['macd_signal'] = data['MACD_Signal']
-        
-        # Derived features
-        features['price_change'] = data['Close'].pct_change()
-        features['volume_change'] = data['Volume'].pct_change()
-        features['high_low_ratio'] = data['High'] / data['Low']
-        features['close_open_ratio'] = data['Close'] / data['Open']
-        
-        # Moving averages of ratios
-        features['ma5_close'] = data['Close'].rolling(5).mean()
-        features['ma10_close'] = data['Close'].rolling(10).mean()
-        features['ma20_close'] = data['Close'].rolling(20).mean()
-        
-        # Volatility measures
-        features['volatility_5'] = data['Close'].rolling(5).std()
-        features['volatility_20'] = data['Close'].rolling(20).std()
-        
-        # Price position relative to recent highs/lows
-        features['price_vs_5day_high'] = data['Close'] / data['High'].rolling(5).max()
-        features['price_vs_5day_low'] = data['Close'] / data['Low'].rolling(5).min()
-        features['price_vs_20day_high'] = data['Close'] / data['High'].rolling(20).max()
-        features['price_vs_20day_low'] = data['Close'] / data['Low'].rolling(20).min()
-        
-        # Momentum indicators
-        features['momentum_5'] = data['Close'] / data['Close'].shift(5)
-        features['momentum_10'] = data['Close'] / data['Close'].shift(10)
-        
-        # Volume indicators
-        features['volume_ma_ratio'] = data['Volume'] / data['Volume'].rolling(20).mean()
-        
-        return features.fillna(0)
+        """Prepare comprehensive feature set (a view of the shared feature store)"""
+        return FEATURE_STORE.get(data).group_frame(self.feature_groups).fillna(0)
     
     def create_targets(self, data):
         """Create both classification and regression targets"""
@@ -140,8 +103,8 @@ class EnsemblePredictor:
                 return None
             
             # Prepare features and targets
-            features = self.prepare_features(data.copy())
-            clf_target, reg_target = self.create_targets(data.copy())
+            features = self.prepare_features(data)
+            clf_target, reg_target = self.create_targets(data)
             
             # Remove rows with NaN targets and infinity values
             # Clean features first
@@ -189,6 +152,10 @@ class EnsemblePredictor:
             print(f"Ensemble training error: {str(e)}")
             return None
     
+    def fallback_prediction(self, data):
+        """Technical-score prediction served until the ensembles have trained"""
+        return self.advanced_technical_prediction(data)
+    
     def advanced_technical_prediction(self, data):
         """Advanced technical analysis based prediction"""
         current_price = data['Close'].iloc[-1]
@@ -274,12 +241,12 @@ class EnsemblePredictor:
             # Train models if not available
             if self.classification_ensemble is None or self.regression_ensemble is None:
                 print("Training new ensemble models...")
-                result = self.train(data.copy())
+                result = self.train(data)
                 if result is None:
                     return self.advanced_technical_prediction(data)
             
             # Prepare features for latest data point
-            features = self.prepare_features(data.copy())
+            features = self.prepare_features(data)
             latest_features = features.iloc[-1:][self.feature_columns]
             
             # Scale features
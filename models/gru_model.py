@@ -14,7 +14,14 @@ except ImportError:
 import warnings
 warnings.filterwarnings('ignore')
 
+from utils.model_registry import keras_to_bytes, keras_from_bytes
+from utils.sequences import make_sequences, sequence_batches, fine_tune
+from utils.retraining import INCREMENTAL_CONFIG
+
 class GRUPredictor:
+    # Technical indicator columns this model reads (computed on demand by the engine)
+    required_indicators = []
+    
     def __init__(self):
         """Initialize GRU predictor with optimized parameters"""
         self.model = None
@@ -22,20 +29,22 @@ class GRUPredictor:
         self.sequence_length = 60
         self.is_trained = False
         self.feature_columns = ['Close', 'Volume', 'High', 'Low', 'Open']
+    
+    def __getstate__(self):
+        # The model registry pickles predictors; Keras models go through their .keras format
+        state = self.__dict__.copy()
+        state['model'] = keras_to_bytes(self.model)
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.model = keras_from_bytes(state['model'], tf.keras.models.load_model) if TENSORFLOW_AVAILABLE else None
         
     def create_sequences(self, data, target_col='Close'):
-        """Create sequences for GRU training"""
-        sequences = []
-        targets = []
-        
-        for i in range(self.sequence_length, len(data)):
-            # Use multiple features for better prediction
-            sequence = data[i-self.sequence_length:i]
-            target = data[i, data.columns.get_loc(target_col)]
-            sequences.append(sequence)
-            targets.append(target)
-            
-        return np.array(sequences), np.array(targets)
+        """Create sequences for GRU training (X is a window view of the feature array)"""
+        # Use multiple features for better prediction
+        values = data.to_numpy()
+        return make_sequences(values, values[:, data.columns.get_loc(target_col)], self.sequence_length)
     
     def build_model(self, input_shape):
         """Build optimized GRU model architecture"""
@@ -67,23 +76,26 @@ class GRUPredictor:
         
         return model
     
-    def prepare_data(self, data):
-        """Prepare data for GRU training"""
+    def prepare_data(self, data, fit_scaler=True):
+        """Prepare data for GRU training (fit_scaler=False reuses the fitted scaler)"""
         # Select and prepare features
         if all(col in data.columns for col in self.feature_columns):
-            features = data[self.feature_columns].copy()
+            features = data[self.feature_columns]
         else:
             # Fallback to available columns
             available_cols = [col for col in self.feature_columns if col in data.columns]
             if not available_cols:
                 available_cols = ['Close']
-            features = data[available_cols].copy()
+            features = data[available_cols]
         
         # Handle missing values
-        features = features.fillna(method='ffill').fillna(method='bfill')
+        features = features.ffill().bfill()
         
         # Scale the features
-        scaled_features = self.scaler.fit_transform(features)
+        if fit_scaler:
+            scaled_features = self.scaler.fit_transform(features)
+        else:
+            scaled_features = self.scaler.transform(features)
         scaled_df = pd.DataFrame(scaled_features, columns=features.columns, index=features.index)
         
         return scaled_df
@@ -117,12 +129,14 @@ class GRUPredictor:
                 min_lr=1e-7
             )
             
-            # Train model
+            # Hold out the last windows for validation, as validation_split would
+            train_size = int(len(X) * (1 - validation_split))
+            
+            # Train model on batches gathered from the window views
             history = self.model.fit(
-                X, y,
+                sequence_batches(X[:train_size], y[:train_size], batch_size=batch_size, shuffle=True),
                 epochs=epochs,
-                batch_size=batch_size,
-                validation_split=validation_split,
+                validation_data=sequence_batches(X[train_size:], y[train_size:], batch_size=batch_size),
                 callbacks=[early_stopping, lr_reduction],
                 verbose=0
             )
@@ -134,6 +148,20 @@ class GRUPredictor:
             print(f"Training error: {str(e)}")
             return None
     
+    def update(self, data):
+        """Fine-tune the trained GRU for a few epochs on the latest windows"""
+        try:
+            if not TENSORFLOW_AVAILABLE or not self.is_trained:
+                return None
+            
+            # Keep the training scale: refitting it would shift the inputs the weights were learnt on
+            X, y = self.create_sequences(self.prepare_data(data, fit_scaler=False))
+            return fine_tune(self.model, X, y, INCREMENTAL_CONFIG['fine_tune_epochs'], INCREMENTAL_CONFIG['window'])
+            
+        except Exception as e:
+            print(f"GRU update error: {str(e)}")
+            return None
+    
     def predict(self, data):
         """Generate prediction using GRU model"""
         try:
@@ -156,8 +184,8 @@ class GRUPredictor:
                 # Fallback to simple prediction
                 return self._simple_prediction(data)
             
-            # Prepare data for prediction
-            prepared_data = self.prepare_data(data)
+            # Prepare data for prediction with the scaler fitted in training
+            prepared_data = self.prepare_data(data, fit_scaler=False)
             
             # Get last sequence
             last_sequence = prepared_data.iloc[-self.sequence_length:].values
@@ -190,6 +218,10 @@ class GRUPredictor:
             print(f"GRU prediction error: {str(e)}")
             return self._simple_prediction(data)
     
+    def fallback_prediction(self, data):
+        """Moving-average prediction served until the GRU has trained"""
+        return self._simple_prediction(data)
+    
     def _simple_prediction(self, data):
         """Simple fallback prediction method"""
         try:
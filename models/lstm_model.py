@@ -2,11 +2,13 @@ import pandas as pd
 import numpy as np
 from sklearn.preprocessing import MinMaxScaler
 from sklearn.metrics import mean_squared_error
-import pickle
-import os
 import warnings
 warnings.filterwarnings('ignore')
 
+from utils.model_registry import keras_to_bytes, keras_from_bytes
+from utils.sequences import make_sequences, sequence_batches, fine_tune
+from utils.retraining import INCREMENTAL_CONFIG
+
 try:
     import os
     os.environ['KERAS_BACKEND'] = 'jax'
@@ -22,19 +24,34 @@ except ImportError as e:
 class LSTMPredictor:
     """LSTM-based stock prediction model for deep learning analysis"""
     
+    # Technical indicator columns this model reads (computed on demand by the engine)
+    required_indicators = ['SMA_20', 'RSI', 'MACD']
+    
     def __init__(self, sequence_length=60):
         self.model = None
         self.scaler = MinMaxScaler(feature_range=(0, 1))
         self.sequence_length = sequence_length
-        self.model_path = 'models/lstm_model.h5'
-        self.scaler_path = 'models/lstm_scaler.pkl'
         self.tensorflow_available = TENSORFLOW_AVAILABLE
         
         if not self.tensorflow_available:
             print("TensorFlow not available, using simplified LSTM alternative")
     
-    def prepare_lstm_data(self, data):
-        """Prepare data for LSTM training"""
+    @property
+    def is_trained(self):
+        return self.model is not None
+    
+    def __getstate__(self):
+        # The model registry pickles predictors; Keras models go through their .keras format
+        state = self.__dict__.copy()
+        state['model'] = keras_to_bytes(self.model)
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.model = keras_from_bytes(state['model'], keras.models.load_model) if TENSORFLOW_AVAILABLE else None
+    
+    def prepare_lstm_data(self, data, fit_scaler=True):
+        """Prepare data for LSTM training (fit_scaler=False reuses the fitted scaler)"""
         # Use multiple features for LSTM
         feature_columns = ['Close', 'Volume', 'High', 'Low', 'Open']
         if 'SMA_20' in data.columns:
@@ -49,17 +66,16 @@ class LSTMPredictor:
         feature_data = data[available_features].ffill().bfill()
         
         # Scale the data
-        scaled_data = self.scaler.fit_transform(feature_data)
+        if fit_scaler:
+            scaled_data = self.scaler.fit_transform(feature_data)
+        else:
+            scaled_data = self.scaler.transform(feature_data)
         
         return scaled_data, available_features
     
     def create_sequences(self, data, target_column_index=0):
-        """Create sequences for LSTM training"""
-        X, y = [], []
-        for i in range(self.sequence_length, len(data)):
-            X.append(data[i-self.sequence_length:i])
-            y.append(data[i, target_column_index])  # Predict close price
-        return np.array(X), np.array(y)
+        """Create sequences for LSTM training (X is a window view of data)"""
+        return make_sequences(data, data[:, target_column_index], self.sequence_length)  # Predict close price
     
     def build_lstm_model(self, input_shape):
         """Build LSTM model architecture"""
@@ -88,7 +104,7 @@ class LSTMPredictor:
                 return None
             
             # Prepare data
-            scaled_data, feature_columns = self.prepare_lstm_data(data.copy())
+            scaled_data, feature_columns = self.prepare_lstm_data(data)
             
             if len(scaled_data) < self.sequence_length + 50:
                 raise ValueError("Insufficient data for LSTM training")
@@ -109,48 +125,47 @@ class LSTMPredictor:
                 monitor='val_loss', patience=10, restore_best_weights=True
             )
             
+            # Batches are gathered from the window views one at a time
             history = self.model.fit(
-                X_train, y_train,
-                batch_size=32,
+                sequence_batches(X_train, y_train, batch_size=32, shuffle=True),
                 epochs=50,
-                validation_data=(X_test, y_test),
+                validation_data=sequence_batches(X_test, y_test, batch_size=32),
                 callbacks=[early_stopping],
                 verbose=0
             )
             
             # Evaluate model
-            train_pred = self.model.predict(X_train)
-            test_pred = self.model.predict(X_test)
+            train_pred = self.model.predict(sequence_batches(X_train, y_train), verbose=0)
+            test_pred = self.model.predict(sequence_batches(X_test, y_test), verbose=0)
             
             train_rmse = np.sqrt(mean_squared_error(y_train, train_pred))
             test_rmse = np.sqrt(mean_squared_error(y_test, test_pred))
             
-            # Save model and scaler
-            os.makedirs('models', exist_ok=True)
-            self.model.save(self.model_path)
-            with open(self.scaler_path, 'wb') as f:
-                pickle.dump(self.scaler, f)
-            
+            # Persisted per symbol by the engine's model registry
             return {'train_rmse': train_rmse, 'test_rmse': test_rmse}
             
         except Exception as e:
             print(f"LSTM training error: {str(e)}")
             return None
     
-    def load_model(self):
-        """Load saved LSTM model and scaler"""
+    def update(self, data):
+        """Fine-tune the trained network on the most recent windows (warm start)"""
         try:
-            if not self.tensorflow_available:
-                return False
-                
-            if os.path.exists(self.model_path) and os.path.exists(self.scaler_path):
-                self.model = keras.models.load_model(self.model_path)
-                with open(self.scaler_path, 'rb') as f:
-                    self.scaler = pickle.load(f)
-                return True
+            if not self.tensorflow_available or self.model is None:
+                return None
+            
+            # Keep the training scale: refitting it would shift the inputs the weights were learnt on
+            scaled_data, _ = self.prepare_lstm_data(data, fit_scaler=False)
+            X, y = self.create_sequences(scaled_data)
+            return fine_tune(self.model, X, y, INCREMENTAL_CONFIG['fine_tune_epochs'], INCREMENTAL_CONFIG['window'])
+            
         except Exception as e:
-            print(f"LSTM model loading error: {str(e)}")
-        return False
+            print(f"LSTM update error: {str(e)}")
+            return None
+    
+    def fallback_prediction(self, data):
+        """Moving-average prediction served until the LSTM has trained"""
+        return self.simple_moving_average_prediction(data)
     
     def simple_moving_average_prediction(self, data):
         """Fallback prediction using moving averages"""
@@ -186,17 +201,15 @@ class LSTMPredictor:
             if not self.tensorflow_available:
                 return self.simple_moving_average_prediction(data)
             
-            # Try to load existing model first
+            # Train on first use; the engine hands in a per-symbol instance from its model registry
             if self.model is None:
-                if not self.load_model():
-                    # Train new model if no saved model exists
-                    print("Training new LSTM model...")
-                    result = self.train(data.copy())
-                    if result is None:
-                        return self.simple_moving_average_prediction(data)
-            
-            # Prepare data for prediction
-            scaled_data, feature_columns = self.prepare_lstm_data(data.copy())
+                print("Training new LSTM model...")
+                result = self.train(data)
+                if result is None:
+                    return self.simple_moving_average_prediction(data)
+            
+            # Prepare data for prediction with the scaler fitted in training
+            scaled_data, feature_columns = self.prepare_lstm_data(data, fit_scaler=False)
             
             if len(scaled_data) < self.sequence_length:
                 return self.simple_moving_average_prediction(data)
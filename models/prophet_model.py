@@ -15,9 +15,16 @@ except ImportError:
 class ProphetPredictor:
     """Facebook Prophet-based stock prediction model for time series analysis"""
     
+    # Technical indicator columns this model reads (computed on demand by the engine)
+    required_indicators = ['RSI', 'MACD']
+    
     def __init__(self):
         self.model = None
         self.prophet_available = PROPHET_AVAILABLE
+    
+    @property
+    def is_trained(self):
+        return self.model is not None
         
     def prepare_prophet_data(self, data):
         """Prepare data in Prophet format (ds, y)"""
@@ -77,6 +84,10 @@ class ProphetPredictor:
             print(f"Prophet training error: {str(e)}")
             return None
     
+    def fallback_prediction(self, data):
+        """Trend prediction served until Prophet has been fitted"""
+        return self.trend_based_prediction(data)
+    
     def trend_based_prediction(self, data):
         """Fallback prediction using trend analysis"""
         # Calculate multiple timeframe trends
@@ -119,7 +130,7 @@ class ProphetPredictor:
             # Train model if not already trained
             if self.model is None:
                 print("Training new Prophet model...")
-                result = self.train(data.copy())
+                result = self.train(data)
                 if result is None:
                     return self.trend_based_prediction(data)
             
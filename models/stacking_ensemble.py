@@ -7,6 +7,10 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import cross_val_score, KFold
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 import xgboost as xgb
+
+from utils.feature_store import FEATURE_STORE
+from utils.retraining import INCREMENTAL_CONFIG
+
 try:
     import lightgbm as lgb
     LIGHTGBM_AVAILABLE = True
@@ -17,6 +21,14 @@ import warnings
 warnings.filterwarnings('ignore')
 
 class StackingEnsemblePredictor:
+    MAX_TREE_GROWTH = 2  # Warm starts stop adding trees at this multiple of the full fit's
+    
+    # Technical indicator columns this model reads (computed on demand by the engine)
+    required_indicators = ['SMA_20', 'SMA_50', 'EMA_20', 'RSI', 'MACD', 'MACD_Signal', 'BB_Upper', 'BB_Lower']
+    # Feature store groups the base models train on
+    feature_groups = ['ohlcv', 'indicators', 'returns', 'ratios', 'moving_averages', 'volatility', 'momentum',
+                      'extremes', 'oscillators', 'volume', 'lags']
+    
     def __init__(self):
         """Initialize Stacking Ensemble predictor with multiple base models"""
         self.base_models = self._initialize_base_models()
@@ -73,61 +85,8 @@ class StackingEnsemblePredictor:
         }
     
     def prepare_features(self, data):
-        """Prepare features for training and prediction"""
-        features = pd.DataFrame(index=data.index)
-        
-        # Price-based features
-        features['close'] = data['Close']
-        features['high'] = data['High']
-        features['low'] = data['Low']
-        features['open'] = data['Open']
-        features['volume'] = data['Volume']
-        
-        # Technical indicators
-        if 'SMA_20' in data.columns:
-            features['sma_20'] = data['SMA_20']
-            features['sma_50'] = data.get('SMA_50', data['SMA_20'])
-            features['ema_20'] = data.get('EMA_20', data['SMA_20'])
-        
-        if 'RSI' in data.columns:
-            features['rsi'] = data['RSI']
-        
-        if 'MACD' in data.columns:
-            features['macd'] = data['MACD']
-            features['macd_signal'] = data.get('MACD_Signal', data['MACD'])
-        
-        if 'BB_Upper' in data.columns:
-            features['bb_upper'] = data['BB_Upper']
-            features['bb_lower'] = data['BB_Lower']
-            features['bb_width'] = data['BB_Upper'] - data['BB_Lower']
-        
-        # Price ratios and changes
-        features['high_low_ratio'] = data['High'] / data['Low']
-        features['close_open_ratio'] = data['Close'] / data['Open']
-        features['price_change'] = data['Close'].pct_change()
-        features['volume_change'] = data['Volume'].pct_change()
-        
-        # Moving averages and trends
-        for window in [5, 10, 20]:
-            features[f'ma_{window}'] = data['Close'].rolling(window=window).mean()
-            features[f'price_ma_{window}_ratio'] = data['Close'] / features[f'ma_{window}']
-            features[f'volume_ma_{window}'] = data['Volume'].rolling(window=window).mean()
-        
-        # Volatility features
-        features['volatility_20'] = data['Close'].rolling(window=20).std()
-        features['price_range'] = (data['High'] - data['Low']) / data['Close']
-        
-        # Momentum indicators
-        features['momentum_5'] = data['Close'] / data['Close'].shift(5)
-        features['momentum_10'] = data['Close'] / data['Close'].shift(10)
-        
-        # Volume indicators
-        features['volume_price_trend'] = (data['Volume'] * (data['Close'] - data['Close'].shift(1))).cumsum()
-        
-        # Lag features
-        for lag in [1, 2, 3, 5]:
-            features[f'close_lag_{lag}'] = data['Close'].shift(lag)
-            features[f'volume_lag_{lag}'] = data['Volume'].shift(lag)
+        """Prepare features for training and prediction (from the shared feature store)"""
+        features = FEATURE_STORE.get(data).group_frame(self.feature_groups)
         
         # Drop rows with NaN values
         features = features.dropna()
@@ -219,6 +178,59 @@ class StackingEnsemblePredictor:
             print(f"Training error: {str(e)}")
             return False
     
+    def update(self, data):
+        """Continue boosting the XGBoost/LightGBM base models on the most recent bars (warm start).
+        
+        Only those two can add trees to a fitted model; the other bases keep
+        their full-fit state. The meta-model is not refit either: its weights
+        stay those learnt on the full fit's out-of-fold predictions and are
+        stale until the next full refit (forced by the engine's retrain
+        policy). A base model stops growing once it holds MAX_TREE_GROWTH
+        times its full-fit number of trees; once none can grow, None is
+        returned so the caller refits instead.
+        """
+        try:
+            if not self.is_trained:
+                return None
+            
+            features = self.prepare_features(data)
+            target = self.create_target(data)
+            common_index = features.index.intersection(target.index)[-INCREMENTAL_CONFIG['window']:]
+            if len(common_index) < 50:
+                raise ValueError("Insufficient recent data for an update")
+            
+            X = pd.DataFrame(self.scaler.transform(features.loc[common_index]),
+                             columns=features.columns, index=common_index)
+            y = target.loc[common_index]
+            rounds = INCREMENTAL_CONFIG['boost_rounds']
+            updated = False
+            
+            for name, model in self.base_models.items():
+                full_fit_trees = model.get_params().get('n_estimators')
+                if isinstance(model, xgb.XGBRegressor):
+                    booster = model.get_booster()
+                    if booster.num_boosted_rounds() + rounds > self.MAX_TREE_GROWTH * full_fit_trees:
+                        continue
+                    model.set_params(n_estimators=rounds)
+                    model.fit(X, y, xgb_model=booster)
+                elif LIGHTGBM_AVAILABLE and isinstance(model, lgb.LGBMRegressor):
+                    booster = model.booster_
+                    if booster.current_iteration() + rounds > self.MAX_TREE_GROWTH * full_fit_trees:
+                        continue
+                    model.set_params(n_estimators=rounds)
+                    model.fit(X, y, init_model=booster)
+                else:
+                    continue
+                # n_estimators keeps describing the full fit, the size the cap is measured against
+                model.set_params(n_estimators=full_fit_trees)
+                updated = True
+            
+            return True if updated else None
+            
+        except Exception as e:
+            print(f"Stacking update error: {str(e)}")
+            return None
+    
     def _calculate_feature_importance(self, X):
         """Calculate average feature importance across base models"""
         importances = []
@@ -305,6 +317,10 @@ class StackingEnsemblePredictor:
         agreement = abs(sum(directions)) / len(directions)
         return agreement
     
+    def fallback_prediction(self, data):
+        """Blend of simple methods, served until the base and meta models have trained"""
+        return self._simple_prediction(data)
+    
     def _simple_prediction(self, data):
         """Simple fallback prediction method"""
         try:
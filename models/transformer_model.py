@@ -4,6 +4,11 @@ from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from utils.feature_store import FEATURE_STORE
+from utils.model_registry import keras_to_bytes, keras_from_bytes
+from utils.sequences import make_sequences, sequence_batches, fine_tune
+from utils.retraining import INCREMENTAL_CONFIG
+
 try:
     import os
     os.environ['KERAS_BACKEND'] = 'jax'
@@ -21,6 +26,9 @@ except ImportError:
 class TransformerPredictor:
     """Transformer-based stock prediction model using attention mechanisms"""
     
+    # Technical indicator columns this model reads (computed on demand by the engine)
+    required_indicators = ['SMA_20', 'SMA_50', 'RSI', 'MACD', 'MACD_Signal']
+    
     def __init__(self, sequence_length=60, d_model=64, num_heads=8, num_layers=4):
         self.model = None
         self.sequence_length = sequence_length
@@ -30,38 +38,37 @@ class TransformerPredictor:
         self.keras_available = KERAS_AVAILABLE
         self.feature_scaler = None
         self.price_scaler = None
+    
+    @property
+    def is_trained(self):
+        return self.model is not None
+    
+    def __getstate__(self):
+        # The model registry pickles predictors; Keras models go through their .keras format
+        state = self.__dict__.copy()
+        state['model'] = keras_to_bytes(self.model)
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.model = keras_from_bytes(state['model'], keras.models.load_model) if KERAS_AVAILABLE else None
         
     def prepare_transformer_data(self, data):
         """Prepare data for transformer model"""
         from sklearn.preprocessing import MinMaxScaler
         
-        # Select features for transformer
-        feature_columns = ['Open', 'High', 'Low', 'Close', 'Volume']
-        
-        # Add technical indicators if available
-        if 'SMA_20' in data.columns:
-            feature_columns.append('SMA_20')
-        if 'SMA_50' in data.columns:
-            feature_columns.append('SMA_50')
-        if 'RSI' in data.columns:
-            feature_columns.append('RSI')
-        if 'MACD' in data.columns:
-            feature_columns.append('MACD')
-        if 'MACD_Signal' in data.columns:
-            feature_columns.append('MACD_Signal')
-        
-        # Create additional features
-        data_copy = data.copy()
-        data_copy['Price_Range'] = data_copy['High'] - data_copy['Low']
-        data_copy['Price_Change'] = data_copy['Close'].pct_change()
-        data_copy['Volume_MA'] = data_copy['Volume'].rolling(20).mean()
-        data_copy['Volatility'] = data_copy['Close'].rolling(20).std()
-        
-        feature_columns.extend(['Price_Range', 'Price_Change', 'Volume_MA', 'Volatility'])
+        # Model feature name -> feature store column
+        feature_map = [('Open', 'open'), ('High', 'high'), ('Low', 'low'), ('Close', 'close'), ('Volume', 'volume'),
+                       ('SMA_20', 'sma_20'), ('SMA_50', 'sma_50'), ('RSI', 'rsi'), ('MACD', 'macd'),
+                       ('MACD_Signal', 'macd_signal'), ('Price_Range', 'price_range_abs'),
+                       ('Price_Change', 'price_change'), ('Volume_MA', 'volume_ma_20'), ('Volatility', 'volatility_20')]
         
         # Select available features
-        available_features = [col for col in feature_columns if col in data_copy.columns]
-        feature_data = data_copy[available_features].fillna(method='ffill').fillna(method='bfill')
+        matrix = FEATURE_STORE.get(data)
+        available = [(name, feature) for name, feature in feature_map if feature in matrix]
+        available_features = [name for name, _ in available]
+        feature_data = matrix.frame([feature for _, feature in available], available_features)
+        feature_data = feature_data.ffill().bfill()
         
         # Scale features
         if self.feature_scaler is None:
@@ -73,21 +80,15 @@ class TransformerPredictor:
         # Scale prices separately for target
         if self.price_scaler is None:
             self.price_scaler = MinMaxScaler()
-            scaled_prices = self.price_scaler.fit_transform(data_copy[['Close']])
+            scaled_prices = self.price_scaler.fit_transform(data[['Close']])
         else:
-            scaled_prices = self.price_scaler.transform(data_copy[['Close']])
+            scaled_prices = self.price_scaler.transform(data[['Close']])
         
         return scaled_features, scaled_prices.flatten(), available_features
     
     def create_sequences(self, features, prices):
-        """Create sequences for transformer training"""
-        X, y = [], []
-        
-        for i in range(self.sequence_length, len(features)):
-            X.append(features[i-self.sequence_length:i])
-            y.append(prices[i])
-        
-        return np.array(X), np.array(y)
+        """Create sequences for transformer training (X is a window view of features)"""
+        return make_sequences(features, prices, self.sequence_length)
     
     def build_transformer_encoder(self, inputs):
         """Build transformer encoder block"""
@@ -153,7 +154,7 @@ class TransformerPredictor:
                 return None
             
             # Prepare data
-            features, prices, feature_names = self.prepare_transformer_data(data.copy())
+            features, prices, feature_names = self.prepare_transformer_data(data)
             
             if len(features) < self.sequence_length + 50:
                 raise ValueError("Insufficient data for Transformer training")
@@ -183,18 +184,18 @@ class TransformerPredictor:
                 min_lr=0.0001
             )
             
+            # Batches are gathered from the window views one at a time
             history = self.model.fit(
-                X_train, y_train,
-                batch_size=32,
+                sequence_batches(X_train, y_train, batch_size=32, shuffle=True),
                 epochs=100,
-                validation_data=(X_test, y_test),
+                validation_data=sequence_batches(X_test, y_test, batch_size=32),
                 callbacks=[early_stopping, reduce_lr],
                 verbose=0
             )
             
             # Evaluate
-            train_loss = self.model.evaluate(X_train, y_train, verbose=0)
-            test_loss = self.model.evaluate(X_test, y_test, verbose=0)
+            train_loss = self.model.evaluate(sequence_batches(X_train, y_train), verbose=0)
+            test_loss = self.model.evaluate(sequence_batches(X_test, y_test), verbose=0)
             
             return {
                 'train_loss': train_loss[0],
@@ -207,6 +208,24 @@ class TransformerPredictor:
             print(f"Transformer training error: {str(e)}")
             return None
     
+    def update(self, data):
+        """Fine-tune the trained transformer on the newest windows, keeping the fitted scalers"""
+        try:
+            if not self.keras_available or self.model is None:
+                return None
+            
+            features, prices, _ = self.prepare_transformer_data(data)
+            X, y = self.create_sequences(features, prices)
+            return fine_tune(self.model, X, y, INCREMENTAL_CONFIG['fine_tune_epochs'], INCREMENTAL_CONFIG['window'])
+            
+        except Exception as e:
+            print(f"Transformer update error: {str(e)}")
+            return None
+    
+    def fallback_prediction(self, data):
+        """Attention-weighted trend prediction served until the transformer has trained"""
+        return self.attention_based_prediction(data)
+    
     def attention_based_prediction(self, data):
         """Attention-based prediction without full transformer (fallback)"""
         current_price = data['Close'].iloc[-1]
@@ -292,12 +311,12 @@ class TransformerPredictor:
             # Train model if not available
             if self.model is None:
                 print("Training new Transformer model...")
-                result = self.train(data.copy())
+                result = self.train(data)
                 if result is None:
                     return self.attention_based_prediction(data)
             
             # Prepare data for prediction
-            features, prices, feature_names = self.prepare_transformer_data(data.copy())
+            features, prices, feature_names = self.prepare_transformer_data(data)
             
             if len(features) < self.sequence_length:
                 return self.attention_based_prediction(data)
@@ -1,29 +1,48 @@
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, classification_report
-import pickle
-import os
+import xgboost as xgb
 import warnings
+
+from utils.feature_store import FEATURE_STORE
+from utils.retraining import INCREMENTAL_CONFIG
+from config.settings import MODEL_CONFIG
 warnings.filterwarnings('ignore')
 
 class XGBoostPredictor:
-    """XGBoost-based stock prediction model for speed and efficiency"""
+    """XGBoost-based stock prediction model for speed and efficiency.
+
+    Two histogram-method boosters share one feature matrix: a classifier for
+    the next bar's direction and a regressor for its return, which gives
+    the predicted price.
+    """
+    
+    # Version of the trained state; registry entries from older versions are not loaded
+    model_version = 2  # 1: random forest
+    
+    # Technical indicator columns this model reads (computed on demand by the engine)
+    required_indicators = ['SMA_20', 'SMA_50', 'RSI', 'MACD', 'MACD_Signal', 'BB_Upper', 'BB_Lower', 'Volatility']
     
     def __init__(self):
-        self.model = None
-        self.scaler = StandardScaler()
+        self.model = None  # Direction classifier (xgb.Booster)
+        self.regressor = None  # Next-bar return regressor (xgb.Booster)
+        self.config = MODEL_CONFIG['xgboost']
         self.feature_columns = [
             'Open', 'High', 'Low', 'Volume', 'SMA_20', 'SMA_50', 'RSI', 
             'MACD', 'MACD_Signal', 'BB_Upper', 'BB_Lower', 'Volatility'
         ]
-        self.model_path = 'models/xgboost_model.pkl'
-        self.scaler_path = 'models/xgboost_scaler.pkl'
+        # Model feature name -> feature store column
+        self.feature_map = [(column, column.lower()) for column in self.feature_columns] + [
+            ('Price_Change', 'price_change'), ('High_Low_Ratio', 'high_low_ratio'), ('Volume_SMA', 'volume_ma_20'),
+            ('Price_Volume_Trend', 'price_volume'), ('RSI_Normalized', 'rsi_normalized'),
+            ('MACD_Histogram', 'macd_histogram'), ('BB_Position', 'bb_position')
+        ]
+    
+    @property
+    def is_trained(self):
+        return self.model is not None
     
     def prepare_features(self, data):
-        """Prepare features for training/prediction"""
+        """Prepare features for training/prediction from the shared feature store"""
         try:
             # Ensure required columns exist
             required_base_columns = ['Open', 'High', 'Low', 'Close', 'Volume']
@@ -31,29 +50,10 @@ class XGBoostPredictor:
                 if col not in data.columns:
                     raise ValueError(f"Missing required column: {col}")
             
-            # Create price-based features
-            data['Price_Change'] = data['Close'].pct_change()
-            data['High_Low_Ratio'] = data['High'] / data['Low']
-            data['Volume_SMA'] = data['Volume'].rolling(window=20).mean()
-            data['Price_Volume_Trend'] = data['Close'] * data['Volume']
-            
-            # Technical indicator ratios
-            if 'RSI' in data.columns:
-                data['RSI_Normalized'] = (data['RSI'] - 50) / 50
-            
-            if 'MACD' in data.columns and 'MACD_Signal' in data.columns:
-                data['MACD_Histogram'] = data['MACD'] - data['MACD_Signal']
-            
-            # Bollinger Band position
-            if 'BB_Upper' in data.columns and 'BB_Lower' in data.columns:
-                data['BB_Position'] = (data['Close'] - data['BB_Lower']) / (data['BB_Upper'] - data['BB_Lower'])
-            
-            # Update feature columns to include new features
-            additional_features = ['Price_Change', 'High_Low_Ratio', 'Volume_SMA', 
-                                 'Price_Volume_Trend', 'RSI_Normalized', 'MACD_Histogram', 'BB_Position']
-            
-            available_features = [col for col in self.feature_columns + additional_features if col in data.columns]
-            return data[available_features].fillna(0)
+            matrix = FEATURE_STORE.get(data)
+            available = [(name, feature) for name, feature in self.feature_map if feature in matrix]
+            features = matrix.frame([feature for _, feature in available], [name for name, _ in available])
+            return features.fillna(0)
             
         except Exception as e:
             print(f"Feature preparation error: {str(e)}")
@@ -63,128 +63,179 @@ class XGBoostPredictor:
             return data[available_minimal].fillna(0)
     
     def create_target(self, data):
-        """Create target variable (1 for price up, 0 for price down)"""
-        data['Target'] = (data['Close'].shift(-1) > data['Close']).astype(int)
-        return data['Target']
+        """Target variable (1 for price up, 0 for price down), returned without touching data"""
+        return (data['Close'].shift(-1) > data['Close']).astype(int).rename('Target')
+    
+    def create_return_target(self, data):
+        """Next bar's return, the regression target"""
+        return (data['Close'].shift(-1) / data['Close'] - 1).rename('Return')
+    
+    def booster_params(self, objective):
+        """xgb.train parameters for one of the two boosters"""
+        config = self.config
+        params = {
+            'objective': objective,
+            'tree_method': config['tree_method'],
+            'max_bin': config['max_bin'],
+            'max_depth': config['max_depth'],
+            'eta': config['learning_rate'],
+            'subsample': config['subsample'],
+            'colsample_bytree': config['colsample_bytree'],
+            'min_child_weight': config['min_child_weight'],
+            'seed': config['random_state'],
+            'verbosity': 0
+        }
+        params['eval_metric'] = 'logloss' if objective == 'binary:logistic' else 'rmse'
+        return params
+    
+    def fit_booster(self, objective, train, valid, base=None, rounds=None):
+        """Boost until the validation metric stops improving; keeps only the trees up to the best round.
+        
+        With `base`, boosting continues from that booster's trees (warm start).
+        Without `valid`, exactly `rounds` trees are added and none are dropped.
+        """
+        if valid is None:
+            return xgb.train(self.booster_params(objective), train, num_boost_round=rounds,
+                             xgb_model=base, verbose_eval=False)
+        booster = xgb.train(self.booster_params(objective), train,
+                            num_boost_round=rounds or self.config['n_estimators'],
+                            evals=[(valid, 'valid')],
+                            early_stopping_rounds=self.config['early_stopping_rounds'],
+                            xgb_model=base,
+                            verbose_eval=False)
+        return booster[:booster.best_iteration + 1]
+    
+    def training_set(self, data):
+        """Features with direction and return targets, rows without a target dropped"""
+        features = self.prepare_features(data)
+        target = self.create_target(data)
+        returns = self.create_return_target(data)
+        
+        # Remove last row (no target available)
+        features = features[:-1]
+        target = target[:-1]
+        returns = returns[:-1]
+        
+        # Remove any remaining NaN values
+        mask = ~(features.isna().any(axis=1) | target.isna() | returns.isna())
+        return features[mask], target[mask], returns[mask]
+    
+    def fit(self, features, target, returns):
+        """Fit both models from scratch; returns validation accuracy"""
+        # Time-ordered split: validate (and early-stop) on the most recent bars
+        split = int(len(features) * (1 - self.config['validation_fraction']))
+        X = features.to_numpy(dtype=np.float32)
+        names = list(features.columns)
+        
+        # Histogram bins are computed once on the training rows; both boosters reuse
+        # the quantised matrices, only the labels change
+        train = xgb.QuantileDMatrix(X[:split], target.values[:split], feature_names=names,
+                                    max_bin=self.config['max_bin'])
+        valid = xgb.QuantileDMatrix(X[split:], target.values[split:], feature_names=names, ref=train)
+        self.model = self.fit_booster('binary:logistic', train, valid)
+        
+        # Evaluate model
+        up_probability = self.model.predict(valid)
+        accuracy = float(((up_probability > 0.5) == target.values[split:]).mean())
+        
+        train.set_label(returns.values[:split])
+        valid.set_label(returns.values[split:])
+        self.regressor = self.fit_booster('reg:squarederror', train, valid)
+        return accuracy
     
     def train(self, data):
-        """Train the XGBoost model"""
+        """Train the XGBoost direction and return models"""
         try:
-            # Prepare features and target
-            features = self.prepare_features(data.copy())
-            target = self.create_target(data.copy())
-            
-            # Remove last row (no target available)
-            features = features[:-1]
-            target = target[:-1]
-            
-            # Remove any remaining NaN values
-            mask = ~(features.isna().any(axis=1) | target.isna())
-            features = features[mask]
-            target = target[mask]
+            features, target, returns = self.training_set(data)
             
             if len(features) < 50:
                 raise ValueError("Insufficient data for training")
             
-            # Split data
-            X_train, X_test, y_train, y_test = train_test_split(
-                features, target, test_size=0.2, random_state=42, stratify=target
-            )
-            
-            # Scale features
-            X_train_scaled = self.scaler.fit_transform(X_train)
-            X_test_scaled = self.scaler.transform(X_test)
-            
-            # Train Random Forest (as XGBoost alternative)
-            self.model = RandomForestClassifier(
-                n_estimators=100,
-                max_depth=10,
-                min_samples_split=5,
-                min_samples_leaf=2,
-                random_state=42,
-                n_jobs=-1
-            )
-            
-            self.model.fit(X_train_scaled, y_train)
-            
-            # Evaluate model
-            y_pred = self.model.predict(X_test_scaled)
-            accuracy = accuracy_score(y_test, y_pred)
-            
-            # Save model and scaler
-            os.makedirs('models', exist_ok=True)
-            with open(self.model_path, 'wb') as f:
-                pickle.dump(self.model, f)
-            with open(self.scaler_path, 'wb') as f:
-                pickle.dump(self.scaler, f)
+            self.model, self.regressor = None, None
+            accuracy = self.fit(features, target, returns)
             
+            # Persisted per symbol by the engine's model registry
             return accuracy
             
         except Exception as e:
             print(f"Training error: {str(e)}")
             return None
     
-    def load_model(self):
-        """Load saved model and scaler"""
+    def update(self, data):
+        """Continue boosting both models on the most recent bars (warm start).
+        
+        The whole window is trained on, newest bars included, for a fixed
+        number of rounds: holding the newest bars out for early stopping would
+        leave out exactly the bars the update is for. Returns the accuracy the
+        model had on the window before it was boosted on it.
+        """
         try:
-            if os.path.exists(self.model_path) and os.path.exists(self.scaler_path):
-                with open(self.model_path, 'rb') as f:
-                    self.model = pickle.load(f)
-                with open(self.scaler_path, 'rb') as f:
-                    self.scaler = pickle.load(f)
-                return True
+            if self.model is None or self.regressor is None:
+                return None
+            
+            features, target, returns = self.training_set(data)
+            window = INCREMENTAL_CONFIG['window']
+            features, target, returns = features[-window:], target[-window:], returns[-window:]
+            if len(features) < 50:
+                raise ValueError("Insufficient recent data for an update")
+            
+            train = xgb.QuantileDMatrix(features.to_numpy(dtype=np.float32), target.values,
+                                        feature_names=list(features.columns), max_bin=self.config['max_bin'])
+            accuracy = float(((self.model.predict(train) > 0.5) == target.values).mean())
+            
+            rounds = INCREMENTAL_CONFIG['boost_rounds']
+            self.model = self.fit_booster('binary:logistic', train, None, self.model, rounds)
+            train.set_label(returns.values)
+            self.regressor = self.fit_booster('reg:squarederror', train, None, self.regressor, rounds)
+            return accuracy
+            
         except Exception as e:
-            print(f"Model loading error: {str(e)}")
-        return False
+            print(f"Incremental update error: {str(e)}")
+            return None
     
     def predict(self, data):
         """Make prediction for next day"""
         try:
-            # Try to load existing model first
+            # Train on first use; the engine hands in a per-symbol instance from its model registry
             if self.model is None:
-                if not self.load_model():
-                    # Train new model if no saved model exists
-                    print("Training new XGBoost model...")
-                    accuracy = self.train(data.copy())
-                    if accuracy is None:
-                        raise Exception("Model training failed")
+                print("Training new XGBoost model...")
+                accuracy = self.train(data)
+                if accuracy is None:
+                    raise Exception("Model training failed")
             
             # Prepare features for latest data point
-            features = self.prepare_features(data.copy())
-            latest_features = features.iloc[-1:].fillna(0)
-            
-            # Scale features
-            latest_features_scaled = self.scaler.transform(latest_features)
+            features = self.prepare_features(data)
+            latest = xgb.DMatrix(features.iloc[-1:].fillna(0).to_numpy(dtype=np.float32),
+                                 feature_names=list(features.columns))
             
             # Make prediction
-            prediction = self.model.predict(latest_features_scaled)[0]
-            confidence = max(self.model.predict_proba(latest_features_scaled)[0]) * 100
+            up_probability = float(self.model.predict(latest)[0])
+            predicted_return = float(self.regressor.predict(latest)[0])
+            confidence = max(up_probability, 1 - up_probability) * 100
             
-            # Calculate predicted price (simple estimation)
             current_price = data['Close'].iloc[-1]
-            price_change_mean = data['Close'].pct_change().mean()
-            
-            if prediction == 1:  # Up
-                predicted_price = current_price * (1 + abs(price_change_mean))
-                direction = 'UP'
-            else:  # Down
-                predicted_price = current_price * (1 - abs(price_change_mean))
-                direction = 'DOWN'
+            predicted_price = current_price * (1 + predicted_return)
+            direction = 'UP' if up_probability > 0.5 else 'DOWN'
             
             return {
                 'direction': direction,
                 'confidence': confidence,
                 'predicted_price': predicted_price,
-                'model_type': 'XGBoost (Random Forest)'
+                'model_type': 'XGBoost (Gradient Boosting)',
+                'up_probability': up_probability,
+                'predicted_return': predicted_return
             }
             
         except Exception as e:
             print(f"Prediction error: {str(e)}")
-            # Return fallback prediction
-            current_price = data['Close'].iloc[-1]
-            return {
-                'direction': 'UP' if data['Close'].iloc[-1] > data['Close'].iloc[-2] else 'DOWN',
-                'confidence': 50.0,
-                'predicted_price': current_price,
-                'model_type': 'XGBoost (Fallback)'
-            }
+            return self.fallback_prediction(data)
+    
+    def fallback_prediction(self, data):
+        """Last-move prediction, used when the model cannot predict or has not trained yet"""
+        current_price = data['Close'].iloc[-1]
+        return {
+            'direction': 'UP' if data['Close'].iloc[-1] > data['Close'].iloc[-2] else 'DOWN',
+            'confidence': 50.0,
+            'predicted_price': current_price,
+            'model_type': 'XGBoost (Fallback)'
+        }
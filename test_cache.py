@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for the bounded LRU cache
+Entries expire after their TTL and least recently used ones are evicted to
+stay within the byte and entry budgets
+"""
+
+import time
+
+import numpy as np
+
+from utils.cache import LRUCache, estimate_size
+
+
+def block(kb):
+    return np.zeros(kb * 128)  # kb kilobytes of float64
+
+
+def test_entries_expire_after_their_ttl():
+    cache = LRUCache(default_ttl=0.05)
+    cache.set('short', 1)
+    cache.set('long', 2, ttl=60)
+    assert cache.get('short') == 1 and 'short' in cache
+
+    time.sleep(0.06)
+    assert 'short' not in cache
+    assert cache.get('short', 'gone') == 'gone'
+    assert cache.get('long') == 2
+    assert cache.stats()['expirations'] == 1
+
+
+def test_byte_budget_evicts_least_recently_used():
+    cache = LRUCache(max_bytes=3 * 1024 + 500)
+    for key in 'abc':
+        cache.set(key, block(1))
+    cache.get('a')  # 'b' is now the least recently used
+    cache.set('d', block(1))
+
+    assert 'b' not in cache and all(key in cache for key in 'acd')
+    stats = cache.stats()
+    assert stats['evictions'] == 1 and stats['bytes'] <= cache.max_bytes
+    assert stats['bytes'] == sum(estimate_size(cache.get(key)) for key in 'acd')
+
+
+def test_expired_entries_go_before_live_ones():
+    cache = LRUCache(max_bytes=2 * 1024 + 500)
+    cache.set('live', block(1))
+    cache.set('stale', block(1), ttl=0.01)
+    time.sleep(0.02)
+    cache.set('new', block(1))
+
+    assert 'live' in cache and 'new' in cache
+    assert cache.stats()['evictions'] == 0 and cache.stats()['expirations'] == 1
+
+
+def test_entry_budget_and_oversized_values():
+    cache = LRUCache(max_bytes=4096, max_entries=2)
+    cache.set(1, 'a')
+    cache.set(2, 'b')
+    cache.set(3, 'c')
+    assert len(cache) == 2 and 1 not in cache
+
+    assert not cache.set('huge', block(8))  # Bigger than the whole budget
+    assert len(cache) == 2 and cache.stats()['rejections'] == 1
+
+
+def test_delete_prefix_and_replacing_keeps_byte_count():
+    cache = LRUCache()
+    cache.set('RELIANCE.NS_1y', block(1))
+    cache.set('RELIANCE.NS_1y', block(2))
+    cache.set('TCS.NS_1y', block(1))
+    assert cache.current_bytes == estimate_size(block(2)) + estimate_size(block(1))
+
+    cache.delete_prefix(('RELIANCE.NS_',))
+    assert len(cache) == 1 and cache.current_bytes == estimate_size(block(1))
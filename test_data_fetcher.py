@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests for DataFetcher
+get_many downloads symbols in batches, serves fresh ones from the cache,
+drops only a failed batch's symbols and keys results as requested; intraday
+views are derived from one shared download of the finest bars
+"""
+
+import pytest
+
+from config.settings import DATA_CONFIG
+from utils.data_fetcher import DataFetcher
+from utils.data_providers import SyntheticProvider
+
+
+class RecordingDownloads(SyntheticProvider):
+    """Synthetic bars that remember every batch download and can fail some of them"""
+
+    def __init__(self, failing=()):
+        super().__init__(seed=5, history_bars=40, end='2024-12-31')
+        self.batches = []
+        self.failing = set(failing)
+
+    def download(self, symbols, period='5d', interval='1d'):
+        self.batches.append(list(symbols))
+        if self.failing & set(symbols):
+            raise ConnectionError("batch refused")
+        return super().download(symbols, period=period, interval=interval)
+
+
+class RecordingHistory(SyntheticProvider):
+    """Synthetic bars that remember every history request"""
+
+    def __init__(self):
+        # Ends today: calendar periods like '1mo' are cut back from the wall clock
+        super().__init__(seed=7, intraday_sessions=10)
+        self.requests = []
+
+    def history(self, symbol, period=None, interval='1d', start=None, end=None):
+        self.requests.append((period, interval))
+        return super().history(symbol, period=period, interval=interval, start=start, end=end)
+
+
+@pytest.fixture
+def batch_of_two(monkeypatch):
+    monkeypatch.setitem(DATA_CONFIG, 'download_batch_size', 2)
+
+
+def test_symbols_are_downloaded_in_batches_and_keyed_as_passed(batch_of_two):
+    provider = RecordingDownloads()
+    fetcher = DataFetcher(provider=provider)
+
+    results = fetcher.get_many(['AAA', 'BBB.NS', '^NSEI', 'CCC'], period='1mo')
+    assert provider.batches == [['AAA.NS', 'BBB.NS'], ['^NSEI', 'CCC.NS']]
+    assert set(results) == {'AAA', 'BBB.NS', '^NSEI', 'CCC'}
+    assert results['AAA'].attrs['symbol'] == 'AAA.NS'
+    assert results['AAA'].attrs['interval'] == '1d'
+
+
+def test_cached_symbols_are_not_downloaded_again(batch_of_two):
+    provider = RecordingDownloads()
+    fetcher = DataFetcher(provider=provider)
+    first = fetcher.get_many(['AAA', 'BBB'], period='1mo')
+
+    provider.batches.clear()
+    again = fetcher.get_many(['AAA', 'BBB', 'CCC'], period='1mo')
+    assert provider.batches == [['CCC.NS']]
+    assert again['AAA'].equals(first['AAA']) and 'CCC' in again
+
+
+def test_a_failed_batch_only_drops_its_own_symbols(batch_of_two):
+    provider = RecordingDownloads(failing={'CCC.NS'})
+    fetcher = DataFetcher(provider=provider)
+
+    results = fetcher.get_many(['AAA', 'BBB', 'CCC', 'DDD', 'EEE'], period='1mo')
+    assert len(provider.batches) == 3  # The batch after the failed one still runs
+    assert set(results) == {'AAA', 'BBB', 'EEE'}
+
+
+def test_intraday_views_share_one_base_download():
+    provider = RecordingHistory()
+    fetcher = DataFetcher(provider=provider)
+
+    day = fetcher.get_stock_data('AAA', period='1d')
+    week = fetcher.get_stock_data('AAA', period='5d')
+    assert provider.requests == [('5d', '5m')]
+    assert day.attrs['interval'] == '5m' and day.index.normalize().nunique() == 1
+    assert week.attrs['interval'] == '15m' and week.index.normalize().nunique() == 5
+    assert (week.index.strftime('%H:%M')[:2] == ['09:15', '09:30']).all()
+
+
+def test_views_the_base_cannot_cover_are_downloaded_directly():
+    provider = RecordingHistory()
+    fetcher = DataFetcher(provider=provider)
+
+    month = fetcher.get_intraday_data('AAA', period='1mo', interval='15m')
+    assert provider.requests == [('1mo', '15m')]
+    assert month.index.normalize().nunique() == 10  # Not cut down to the 5d base window
+
+    fetcher.get_intraday_data('AAA', period='1d', interval='1m')
+    assert provider.requests[-1] == ('1d', '1m')
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for the data providers
+Bars and info captured by RecordingProvider replay identically through
+ReplayProvider, and STOCKTRENDAI_DATA_PROVIDER picks the provider
+"""
+
+import pandas as pd
+import pytest
+
+from utils.data_providers import (ReplayProvider, RecordingProvider, SyntheticProvider,
+                                  YFinanceProvider, create_provider)
+
+
+def test_recorded_frames_replay_identically(tmp_path):
+    recorder = RecordingProvider(SyntheticProvider(seed=8, end='2024-12-20'), root=str(tmp_path))
+    daily = recorder.history('REC.NS', period='1y', interval='1d')
+    intraday = recorder.download(['REC.NS', 'TWO.NS'], period='5d', interval='5m')
+    info = recorder.info('REC.NS')
+
+    replay = ReplayProvider(str(tmp_path))  # A fresh instance reads everything back from disk
+    pd.testing.assert_frame_equal(replay.history('REC.NS', period='1y', interval='1d'), daily)
+    for symbol, frame in intraday.items():
+        pd.testing.assert_frame_equal(replay.history(symbol, period='5d', interval='5m'), frame)
+    assert replay.info('REC.NS') == info
+    assert replay.history('MISSING.NS', period='1y').empty
+
+
+def test_recordings_merge_overlapping_windows(tmp_path):
+    source = SyntheticProvider(seed=8, end='2024-12-20')
+    recorder = RecordingProvider(source, root=str(tmp_path))
+    recorder.history('REC.NS', period='1mo')
+    recorder.history('REC.NS', period='3mo')
+
+    replayed = ReplayProvider(str(tmp_path)).history('REC.NS', period='max')
+    pd.testing.assert_frame_equal(replayed, source.history('REC.NS', period='3mo'))
+
+
+@pytest.mark.parametrize('name, provider_type', [
+    ('synthetic', SyntheticProvider),
+    ('replay', ReplayProvider),
+    ('record', RecordingProvider),
+    ('yfinance', YFinanceProvider),
+    ('unknown', YFinanceProvider),
+])
+def test_environment_variable_selects_the_provider(monkeypatch, name, provider_type):
+    monkeypatch.setenv('STOCKTRENDAI_DATA_PROVIDER', name)
+    assert type(create_provider()) is provider_type
+
+
+def test_explicit_name_wins_over_the_environment(monkeypatch):
+    monkeypatch.setenv('STOCKTRENDAI_DATA_PROVIDER', 'replay')
+    assert isinstance(create_provider('synthetic'), SyntheticProvider)
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from utils.data_providers import SyntheticProvider
+from utils.technical_indicators import TechnicalIndicators
+from utils.feature_partitions import FeaturePartitions
+from utils.feature_store import FeatureStore, FEATURE_GROUPS
+
+
+@pytest.fixture
+def data():
+    frame = SyntheticProvider(seed=5, history_bars=300, end='2024-12-31').history('FS', 'max')
+    frame.attrs.update(symbol='FS', interval='1d')
+    return TechnicalIndicators().add_all_indicators(frame)
+
+
+def counting_builds(store):
+    """Record the frames a store builds features for instead of serving them from disk"""
+    builds, build = [], store.build
+    store.build = lambda frame: builds.append(frame) or build(frame)
+    return builds
+
+
+def test_feature_matrix_is_float32_and_shared(data):
+    store = FeatureStore()
+    matrix = store.get(data)
+    assert matrix.values.dtype == np.float32
+    assert list(matrix.groups) == list(FEATURE_GROUPS)
+    assert store.get(data) is matrix
+    assert store.cache.stats()['hits'] == 1
+
+
+def test_group_frames_are_views_and_match_pandas(data):
+    matrix = FeatureStore().get(data)
+    frame = matrix.group_frame(['ohlcv', 'indicators', 'returns'])
+    assert np.shares_memory(frame.to_numpy(), matrix.values)
+    np.testing.assert_allclose(frame['price_change'], data['Close'].pct_change(), rtol=1e-6)
+    moving = matrix.group_frame(['moving_averages'])
+    np.testing.assert_allclose(moving['ma_10'], data['Close'].rolling(10).mean(), rtol=1e-6)
+    with pytest.raises(ValueError):
+        matrix.values[0, 0] = 0.0
+
+
+def test_persisted_features_append_and_match_a_full_build(tmp_path, data):
+    store = FeatureStore()
+    store.partitions = FeaturePartitions(root=str(tmp_path))
+    raw = data[['Open', 'High', 'Low', 'Close', 'Volume']]
+    assert store.persist('FS', raw.iloc[:250]) == 250
+    assert store.persist('FS', raw) == 50
+    assert store.persist('FS', raw) == 0
+
+    stored = store.load('FS')
+    np.testing.assert_array_equal(np.asarray(stored.values), FeatureStore().build(data).values)
+    builds = counting_builds(store)
+    served = store.get(data.iloc[:200])
+    assert not builds and served.index.equals(data.index[:200])
+    np.testing.assert_array_equal(served.values, FeatureStore().build(data.iloc[:200]).values)
+
+
+def test_sliced_frames_are_built_not_served_from_disk(tmp_path, data):
+    store = FeatureStore()
+    store.partitions = FeaturePartitions(root=str(tmp_path))
+    store.persist('FS', data[['Open', 'High', 'Low', 'Close', 'Volume']])
+
+    # A window that starts later has other cumulative features and warm-up NaNs than the stored rows
+    recent = TechnicalIndicators().add_all_indicators(data.iloc[-100:][['Open', 'High', 'Low', 'Close', 'Volume']])
+    builds = counting_builds(store)
+    matrix = store.get(recent)
+    assert len(builds) == 1 and matrix.index.equals(recent.index)
+    np.testing.assert_array_equal(matrix.values, FeatureStore().build(recent).values)
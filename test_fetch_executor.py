@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tests for the fetch executor
+Token-bucket rate limiting, per-host circuit breaking, retries and
+single-flight coalescing of identical requests
+"""
+
+import threading
+import time
+
+import pytest
+
+from utils.fetch_executor import (FetchExecutor, TokenBucket, CircuitBreaker, SingleFlight,
+                                  RateLimitError, CircuitOpenError)
+
+
+def test_token_bucket_limits_and_refills():
+    bucket = TokenBucket(capacity=2, rate=20)
+    assert bucket.try_acquire() == 0.0 and bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() > 0
+    assert not bucket.acquire(timeout=0)
+    assert bucket.acquire(timeout=1)  # Refilled after ~50ms
+
+
+def test_refused_request_returns_tokens_to_other_buckets():
+    executor = FetchExecutor(max_workers=1)
+    executor.buckets = [TokenBucket(capacity=5, rate=1e-6), TokenBucket(capacity=1, rate=1e-6)]
+    executor.max_wait = 0
+
+    executor.acquire()
+    with pytest.raises(RateLimitError):
+        executor.acquire()
+    assert executor.buckets[0].tokens == pytest.approx(4, abs=1e-3)
+
+
+def test_circuit_breaker_opens_and_probes_after_timeout():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open' and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow() and breaker.state == 'half-open'
+    breaker.record_failure()  # A failed probe re-opens straight away
+    assert breaker.state == 'open'
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed' and breaker.failures == 0
+
+
+def test_half_open_breaker_lets_one_probe_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    assert breaker.allow() and breaker.state == 'half-open'
+    assert not breaker.allow() and not breaker.allow()  # The probe is still in flight
+    breaker.record_success()
+    assert breaker.allow() and breaker.allow()
+
+
+def test_half_open_probe_that_never_reports_back_is_given_up_on():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow() and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+
+
+def test_call_retries_then_trips_the_breaker():
+    executor = FetchExecutor(max_workers=1)
+    executor.backoff_base = 0
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("reset")
+        return 'ok'
+
+    assert executor.call(flaky, retries=3) == 'ok' and len(attempts) == 3
+
+    def down():
+        raise ConnectionError("down")
+
+    breaker = executor.breaker()
+    with pytest.raises(ConnectionError):
+        executor.call(down, retries=breaker.failure_threshold)
+    with pytest.raises(CircuitOpenError):
+        executor.call(down)
+
+
+def test_call_without_retries_still_makes_one_attempt():
+    executor = FetchExecutor(max_workers=1)
+    executor.max_retries = 0
+    assert executor.call(lambda: 'ok') == 'ok'
+
+    def down():
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        executor.call(down, retries=0)
+
+
+def test_single_flight_collapses_concurrent_calls():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {'rows': 42}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do('RELIANCE.NS_1y', fetch)))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    deadline = time.time() + 5
+    while flight.in_flight() == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)  # Let the followers join the in-flight call
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(results) == 5 and all(result is results[0] for result in results)
+    assert flight.in_flight() == 0
+
+
+def test_single_flight_shares_errors_and_forgets_the_key():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("bad symbol")
+
+    with pytest.raises(ValueError):
+        flight.do('key', fail)
+    assert flight.do('key', lambda: 'retried') == 'retried'
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Parity tests for the rolling indicator kernels
+Every available backend must match the pandas reference implementations
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.data_providers import SyntheticProvider
+from utils.indicator_kernels import (NUMBA_AVAILABLE, ewm_mean, rolling_mad, rolling_max, rolling_min, rolling_mean,
+                                     rolling_std, true_range, wilder_smooth, rolling_std_windows, ewm_mean_windows)
+from utils.technical_indicators import TechnicalIndicators, INDICATOR_COLUMNS
+
+BACKENDS = ['numpy'] + (['numba'] if NUMBA_AVAILABLE else [])
+
+
+@pytest.fixture(scope='module')
+def data():
+    return SyntheticProvider(seed=11, history_bars=1500, end='2024-12-31').history('TCS.NS', 'max')
+
+
+@pytest.fixture(scope='module')
+def values_with_gaps():
+    values = np.random.default_rng(3).normal(100, 5, 400)
+    values[[0, 57, 58, 200]] = np.nan
+    return values
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_rolling_kernels_match_pandas(backend, values_with_gaps):
+    series = pd.Series(values_with_gaps)
+    for window in (3, 14, 20):
+        expected_mad = series.rolling(window).apply(lambda x: np.mean(np.abs(x - x.mean())))
+        np.testing.assert_allclose(rolling_mad(values_with_gaps, window, backend), expected_mad,
+                                   rtol=1e-10, equal_nan=True)
+        np.testing.assert_allclose(rolling_max(values_with_gaps, window, backend),
+                                   series.rolling(window).max(), equal_nan=True)
+        np.testing.assert_allclose(rolling_min(values_with_gaps, window, backend),
+                                   series.rolling(window).min(), equal_nan=True)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_true_range_and_wilder_match_pandas(backend, data):
+    high, low, close = data['High'], data['Low'], data['Close']
+    expected_tr = np.maximum(high - low, np.maximum(np.abs(high - close.shift()), np.abs(low - close.shift())))
+    tr = true_range(high.to_numpy(), low.to_numpy(), close.to_numpy(), backend)
+    np.testing.assert_allclose(tr, expected_tr, equal_nan=True)
+
+    # Wilder's smoothing is an alpha=1/window EWM seeded with the first full-window SMA
+    window = 14
+    seeded = pd.Series(tr.copy())
+    seeded.iloc[:window] = np.nan
+    seeded.iloc[window] = np.mean(tr[1:window + 1])
+    expected = seeded.ewm(alpha=1 / window, adjust=False).mean()
+    np.testing.assert_allclose(wilder_smooth(tr, window, backend), expected, rtol=1e-10, equal_nan=True)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_indicator_frame_matches_pandas_backend(backend, data):
+    expected = TechnicalIndicators('pandas').add_all_indicators(data)
+    actual = TechnicalIndicators(backend).add_all_indicators(data)
+
+    assert list(actual.columns) == list(expected.columns)
+    for column in expected.columns:
+        np.testing.assert_allclose(actual[column].to_numpy(dtype=float), expected[column].to_numpy(dtype=float),
+                                   rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=column)
+
+
+def test_add_indicators_computes_only_requested_columns(data):
+    indicators = TechnicalIndicators()
+    full = indicators.add_all_indicators(data)
+    columns = ['MACD', 'BB_Upper', 'Stoch_D', 'Volume_Ratio']
+    partial = indicators.add_indicators(data, columns)
+
+    assert list(partial.columns) == list(data.columns) + columns
+    pd.testing.assert_frame_equal(partial[columns], full[columns])
+
+
+def test_panel_kernels_match_pandas(values_with_gaps):
+    series = pd.Series(values_with_gaps)
+    np.testing.assert_allclose(rolling_mean(values_with_gaps, 20), series.rolling(20).mean(), rtol=1e-10, equal_nan=True)
+    np.testing.assert_allclose(rolling_std(values_with_gaps, 20), series.rolling(20).std(), rtol=1e-10, equal_nan=True)
+    for span in [9, 26]:
+        np.testing.assert_allclose(ewm_mean(values_with_gaps, span), series.ewm(span=span).mean(),
+                                   rtol=1e-10, equal_nan=True)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_panel_indicators_match_single_symbol(backend):
+    provider = SyntheticProvider(seed=5, history_bars=300, end='2024-12-31')
+    universe = {symbol: provider.history(symbol, 'max') for symbol in ['TCS.NS', 'INFY.NS', 'SBIN.NS']}
+    indicators = TechnicalIndicators(backend)
+    panel = indicators.add_panel_indicators(universe)
+
+    assert list(panel) == INDICATOR_COLUMNS
+    for symbol, data in universe.items():
+        expected = indicators.add_all_indicators(data)
+        for column in INDICATOR_COLUMNS:
+            np.testing.assert_allclose(panel[column][symbol].to_numpy(dtype=float),
+                                       expected[column].to_numpy(dtype=float),
+                                       rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=f"{symbol} {column}")
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_window_block_kernels_match_single_window_kernels(backend, values_with_gaps):
+    windows = [1, 2, 5, 20, 50]
+    std = rolling_std_windows(values_with_gaps, windows)
+    ema = ewm_mean_windows(values_with_gaps, windows, backend=backend)
+    for column, window in enumerate(windows):
+        np.testing.assert_allclose(std[:, column], rolling_std(values_with_gaps, window), rtol=1e-10, equal_nan=True)
+        np.testing.assert_allclose(ema[:, column], ewm_mean(values_with_gaps, window), rtol=1e-10, equal_nan=True)
+
+
+@pytest.mark.parametrize('backend', BACKENDS + ['pandas'])
+def test_window_blocks_match_single_window_indicators(backend, data):
+    indicators = TechnicalIndicators(backend)
+    windows = [1, 5, 10, 20, 50]
+    close = data['Close']
+
+    sma = indicators.calculate_sma_windows(data, windows)
+    ema = indicators.calculate_ema_windows(data, windows)
+    momentum = indicators.calculate_momentum_windows(data, windows)
+    roc = indicators.calculate_roc_windows(data, windows)
+    assert list(sma.columns) == windows
+    for window in windows:
+        np.testing.assert_allclose(sma[window], indicators.calculate_sma(data, window), rtol=1e-9, equal_nan=True)
+        np.testing.assert_allclose(ema[window], indicators.calculate_ema(data, window), rtol=1e-9, equal_nan=True)
+        np.testing.assert_allclose(momentum[window], indicators.calculate_momentum(data, window), equal_nan=True)
+        np.testing.assert_allclose(roc[window], indicators.calculate_roc(data, window), rtol=1e-12, equal_nan=True)
+        np.testing.assert_allclose(indicators.calculate_lags(data, windows)[window], close.shift(window), equal_nan=True)
+
+
+def test_indicator_frames_are_memoized_by_content(data):
+    tagged = data.copy()
+    tagged.attrs.update(symbol='TCS.NS', interval='1d')
+    first = TechnicalIndicators().add_all_indicators(tagged)
+    second = TechnicalIndicators().add_all_indicators(tagged)
+    assert np.shares_memory(first['RSI'].to_numpy(), second['RSI'].to_numpy())
+
+    # A ticking last bar is new content
+    ticked = tagged.copy()
+    ticked.iloc[-1, ticked.columns.get_loc('Close')] *= 1.01
+    third = TechnicalIndicators().add_all_indicators(ticked)
+    assert not np.shares_memory(first['RSI'].to_numpy(), third['RSI'].to_numpy())
+    assert third['RSI'].iloc[-1] != first['RSI'].iloc[-1]
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for the market calendar
+Session boundaries in IST, the post-close grace window and cache lifetimes
+that run until the next open outside trading hours
+"""
+
+from datetime import datetime
+
+import pytest
+
+from config.settings import MARKET_CONFIG
+from utils.market_calendar import MarketCalendar
+
+LIVE_TTL = 30
+# 2024-12-18 is a Wednesday, 2024-12-20 a Friday and 2024-12-21 a Saturday
+WEDNESDAY = (2024, 12, 18)
+
+
+def ist(year, month, day, hour, minute):
+    return MarketCalendar().timezone.localize(datetime(year, month, day, hour, minute))
+
+
+@pytest.mark.parametrize('hour, minute, status', [
+    (9, 14, 'CLOSED'),
+    (9, 15, 'OPEN'),
+    (15, 30, 'OPEN'),
+    (15, 31, 'CLOSED'),
+])
+def test_status_at_session_boundaries(hour, minute, status):
+    assert MarketCalendar().status(ist(*WEDNESDAY, hour, minute)) == status
+
+
+def test_live_ttl_in_session_and_during_the_post_close_grace():
+    calendar = MarketCalendar()
+    for hour, minute in [(9, 15), (12, 0), (15, 30), (15, 44)]:
+        assert calendar.cache_ttl(LIVE_TTL, ist(*WEDNESDAY, hour, minute)) == LIVE_TTL
+    assert calendar.status(ist(*WEDNESDAY, 15, 44)) == 'CLOSED'  # Grace only affects caching
+
+
+def test_off_hours_ttl_runs_until_the_next_open():
+    calendar = MarketCalendar()
+
+    # Past the grace window the cache holds until Thursday 09:15
+    moment = ist(*WEDNESDAY, 15, 46)
+    assert calendar.next_open(moment) == ist(2024, 12, 19, 9, 15)
+    assert calendar.cache_ttl(LIVE_TTL, moment) == (17 * 60 + 29) * 60
+
+    # One minute before the open, the live TTL is still the floor
+    moment = ist(*WEDNESDAY, 9, 14)
+    assert calendar.next_open(moment) == ist(*WEDNESDAY, 9, 15)
+    assert calendar.cache_ttl(LIVE_TTL, moment) == 60
+    assert calendar.cache_ttl(300, moment) == 300
+
+
+@pytest.mark.parametrize('moment, hours', [
+    ((2024, 12, 20, 18, 0), 63.25),  # Friday evening -> Monday 09:15
+    ((2024, 12, 21, 12, 0), 45.25),  # Saturday noon -> Monday 09:15
+])
+def test_weekend_ttl_runs_until_monday(moment, hours):
+    calendar = MarketCalendar()
+    assert calendar.next_open(ist(*moment)) == ist(2024, 12, 23, 9, 15)
+    assert calendar.cache_ttl(LIVE_TTL, ist(*moment)) == hours * 3600
+
+
+def test_holidays_are_skipped():
+    calendar = MarketCalendar(dict(MARKET_CONFIG, holidays=['2024-12-23']))
+    friday_evening = ist(2024, 12, 20, 18, 0)
+
+    assert calendar.status(ist(2024, 12, 23, 11, 0)) == 'CLOSED'
+    assert calendar.next_open(friday_evening) == ist(2024, 12, 24, 9, 15)
+    assert calendar.cache_ttl(LIVE_TTL, friday_evening) == (63.25 + 24) * 3600
+    assert calendar.last_close(ist(2024, 12, 24, 9, 0)) == ist(2024, 12, 20, 15, 30)
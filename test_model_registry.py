@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-symbol model registry
+"""
+
+import os
+
+import pandas as pd
+
+from models.xgboost_model import XGBoostPredictor
+from utils.model_registry import ModelRegistry, schema_hash
+
+
+class FittedModel:
+    def __init__(self, label):
+        self.label = label
+
+
+def test_latest_model_no_later_than_as_of(tmp_path):
+    registry = ModelRegistry(root=str(tmp_path))
+    schema = schema_hash(XGBoostPredictor())
+    registry.save('XGBoost', 'TCS.NS', '1d', schema, pd.Timestamp('2024-06-28'), FittedModel('june'))
+    registry.save('XGBoost', 'TCS.NS', '1d', schema, pd.Timestamp('2024-12-31'), FittedModel('december'))
+
+    assert registry.get('XGBoost', 'TCS.NS', '1d', schema).label == 'december'
+    assert registry.get('XGBoost', 'TCS.NS', '1d', schema, as_of=pd.Timestamp('2024-09-30')).label == 'june'
+    assert registry.get('XGBoost', 'TCS.NS', '1d', schema, as_of=pd.Timestamp('2024-01-01')) is None
+    assert registry.get('XGBoost', 'INFY.NS', '1d', schema) is None
+    assert registry.get('XGBoost', 'TCS.NS', '1d', 'other-schema') is None
+
+    entry = os.path.join(str(tmp_path), 'XGBoost', 'TCS.NS', '1d', schema)
+    assert sorted(os.listdir(entry)) == ['20240628T000000', '20241231T000000']  # No staging leftovers
+    assert registry.metadata('XGBoost', 'TCS.NS', '1d', schema, '20241231T000000')['symbol'] == 'TCS.NS'
+
+
+def test_loaded_models_come_from_the_lru_then_disk(tmp_path):
+    registry = ModelRegistry(root=str(tmp_path))
+    model = FittedModel('trained')
+    registry.save('Ensemble', 'RELIANCE.NS', '1d', 'abc', pd.Timestamp('2024-12-31'), model)
+    assert registry.get('Ensemble', 'RELIANCE.NS', '1d', 'abc') is model
+
+    reopened = ModelRegistry(root=str(tmp_path))
+    loaded = reopened.get('Ensemble', 'RELIANCE.NS', '1d', 'abc')
+    assert loaded is not model and loaded.label == 'trained'
+    assert reopened.get('Ensemble', 'RELIANCE.NS', '1d', 'abc') is loaded
+    assert reopened.loaded.stats()['hits'] == 1
+
+
+def test_retraining_a_cutoff_swaps_it_in_and_old_cutoffs_are_pruned(tmp_path):
+    registry = ModelRegistry(root=str(tmp_path), keep_cutoffs=2)
+    days = pd.date_range('2024-12-27', periods=4, freq='D')
+    for day in days:
+        assert registry.save('XGBoost', 'SBIN.NS', '1d', 'abc', day, FittedModel(str(day.date())))
+    assert registry.save('XGBoost', 'SBIN.NS', '1d', 'abc', days[-1], FittedModel('retrained'))
+
+    kept = [registry.format_cutoff(day) for day in days[-2:]]
+    assert registry.cutoffs('XGBoost', 'SBIN.NS', '1d', 'abc') == kept
+    entry = os.path.join(str(tmp_path), 'XGBoost', 'SBIN.NS', '1d', 'abc')
+    assert sorted(os.listdir(entry)) == kept
+    assert registry.get('XGBoost', 'SBIN.NS', '1d', 'abc', as_of=days[0]) is None
+
+    reopened = ModelRegistry(root=str(tmp_path))
+    assert reopened.get('XGBoost', 'SBIN.NS', '1d', 'abc').label == 'retrained'
+
+
+def test_failed_metadata_write_aborts_the_save(tmp_path, monkeypatch):
+    registry = ModelRegistry(root=str(tmp_path))
+    cutoff = pd.Timestamp('2024-12-31')
+    assert registry.save('XGBoost', 'ITC.NS', '1d', 'abc', cutoff, FittedModel('first'))
+
+    monkeypatch.setattr(registry.model_utils, 'save_model_metadata', lambda *args, **kwargs: False)
+    assert not registry.save('XGBoost', 'ITC.NS', '1d', 'abc', cutoff, FittedModel('second'))
+    entry = os.path.join(str(tmp_path), 'XGBoost', 'ITC.NS', '1d', 'abc')
+    assert os.listdir(entry) == ['20241231T000000']  # Staging directory removed
+
+    reopened = ModelRegistry(root=str(tmp_path))
+    assert reopened.get('XGBoost', 'ITC.NS', '1d', 'abc').label == 'first'
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent OHLCV store
+A stored partition is topped up with only the newer bars, and a re-downloaded
+(revised) last bar replaces the stored one
+"""
+
+import os
+import threading
+
+from utils.data_fetcher import DataFetcher
+from utils.data_providers import ReplayProvider, SyntheticProvider
+from utils.ohlcv_store import OHLCVStore
+
+
+def record(root, data, symbol='DELTA.NS'):
+    replay = ReplayProvider(root)
+    path = replay._history_path(symbol, '1d')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data.to_pickle(path)
+    return replay
+
+
+def test_delta_fetch_merges_new_bars_and_revised_last_bar(tmp_path):
+    full = SyntheticProvider(seed=3, history_bars=60, end='2024-12-31').history('DELTA.NS', 'max')
+    fetcher = DataFetcher(provider=record(str(tmp_path / 'replay'), full.iloc[:-2]))
+    fetcher.store = OHLCVStore(root=str(tmp_path / 'store'))
+    fetcher.store.enabled = True
+
+    first = fetcher._fetch_history('DELTA.NS', 'max', '1d')
+    assert len(first) == 58
+
+    # The bar that was still forming closed differently, and two more bars arrived
+    revised = full.copy()
+    revised.iloc[-3, revised.columns.get_loc('Close')] += 10.0
+    fetcher.provider = record(str(tmp_path / 'replay'), revised)
+    requested = []
+    history = fetcher.provider.history
+    fetcher.provider.history = lambda symbol, **kwargs: requested.append(kwargs) or history(symbol, **kwargs)
+
+    merged = fetcher._fetch_history('DELTA.NS', 'max', '1d')
+    assert [kwargs.get('start') for kwargs in requested] == [first.index[-1].normalize()]
+    assert len(merged) == 60 and merged.index.is_unique
+    assert merged['Close'].iloc[-3] == revised['Close'].iloc[-3]
+    stored, metadata = fetcher.store.read('DELTA.NS', '1d')
+    assert len(stored) == 60 and metadata['full_history']
+
+
+def test_partition_lock_is_shared_per_partition(tmp_path):
+    store = OHLCVStore(root=str(tmp_path))
+    assert store.partition_lock('A.NS', '1d') is store.partition_lock('A.NS', '1d')
+    assert store.partition_lock('A.NS', '1d') is not store.partition_lock('A.NS', '5m')
+
+
+def test_concurrent_fetches_of_one_symbol_keep_every_bar(tmp_path):
+    full = SyntheticProvider(seed=4, history_bars=80, end='2024-12-31').history('RACE.NS', 'max')
+    fetcher = DataFetcher(provider=record(str(tmp_path / 'replay'), full, 'RACE.NS'))
+    fetcher.store = OHLCVStore(root=str(tmp_path / 'store'))
+    fetcher.store.enabled = True
+
+    threads = [threading.Thread(target=fetcher._fetch_history, args=('RACE.NS', 'max', '1d'))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stored, _ = fetcher.store.read('RACE.NS', '1d')
+    assert len(stored) == 80
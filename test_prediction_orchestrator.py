@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Tests for the parallel prediction orchestrator
+Predictors run in spawned worker processes that share the model registry;
+a model that overruns its timeout is reported without holding up the rest
+"""
+
+from utils.data_providers import SyntheticProvider
+from utils.engine import StockTrendEngine
+from utils.model_registry import ModelRegistry
+
+
+def test_parallel_predictions_stream_back_and_time_out(tmp_path):
+    data = SyntheticProvider(seed=4, history_bars=400, end='2024-12-31').history('ORCH.NS', 'max')
+    data.attrs.update(symbol='ORCH.NS', interval='1d')
+    engine = StockTrendEngine()
+    engine.model_registry = ModelRegistry(root=str(tmp_path))
+    engine.training_queue.enabled = False  # Cold models train inside the prediction workers
+    engine.orchestrator.max_workers = 2
+    engine.orchestrator.timeouts['Stacking'] = 1  # Its first-use training takes far longer
+
+    try:
+        results = {name: (result, error) for name, result, error, _ in
+                   engine.predict_many(['XGBoost', 'Prophet', 'Stacking'], data)}
+    finally:
+        engine.orchestrator.shutdown()
+
+    assert set(results) == {'XGBoost', 'Prophet', 'Stacking'}
+    assert results['Stacking'][0] is None and 'timed out' in results['Stacking'][1]
+    assert engine.orchestrator._pool is None  # The stuck worker's pool was discarded
+
+    # The worker registered the model it trained; this process loads it instead of retraining
+    xgb_result, xgb_error = results['XGBoost']
+    assert xgb_error is None
+    assert engine.predictor_for('XGBoost', data).is_trained
+    assert engine.predict('XGBoost', data) == xgb_result
+    assert results['Prophet'][1] is None and results['Prophet'][0]['direction'] in ('UP', 'DOWN', 'HOLD')
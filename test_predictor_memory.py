@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Memory tests for the predictor contract
+Predictors must treat their input as read-only, so a prediction round
+allocates no copies of the price frame
+"""
+
+import tracemalloc
+
+import pandas as pd
+
+from utils.data_providers import SyntheticProvider
+from utils.engine import StockTrendEngine
+from utils.frame_schema import compact_frame
+from utils.model_registry import ModelRegistry
+from utils.technical_indicators import TechnicalIndicators, FLAG_COLUMNS
+
+# Models that predict without a (slow) training run in this environment
+MODELS = ['XGBoost', 'LSTM', 'Prophet', 'Transformer', 'GRU']
+
+
+def prediction_round_peak(engine, data, copy_inputs=False):
+    """Peak traced allocation (bytes) while every model predicts on data"""
+    tracemalloc.start()
+    try:
+        for name in MODELS:
+            engine.predict(name, data.copy() if copy_inputs else data)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_prediction_round_allocates_no_input_copies(tmp_path):
+    history = SyntheticProvider(seed=2, history_bars=5000, end='2024-12-31').history('MEM.NS', 'max')
+    data = compact_frame(TechnicalIndicators().add_all_indicators(history), FLAG_COLUMNS)
+    data.attrs.update(symbol='MEM.NS', interval='1d')
+    engine = StockTrendEngine()
+    engine.model_registry = ModelRegistry(root=str(tmp_path))
+    engine.training_queue.enabled = False  # Train in-process, as the measurements expect
+    for name in MODELS:
+        engine.predict(name, data.iloc[:-2])  # Load models and compile kernels outside the measurement
+
+    columns, checksum = list(data.columns), pd.util.hash_pandas_object(data).sum()
+    # Each round sees a new bar, so features are rebuilt as they would be live
+    peak = prediction_round_peak(engine, data.iloc[:-1])
+    copying_peak = prediction_round_peak(engine, data, copy_inputs=True)
+
+    assert list(data.columns) == columns
+    assert pd.util.hash_pandas_object(data).sum() == checksum
+    assert peak < copying_peak - data.memory_usage(deep=True).sum() / 2
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests for OHLCV resampling
+Intraday buckets start at the 09:15 session open and each column is combined
+the way an exchange would build the coarser bar
+"""
+
+import pandas as pd
+
+from utils.data_providers import SyntheticProvider
+from utils.resampler import resample_ohlcv
+
+
+def session_bars(sessions=2):
+    provider = SyntheticProvider(seed=6, intraday_sessions=sessions, end='2024-12-20')
+    return provider.history('RESAMPLE.NS', period='max', interval='5m')
+
+
+def test_intraday_buckets_are_anchored_at_the_session_open():
+    bars = session_bars()
+    resampled = resample_ohlcv(bars, '15m')
+
+    first_day = resampled[resampled.index.normalize() == resampled.index[0].normalize()]
+    times = first_day.index.strftime('%H:%M')
+    assert times[0] == '09:15' and times[1] == '09:30' and times[-1] == '15:15'
+    assert len(resampled) == 2 * 25  # 09:15-15:30 is 25 fifteen-minute bars per session
+    assert (resample_ohlcv(bars, '1h').index.strftime('%H:%M')[:2] == ['09:15', '10:15']).all()
+
+
+def test_columns_are_aggregated_first_max_min_last_sum():
+    bars = session_bars()
+    resampled = resample_ohlcv(bars, '15m')
+
+    bucket = bars.iloc[3:6]  # 09:30, 09:35 and 09:40
+    bar = resampled.loc[bucket.index[0]]
+    assert bar['Open'] == bucket['Open'].iloc[0]
+    assert bar['High'] == bucket['High'].max()
+    assert bar['Low'] == bucket['Low'].min()
+    assert bar['Close'] == bucket['Close'].iloc[-1]
+    assert bar['Volume'] == bucket['Volume'].sum()
+
+
+def test_daily_bars_cover_each_whole_session():
+    bars = session_bars()
+    daily = resample_ohlcv(bars, '1d')
+
+    assert len(daily) == 2 and (daily.index == daily.index.normalize()).all()
+    session = bars[bars.index.normalize() == daily.index[-1]]
+    assert daily['Open'].iloc[-1] == session['Open'].iloc[0]
+    assert daily['Close'].iloc[-1] == session['Close'].iloc[-1]
+    assert daily['Volume'].iloc[-1] == session['Volume'].sum()
+
+
+def test_frames_already_at_the_interval_are_unchanged():
+    bars = session_bars()
+    assert resample_ohlcv(bars, '5m') is bars
+    assert resample_ohlcv(pd.DataFrame(), '15m').empty
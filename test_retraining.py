@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Tests for catching registered models up with new bars
+New bars warm-start the registered model; age and volatility drift force a
+full refit
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+
+import models.gru_model as gru_model
+import models.lstm_model as lstm_model
+from models.stacking_ensemble import StackingEnsemblePredictor
+from utils.data_providers import SyntheticProvider
+from utils.engine import StockTrendEngine
+from utils.model_registry import ModelRegistry
+from utils.retraining import RetrainPolicy, return_volatility
+
+
+def synthetic(bars=1200, seed=7):
+    data = SyntheticProvider(seed=seed, history_bars=bars, end='2024-12-31').history('INC.NS', 'max')
+    data.attrs.update(symbol='INC.NS', interval='1d')
+    return data
+
+
+def test_policy_keeps_updates_and_forces_refits():
+    data = synthetic(400)
+    policy = RetrainPolicy(max_model_age=30)
+    metadata = {'updates': 0, 'return_volatility': return_volatility(data)}
+    recent = data.index[-3]
+
+    assert policy.decide(metadata, data, 0, recent)[0] == 'keep'
+    assert policy.decide(metadata, data, 2, recent)[0] == 'update'
+    assert policy.decide(metadata, data, 2, recent, can_update=False)[0] == 'keep'
+    assert policy.decide(metadata, data, 2, data.index[-1] - pd.Timedelta(days=45))[0] == 'refit'
+    assert policy.decide(dict(metadata, updates=20), data, 2, recent)[0] == 'refit'
+    drifted = dict(metadata, return_volatility=metadata['return_volatility'] * 3)
+    action, reason = policy.decide(drifted, data, 2, recent)
+    assert action == 'refit' and 'drift' in reason
+
+
+def test_policy_thresholds_follow_the_bar_interval():
+    data = synthetic(400)
+    metadata = {'updates': 0, 'return_volatility': return_volatility(data)}
+    policy = RetrainPolicy()
+    daily, five_minute = policy.limits('1d'), policy.limits('5m')
+    assert daily[0] == 1 and five_minute[0] > 1 and five_minute[1] < daily[1]
+
+    intraday = data.copy()
+    intraday.attrs['interval'] = '5m'
+    recent = data.index[-1] - pd.Timedelta(days=1)
+    assert policy.decide(metadata, intraday, five_minute[0] - 1, recent)[0] == 'keep'
+    assert policy.decide(metadata, intraday, five_minute[0], recent)[0] == 'update'
+    stale = data.index[-1] - pd.Timedelta(days=five_minute[1] + 1)
+    assert policy.decide(metadata, intraday, five_minute[0], stale)[0] == 'refit'
+    assert policy.decide(metadata, data, 1, stale)[0] == 'update'
+
+
+def test_new_bars_warm_start_the_registered_model(tmp_path):
+    data = synthetic()
+    engine = StockTrendEngine()
+    engine.model_registry = ModelRegistry(root=str(tmp_path))
+    engine.training_queue.enabled = False
+
+    assert engine.train('XGBoost', data.iloc[:-3])
+    schema = engine.model_schemas['XGBoost']
+    [first] = engine.model_registry.cutoffs('XGBoost', 'INC.NS', '1d', schema)
+    base = engine.predictor_for('XGBoost', data)
+    base_rounds = base.model.num_boosted_rounds()
+    assert engine.retrain_action('XGBoost', data)[0] == 'update'
+
+    assert engine.train('XGBoost', data)
+    cutoffs = engine.model_registry.cutoffs('XGBoost', 'INC.NS', '1d', schema)
+    assert cutoffs == [first, engine.model_registry.format_cutoff(data.index[-1])]
+    metadata = engine.model_registry.metadata('XGBoost', 'INC.NS', '1d', schema, cutoffs[-1])
+    assert metadata['mode'] == 'incremental' and metadata['updates'] == 1 and metadata['new_bars'] == 3
+    assert metadata['full_fit_cutoff'] == first
+
+    updated = engine.predictor_for('XGBoost', data)
+    assert updated is not base and updated.model.num_boosted_rounds() > base_rounds
+    assert base.model.num_boosted_rounds() == base_rounds  # The registered entry was not touched
+    assert engine.retrain_action('XGBoost', data)[0] == 'keep'
+
+
+class StandInNetwork:
+    """Takes the place of the trained Keras network"""
+
+    def predict(self, X, verbose=0):
+        return np.array([[0.5]])
+
+
+@pytest.mark.parametrize('module', [lstm_model, gru_model])
+def test_sequence_models_keep_the_training_scaler(module, monkeypatch):
+    data = synthetic(600)
+    tuned = []
+    # Runs without Keras: the fine-tuning step only records the targets it is given
+    monkeypatch.setattr(module, 'fine_tune', lambda model, X, y, epochs, recent: tuned.append(y) or True)
+    if module is lstm_model:
+        predictor = lstm_model.LSTMPredictor()
+        predictor.tensorflow_available = True
+        prepare = predictor.prepare_lstm_data
+    else:
+        monkeypatch.setattr(gru_model, 'TENSORFLOW_AVAILABLE', True)
+        predictor = gru_model.GRUPredictor()
+        prepare = predictor.prepare_data
+
+    def train(window):
+        prepare(window)  # Fits the scaler, as training does
+        predictor.model = StandInNetwork()
+        predictor.is_trained = True
+        return True
+
+    monkeypatch.setattr(predictor, 'train', train)
+    predictor.predict(data.iloc[:400])  # Trains on first use
+    fitted = predictor.scaler.data_min_.copy(), predictor.scaler.data_max_.copy()
+
+    # Later predictions on longer windows, and the warm start, reuse the training scaler
+    prediction = predictor.predict(data)
+    np.testing.assert_array_equal(predictor.scaler.data_min_, fitted[0])
+    np.testing.assert_array_equal(predictor.scaler.data_max_, fitted[1])
+    assert prediction['predicted_price'] == pytest.approx((fitted[0][0] + fitted[1][0]) / 2)
+
+    assert predictor.update(data) is True
+    np.testing.assert_array_equal(predictor.scaler.data_min_, fitted[0])
+    np.testing.assert_array_equal(predictor.scaler.data_max_, fitted[1])
+    columns = list(predictor.scaler.feature_names_in_)
+    scaled = predictor.scaler.transform(data[columns].ffill().bfill())
+    np.testing.assert_allclose(tuned[0][-1], scaled[-1, columns.index('Close')])
+
+
+def test_stacking_update_hands_over_to_a_refit_once_the_bases_are_capped():
+    data = synthetic(400)
+    predictor = StackingEnsemblePredictor()
+    features = predictor.prepare_features(data)
+    target = predictor.create_target(data)
+    index = features.index.intersection(target.index)
+    X = pd.DataFrame(predictor.scaler.fit_transform(features.loc[index]),
+                     columns=features.columns, index=index)
+    # A small boosted base stands in for the full fit, which takes too long here
+    model = xgb.XGBRegressor(n_estimators=20, max_depth=2)
+    model.fit(X, target.loc[index])
+    predictor.base_models = {'xgb': model}
+    predictor.is_trained = True
+
+    assert predictor.update(data) is True
+    assert model.get_booster().num_boosted_rounds() == predictor.MAX_TREE_GROWTH * 20
+    assert predictor.update(data) is None  # Nothing can grow, so the engine refits
+    assert model.get_booster().num_boosted_rounds() == predictor.MAX_TREE_GROWTH * 20
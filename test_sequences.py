@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Tests for the sliding-window sequence builder
+Window views must hold the same pairs the old append loops built, without copying
+"""
+
+import numpy as np
+import pytest
+
+from utils.sequences import sliding_windows, make_sequences, sequence_batches
+
+
+def loop_sequences(values, targets, length):
+    X, y = [], []
+    for i in range(length, len(values)):
+        X.append(values[i - length:i])
+        y.append(targets[i])
+    return np.array(X), np.array(y)
+
+
+@pytest.mark.parametrize('rows', [5, 60, 61, 500])
+def test_make_sequences_matches_loop_without_copying(rows):
+    values = np.random.default_rng(0).normal(size=(rows, 4))
+    X, y = make_sequences(values, values[:, 0], 60)
+    expected_X, expected_y = loop_sequences(values, values[:, 0], 60)
+
+    assert X.shape == (max(rows - 60, 0), 60, 4)
+    np.testing.assert_array_equal(X.reshape(-1, 4), expected_X.reshape(-1, 4))
+    np.testing.assert_array_equal(y, expected_y)
+    if len(X):
+        assert np.shares_memory(X, values)
+
+
+def test_sliding_windows_accepts_series():
+    windows = sliding_windows(np.arange(10.0), 3)
+    assert windows.shape == (8, 3, 1)
+    np.testing.assert_array_equal(windows[-1, :, 0], [7.0, 8.0, 9.0])
+
+
+def test_sequence_batches_gather_each_batch():
+    pytest.importorskip('keras')
+    values = np.arange(200.0).reshape(100, 2)
+    X, y = make_sequences(values, values[:, 0], 10)
+    batches = sequence_batches(X, y, batch_size=32)
+    assert len(batches) == 3
+    batch_X, batch_y = batches[2]
+    np.testing.assert_array_equal(batch_X, X[64:90])
+    np.testing.assert_array_equal(batch_y, y[64:90])
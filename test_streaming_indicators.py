@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Parity tests for the streaming indicator engine
+Streaming updates must reproduce TechnicalIndicators.add_all_indicators
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.data_providers import SyntheticProvider
+from utils.technical_indicators import TechnicalIndicators
+from utils.streaming_indicators import StreamingIndicators, IndicatorStream, INDICATOR_COLUMNS
+from utils.frame_schema import compact_frame
+
+
+def make_history(bars=600, symbol='RELIANCE.NS'):
+    provider = SyntheticProvider(seed=7, history_bars=bars, end='2024-12-31')
+    return provider.history(symbol, 'max')
+
+
+def assert_frames_match(expected, actual, columns):
+    for column in columns:
+        np.testing.assert_allclose(actual[column].to_numpy(dtype=float),
+                                   expected[column].to_numpy(dtype=float),
+                                   rtol=1e-7, atol=1e-7, equal_nan=True, err_msg=column)
+
+
+def test_streaming_matches_batch_from_first_bar():
+    data = make_history()
+    batch = TechnicalIndicators().add_all_indicators(data)
+
+    indicators = StreamingIndicators()
+    streamed = pd.DataFrame([indicators.update(bar) for _, bar in data.iterrows()], index=data.index)
+
+    assert_frames_match(batch, streamed, INDICATOR_COLUMNS)
+
+
+def test_warm_up_then_update_matches_batch():
+    data = make_history()
+    batch = TechnicalIndicators().add_all_indicators(data)
+
+    indicators = StreamingIndicators()
+    warm = indicators.warm_up(data.iloc[:400])
+    streamed = pd.DataFrame([indicators.update(bar) for _, bar in data.iloc[400:].iterrows()],
+                            index=data.index[400:])
+
+    assert_frames_match(batch.iloc[:400], warm, INDICATOR_COLUMNS)
+    assert_frames_match(batch.iloc[400:], streamed, INDICATOR_COLUMNS)
+
+
+def test_indicator_stream_refresh_handles_new_and_revised_bars():
+    data = make_history()
+    stream = IndicatorStream()
+    stream.refresh(data.iloc[:500])
+
+    # New bars arrive and the previously forming bar gets its final values
+    revised = data.iloc[:520].copy()
+    revised.iloc[499, revised.columns.get_loc('Close')] *= 1.01
+    frame = stream.refresh(revised)
+
+    expected = TechnicalIndicators().add_all_indicators(revised)
+    assert list(frame.columns) == list(expected.columns)
+    assert_frames_match(expected, frame, expected.columns)
+
+
+def test_indicator_stream_rebuilds_when_the_window_slides():
+    data = make_history()
+    stream = IndicatorStream()
+    stream.refresh(data.iloc[:500])
+
+    # The oldest bars drop out as new ones arrive: OBV/VWAP must not keep counting them
+    window = data.iloc[5:503]
+    frame = stream.refresh(window)
+
+    expected = TechnicalIndicators().add_all_indicators(window)
+    assert frame.index[0] == window.index[0] and len(frame) == len(window)
+    assert_frames_match(expected, frame, expected.columns)
+
+
+def test_compact_stream_keeps_float32_and_int8_columns():
+    history = make_history()
+    data = compact_frame(history, downcast_floats=False)  # As DataFetcher hands it over
+    stream = IndicatorStream(compact=True)
+    stream.refresh(data.iloc[:500])
+    frame = stream.refresh(data.iloc[:520])
+
+    expected = TechnicalIndicators().add_all_indicators(history.iloc[:520])
+    assert 'Dividends' not in frame.columns and stream.indicators.bars == 519
+    assert frame['Close'].dtype == np.float32 and frame['RSI_Overbought'].dtype == np.int8
+    assert frame.memory_usage(deep=True).sum() < expected.memory_usage(deep=True).sum() / 2
+    for column in INDICATOR_COLUMNS:
+        np.testing.assert_allclose(frame[column].to_numpy(dtype=float), expected[column].to_numpy(dtype=float),
+                                   rtol=1e-6, equal_nan=True, err_msg=column)
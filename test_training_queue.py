@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Tests for background training
+A cold symbol is answered with the model's fallback straight away, its
+model trains once in a worker process and is swapped in when done
+"""
+
+import time
+
+from utils.data_providers import SyntheticProvider
+from utils.engine import StockTrendEngine
+from utils.model_registry import ModelRegistry
+
+
+def test_cold_symbol_serves_fallback_then_trained_model(tmp_path):
+    data = SyntheticProvider(seed=5, history_bars=400, end='2024-12-31').history('COLD.NS', 'max')
+    data.attrs.update(symbol='COLD.NS', interval='1d')
+    engine = StockTrendEngine()
+    engine.model_registry = ModelRegistry(root=str(tmp_path))
+    queue = engine.training_queue
+    queue.enabled = True
+
+    try:
+        assert engine.predict('XGBoost', data)['model_type'] == 'XGBoost (Fallback)'
+        assert engine.predict('XGBoost', data)['model_type'] == 'XGBoost (Fallback)'
+        assert len(queue.jobs) == 1  # The second request joined the queued job
+
+        deadline = time.time() + 120
+        while queue.active() and time.time() < deadline:
+            time.sleep(0.2)
+        [job] = queue.status()
+        assert job['status'] == 'done', job['error']
+        assert queue.generation == 1
+
+        assert engine.predict('XGBoost', data)['model_type'] == 'XGBoost (Gradient Boosting)'
+        assert engine.model_registry.cutoffs('XGBoost', 'COLD.NS', '1d', engine.model_schemas['XGBoost'])
+    finally:
+        queue.shutdown()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for the gradient-boosted XGBoost predictor
+Direction and return boosters are early-stopped on the most recent bars,
+warm starts boost on the newest bars too, and the boosters survive the
+pickling the model registry does
+"""
+
+import pickle
+
+import numpy as np
+import pytest
+import xgboost as xgb
+
+from models.xgboost_model import XGBoostPredictor
+from utils.retraining import INCREMENTAL_CONFIG
+from utils.data_providers import SyntheticProvider
+from utils.technical_indicators import TechnicalIndicators
+
+
+def test_boosters_train_early_stop_and_round_trip():
+    history = SyntheticProvider(seed=6, history_bars=1500, end='2024-12-31').history('XGB.NS', 'max')
+    data = TechnicalIndicators().add_all_indicators(history)
+    predictor = XGBoostPredictor()
+
+    accuracy = predictor.train(data)
+    assert accuracy is not None and 0 <= accuracy <= 1
+    for booster in (predictor.model, predictor.regressor):
+        assert 1 <= booster.num_boosted_rounds() <= predictor.config['n_estimators']
+
+    result = predictor.predict(data)
+    assert result['model_type'] == 'XGBoost (Gradient Boosting)'
+    assert result['direction'] == ('UP' if result['up_probability'] > 0.5 else 'DOWN')
+    assert result['predicted_price'] == pytest.approx(data['Close'].iloc[-1] * (1 + result['predicted_return']))
+
+    restored = pickle.loads(pickle.dumps(predictor))
+    assert restored.predict(data) == result
+
+
+def test_update_boosts_on_the_whole_window_including_the_newest_bars(monkeypatch):
+    history = SyntheticProvider(seed=7, history_bars=800, end='2024-12-31').history('XGB.NS', 'max')
+    data = TechnicalIndicators().add_all_indicators(history)
+    predictor = XGBoostPredictor()
+    assert predictor.train(data.iloc[:-20]) is not None
+    rounds = predictor.model.num_boosted_rounds(), predictor.regressor.num_boosted_rounds()
+
+    newest, _, _ = predictor.training_set(data)
+    newest = xgb.DMatrix(newest.iloc[-20:].to_numpy(dtype=np.float32), feature_names=list(newest.columns))
+    before = predictor.model.predict(newest), predictor.regressor.predict(newest)
+
+    trained_rows = []
+    train = xgb.train
+
+    def recording_train(params, dtrain, *args, **kwargs):
+        trained_rows.append((dtrain.num_row(), kwargs.get('evals')))
+        return train(params, dtrain, *args, **kwargs)
+
+    monkeypatch.setattr(xgb, 'train', recording_train)
+    assert predictor.update(data) is not None
+
+    # Both boosters see every bar of the window, with nothing held out for early stopping
+    assert trained_rows == [(INCREMENTAL_CONFIG['window'], None)] * 2
+    extra = INCREMENTAL_CONFIG['boost_rounds']
+    assert predictor.model.num_boosted_rounds() == rounds[0] + extra
+    assert predictor.regressor.num_boosted_rounds() == rounds[1] + extra
+    assert not np.allclose(predictor.model.predict(newest), before[0])
+    assert not np.allclose(predictor.regressor.predict(newest), before[1])
@@ -8,11 +8,16 @@ from scipy import stats
 import warnings
 warnings.filterwarnings('ignore')
 
+from utils.cache import LRUCache
+from config.settings import CACHE_CONFIG, DATA_CONFIG
+
 class AdvancedAnalytics:
     """Advanced analytics and visualization tools for stock analysis"""
     
     def __init__(self):
-        self.analysis_cache = {}
+        self.analysis_cache = LRUCache(max_bytes=CACHE_CONFIG['analysis']['max_bytes'],
+                                       max_entries=CACHE_CONFIG['analysis']['max_entries'],
+                                       default_ttl=DATA_CONFIG['cache_duration'], name='analysis')
     
     def calculate_volatility_analysis(self, stock_data):
         """Calculate volatility analysis for stock data"""
@@ -38,11 +43,19 @@ class AdvancedAnalytics:
     
     def perform_correlation_analysis(self, data_fetcher, symbols, period='3mo'):
         """Perform correlation analysis between multiple stocks"""
+        cache_key = f"correlation_{'_'.join(sorted(symbols))}_{period}"
+        cached = self.analysis_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         price_data = {}
         
+        # Fetch all symbols concurrently (rate limited by the fetch executor)
+        fetched = data_fetcher.fetch_parallel(symbols, period)
+        
         for symbol in symbols:
             try:
-                data = data_fetcher.get_stock_data(symbol, period)
+                data = fetched.get(symbol)
                 if data is not None and not data.empty:
                     price_data[symbol] = data['Close'].pct_change().dropna()
             except Exception as e:
@@ -55,11 +68,14 @@ class AdvancedAnalytics:
         correlation_df = pd.DataFrame(price_data)
         correlation_matrix = correlation_df.corr()
         
-        return {
+        result = {
             'correlation_matrix': correlation_matrix,
             'price_data': price_data,
             'returns_data': correlation_df
         }
+        self.analysis_cache.set(cache_key, result)
+        
+        return result
     
     def calculate_risk_metrics(self, returns_data, risk_free_rate=0.06):
         """Calculate comprehensive risk metrics"""
@@ -0,0 +1,179 @@
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def estimate_size(value):
+    """Approximate memory footprint of a cached value in bytes"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def frame_fingerprint(data, columns=None):
+    """Content key for a price frame (optionally just some of its columns).
+
+    Frames tagged by DataFetcher (``attrs['symbol']`` and ``attrs['interval']``)
+    are identified by symbol, interval, row count, first/last timestamps and
+    the values of their first and last rows - enough to notice the forming
+    bar ticking or history being re-adjusted without reading every row.
+    Untagged frames fall back to hashing every value.
+    """
+    if columns is not None:
+        data = data[list(columns)]
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((data.attrs.get('symbol'), data.attrs.get('interval'), len(data),
+                        tuple(data.columns))).encode())
+    if len(data):
+        digest.update(repr((data.index[0], data.index[-1])).encode())
+        if data.attrs.get('symbol'):
+            edges = data.select_dtypes(include='number').iloc[[0, -1]]
+            digest.update(np.ascontiguousarray(edges.to_numpy(dtype=float)).tobytes())
+        else:
+            digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """Thread-safe LRU cache with per-entry TTLs and a memory budget.
+
+    Entry sizes are measured with ``estimate_size`` (``memory_usage(deep=True)``
+    for DataFrames); least recently used entries are evicted once the total
+    exceeds ``max_bytes`` or the entry count exceeds ``max_entries``.
+    """
+
+    def __init__(self, max_bytes=None, max_entries=None, default_ttl=None, name='cache'):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.name = name
+
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+        self._lock = threading.RLock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejections = 0
+
+    def get(self, key, default=None):
+        """Return a live entry and mark it most recently used, default otherwise"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, _, expires_at = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Store a value for ttl seconds (default_ttl if None), evicting LRU entries to fit"""
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        size = estimate_size(value)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            # An entry bigger than the whole budget would just flush everything else
+            if self.max_bytes is not None and size > self.max_bytes:
+                self.rejections += 1
+                return False
+
+            self._entries[key] = (value, size, expires_at)
+            self.current_bytes += size
+            self._evict()
+            return True
+
+    def delete(self, key):
+        """Remove one entry if present"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def delete_prefix(self, prefixes):
+        """Remove every entry whose (string) key starts with one of the prefixes"""
+        with self._lock:
+            for key in [k for k in self._entries if str(k).startswith(prefixes)]:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and (entry[2] is None or time.monotonic() < entry[2])
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self):
+        """Hit/miss/eviction counters and current usage"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'rejections': self.rejections
+            }
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def _evict(self):
+        """Drop expired entries first, then least recently used ones until within budget"""
+        if not self._over_budget():
+            return
+
+        now = time.monotonic()
+        for key in [k for k, (_, _, expires_at) in self._entries.items()
+                    if expires_at is not None and now >= expires_at]:
+            self._remove(key)
+            self.expirations += 1
+
+        while self._entries and self._over_budget():
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def _over_budget(self):
+        if self.max_bytes is not None and self.current_bytes > self.max_bytes:
+            return True
+        return self.max_entries is not None and len(self._entries) > self.max_entries
@@ -1,33 +1,55 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import time
 
+from utils.cache import LRUCache
+from utils.data_providers import create_provider
+from utils.market_calendar import MarketCalendar
+from utils.resampler import resample_ohlcv, interval_timedelta
+from utils.ohlcv_store import OHLCVStore, SESSION_PERIODS
+from utils.fetch_executor import FetchExecutor, SingleFlight
+from utils.frame_schema import compact_frame, snapshot
+from config.settings import DATA_CONFIG, CACHE_CONFIG
+
+# Periods accepted by yfinance
+VALID_PERIODS = ['1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max']
+
 class DataFetcher:
     """Data fetcher for Indian stock market data using yFinance"""
     
-    def __init__(self):
-        self.cache = {}
+    def __init__(self, provider=None):
+        # Where bars come from: live yfinance by default, or replay/synthetic for offline runs
+        self.provider = provider or create_provider()
         self.cache_duration = 300  # 5 minutes cache for most data
         self.short_cache_duration = 60  # 1 minute cache for real-time data
+        self.calendar = MarketCalendar()  # Off-hours entries stay valid until the next session
+        # Bounded LRU shared between sessions; TTL is set per entry
+        self.cache = LRUCache(max_bytes=CACHE_CONFIG['data']['max_bytes'],
+                              max_entries=CACHE_CONFIG['data']['max_entries'],
+                              default_ttl=self.cache_duration, name='data')
+        self.store = OHLCVStore()  # Persistent history, topped up with delta downloads
+        if not self.provider.remote:
+            self.store.enabled = False  # Offline providers must not leak into the real store
+        self.executor = FetchExecutor()  # Rate limiting, backoff and circuit breaking for upstream calls
+        self.single_flight = SingleFlight()  # De-duplicates identical in-flight requests across sessions
+    
+    def clear_cache(self, symbol=None):
+        """Clear cached data for a symbol, or the whole cache when symbol is None"""
+        if symbol is None:
+            self.cache.clear()
+            return
+        self.cache.delete_prefix((f"{symbol}_", f"{symbol}.NS_"))
     
     def get_stock_data(self, symbol, period="1y", interval="1d"):
         """Fetch stock data from Yahoo Finance for Indian stocks"""
         try:
             # Handle different symbol formats
             original_symbol = symbol
-            
-            # Don't modify symbols that already have proper formatting
-            if symbol.startswith('^') or symbol.endswith('.NS') or symbol.endswith('.BO'):
-                # Keep the symbol as is for indices and already formatted symbols
-                pass
-            else:
-                # Add .NS suffix for NSE stocks
-                symbol = symbol + '.NS'
+            symbol = self._normalize_symbol(symbol)
             
             # Map period to correct yfinance parameters
-            valid_periods = ['1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max']
+            valid_periods = VALID_PERIODS
             
             # Determine appropriate interval and period based on user selection
             if period == '1d':
@@ -46,100 +68,19 @@ class DataFetcher:
                 period = '1y'
                 interval = '1d'
             
-            # Check cache with appropriate duration
+            # Check cache
             cache_key = f"{symbol}_{period}_{interval}"
-            current_time = time.time()
-            
-            # Use shorter cache duration for intraday data
-            cache_duration = self.short_cache_duration if period in ['1d', '5d'] else self.cache_duration
-            
-            if (cache_key in self.cache and 
-                current_time - self.cache[cache_key]['timestamp'] < cache_duration):
-                return self.cache[cache_key]['data']
-            
-            # Download data with timeout and retry logic
-            ticker = yf.Ticker(symbol)
-            
-            max_retries = 3
-            data = None
-            
-            for attempt in range(max_retries):
-                try:
-                    # Validate period and interval combination
-                    if period not in valid_periods:
-                        print(f"Invalid period: {period}, using default 1y")
-                        period = '1y'
-                        interval = '1d'
-                    
-                    # Download data with proper error handling
-                    data = ticker.history(period=period, interval=interval, timeout=10)
-                    
-                    if not data.empty:
-                        break
-                    else:
-                        print(f"Empty data for {symbol} with period {period} and interval {interval}")
-                        
-                except Exception as e:
-                    print(f"Attempt {attempt + 1} failed for {symbol}: {str(e)}")
-                    if attempt == max_retries - 1:
-                        # Try with default parameters as fallback
-                        try:
-                            data = ticker.history(period='1y', interval='1d', timeout=10)
-                            if not data.empty:
-                                print(f"Fallback successful for {symbol}")
-                                break
-                        except Exception as e:
-                            print(f"Fallback failed for {symbol}: {e}")
-                            continue
-                    time.sleep(1)  # Wait 1 second before retry
-            
-            if data is None or data.empty:
-                print(f"No data found for symbol: {symbol} after all attempts")
-                return None
-            
-            # Clean and prepare data
-            data = data.reset_index()
-            
-            # Handle different column names for date/datetime index
-            date_column = None
-            for col in ['Date', 'Datetime']:
-                if col in data.columns:
-                    date_column = col
-                    break
-            
-            if date_column:
-                data[date_column] = pd.to_datetime(data[date_column])
-                data.set_index(date_column, inplace=True)
-            else:
-                # If no date column found, use the existing index
-                data.index = pd.to_datetime(data.index)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
             
-            # Remove any duplicate indices
-            data = data[~data.index.duplicated(keep='first')]
+            # Intraday views are derived from one shared download of the finest bars
+            if period in ['1d', '5d']:
+                return self.get_intraday_data(symbol, period, interval)
             
-            # Sort by date
-            data = data.sort_index()
-            
-            # Forward fill any missing values
-            data = data.ffill()
-            
-            # Remove rows with all NaN values
-            data = data.dropna(how='all')
-            
-            # Ensure we have the required columns
-            required_columns = ['Open', 'High', 'Low', 'Close', 'Volume']
-            for col in required_columns:
-                if col not in data.columns:
-                    print(f"Missing required column: {col}")
-                    return None
-            
-            # Cache the data
-            self.cache[cache_key] = {
-                'data': data.copy(),
-                'timestamp': current_time
-            }
-            
-            return data
+            # Concurrent callers for the same key share one download
+            return self.single_flight.do(cache_key, self._download_and_cache,
+                                         symbol, period, interval, cache_key, self.cache_ttl())
             
         except Exception as e:
             print(f"Error fetching data for {symbol}: {str(e)}")
@@ -150,36 +91,13 @@ class DataFetcher:
                     # Try without the ^ prefix
                     alternative_symbol = original_symbol[1:] + '.NS'
                     print(f"Trying alternative symbol: {alternative_symbol}")
-                    ticker = yf.Ticker(alternative_symbol)
-                    data = ticker.history(period=period, interval=interval)
+                    data = self._history(alternative_symbol, period=period, interval=interval)
                     
                     if not data.empty:
-                        # Clean and prepare data (same logic as above)
-                        data = data.reset_index()
-                        
-                        # Handle different column names for date/datetime index
-                        date_column = None
-                        for col in ['Date', 'Datetime']:
-                            if col in data.columns:
-                                date_column = col
-                                break
-                        
-                        if date_column:
-                            data[date_column] = pd.to_datetime(data[date_column])
-                            data.set_index(date_column, inplace=True)
-                        else:
-                            # If no date column found, use the existing index
-                            data.index = pd.to_datetime(data.index)
-                        data = data[~data.index.duplicated(keep='first')]
-                        data = data.sort_index()
-                        data = data.ffill()
-                        data = data.dropna(how='all')
+                        data = self._tag(self._clean_history(data), original_symbol, interval)
                         
                         cache_key = f"{original_symbol}_{period}_{interval}"
-                        self.cache[cache_key] = {
-                            'data': data.copy(),
-                            'timestamp': time.time()
-                        }
+                        self.cache.set(cache_key, snapshot(data), ttl=self.cache_ttl(intraday=period in ['1d', '5d']))
                         return data
                         
                 except Exception as e2:
@@ -187,14 +105,270 @@ class DataFetcher:
             
             return None
     
+    def get_intraday_data(self, symbol, period="1d", interval="15m"):
+        """Intraday bars derived locally from the shared finest-interval download.
+        
+        The DATA_CONFIG['intraday_base'] bars (5m over 5d) are fetched once per
+        symbol; any coarser interval (15m/30m/1h/1d) and any period inside the
+        base window is sliced and resampled from them without a network call.
+        Finer intervals and longer periods are downloaded as requested.
+        """
+        symbol = self._normalize_symbol(symbol)
+        cache_key = f"{symbol}_{period}_{interval}"
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        base_period = DATA_CONFIG['intraday_base']['period']
+        base_interval = DATA_CONFIG['intraday_base']['interval']
+        finer = interval_timedelta(interval) < interval_timedelta(base_interval)
+        longer = SESSION_PERIODS.get(period, float('inf')) > SESSION_PERIODS.get(base_period, 0)
+        if finer or longer:
+            # The base bars cannot cover this view - download it directly
+            base_period, base_interval = period, interval
+        
+        cache_duration = self.cache_ttl(intraday=True)
+        base_key = f"{symbol}_{base_period}_{base_interval}"
+        base = self.cache.get(base_key)
+        if base is None:
+            base = self.single_flight.do(base_key, self._download_and_cache,
+                                         symbol, base_period, base_interval, base_key, cache_duration)
+        if base is None or base.empty:
+            return base
+        
+        data = self._tag(resample_ohlcv(self.store.slice_period(base, period), interval), symbol, interval)
+        self.cache.set(cache_key, snapshot(data), ttl=cache_duration)
+        return data
+    
+    def _tag(self, data, symbol, interval):
+        """Drop unused columns and record which symbol and bar interval a frame holds"""
+        if data is not None:
+            # Prices stay float64: indicators are computed from them and downcast afterwards
+            data = compact_frame(data, downcast_floats=False)
+            data.attrs['symbol'] = symbol  # Read by frame_fingerprint
+            data.attrs['interval'] = interval
+        return data
+    
+    def cache_ttl(self, intraday=False):
+        """Cache lifetime for data fetched now: short/normal while the market is live, until the next open otherwise"""
+        return self.calendar.cache_ttl(self.short_cache_duration if intraday else self.cache_duration)
+    
+    def _normalize_symbol(self, symbol):
+        """Map a plain NSE ticker to its Yahoo Finance symbol"""
+        # Don't modify symbols that already have proper formatting (indices, .NS/.BO)
+        if symbol.startswith('^') or symbol.endswith('.NS') or symbol.endswith('.BO'):
+            return symbol
+        # Add .NS suffix for NSE stocks
+        return symbol + '.NS'
+    
+    def get_many(self, symbols, period="5d", interval="1d"):
+        """Fetch many symbols with batched multi-ticker downloads.
+        
+        Fresh entries come from the per-symbol cache; the rest are downloaded in
+        groups of DATA_CONFIG['download_batch_size'] tickers per request and
+        written back to the cache. Returns a {symbol: DataFrame} mapping keyed by
+        the symbols as passed in; symbols without data are left out.
+        """
+        if period not in VALID_PERIODS:
+            period = '1y'
+            interval = '1d'
+        
+        cache_duration = self.cache_ttl(intraday=interval != '1d' or period in ['1d', '5d'])
+        
+        results = {}
+        pending = {}  # Yahoo symbol -> symbol as requested
+        
+        for symbol in symbols:
+            yf_symbol = self._normalize_symbol(symbol)
+            cached = self.cache.get(f"{yf_symbol}_{period}_{interval}")
+            if cached is not None:
+                results[symbol] = cached
+            else:
+                pending[yf_symbol] = symbol
+        
+        yf_symbols = list(pending)
+        batch_size = DATA_CONFIG['download_batch_size']
+        required_columns = ['Open', 'High', 'Low', 'Close', 'Volume']
+        
+        for start in range(0, len(yf_symbols), batch_size):
+            batch = yf_symbols[start:start + batch_size]
+            try:
+                # A multi-ticker download costs one upstream request per ticker
+                frames = self._call(self.provider.download, batch, tokens=len(batch),
+                                    period=period, interval=interval)
+            except Exception as e:
+                print(f"Batch download failed for {len(batch)} symbols: {str(e)}")
+                continue
+            
+            for yf_symbol, frame in frames.items():
+                try:
+                    data = self._clean_history(frame)
+                    if data is None or data.empty:
+                        continue
+                    if any(col not in data.columns for col in required_columns):
+                        continue
+                    
+                    data = self._tag(data, yf_symbol, interval)
+                    self.cache.set(f"{yf_symbol}_{period}_{interval}", snapshot(data), ttl=cache_duration)
+                    results[pending[yf_symbol]] = data
+                    
+                except Exception as e:
+                    print(f"Error processing batched data for {yf_symbol}: {str(e)}")
+        
+        return results
+    
+    def _download_and_cache(self, symbol, period, interval, cache_key, cache_duration):
+        """Download, validate and cache one symbol's history (run once per in-flight key)"""
+        # Download data; retries with jittered backoff happen inside the fetch executor
+        data = None
+        
+        try:
+            # Only the bars missing from the local store are downloaded
+            data = self._fetch_history(symbol, period, interval)
+            
+            if data is None or data.empty:
+                print(f"Empty data for {symbol} with period {period} and interval {interval}")
+                
+        except Exception as e:
+            print(f"Fetching {symbol} failed after retries: {str(e)}")
+            # Try with default parameters as fallback
+            try:
+                data = self._clean_history(self._history(symbol, period='1y', interval='1d'))
+                interval = '1d'
+                if data is not None and not data.empty:
+                    print(f"Fallback successful for {symbol}")
+            except Exception as e:
+                print(f"Fallback failed for {symbol}: {e}")
+        
+        if data is None or data.empty:
+            print(f"No data found for symbol: {symbol} after all attempts")
+            return None
+        
+        # Ensure we have the required columns
+        required_columns = ['Open', 'High', 'Low', 'Close', 'Volume']
+        for col in required_columns:
+            if col not in data.columns:
+                print(f"Missing required column: {col}")
+                return None
+        
+        # Cache the data
+        data = self._tag(data, symbol, interval)
+        self.cache.set(cache_key, snapshot(data), ttl=cache_duration)
+        
+        return data
+    
+    def _call(self, func, *args, tokens=1, **kwargs):
+        """Run a provider call; remote ones are rate limited, retried and circuit broken"""
+        if self.provider.remote:
+            return self.executor.call(func, *args, tokens=tokens, **kwargs)
+        return func(*args, **kwargs)
+    
+    def _history(self, symbol, **kwargs):
+        """Price history for a symbol from the provider"""
+        return self._call(self.provider.history, symbol, **kwargs)
+    
+    def _info(self, symbol):
+        """Info lookup for a symbol, shared by concurrent callers"""
+        return self.single_flight.do(f"{symbol}_info", self._call, self.provider.info, symbol)
+    
+    def fetch_parallel(self, symbols, period="1y"):
+        """Fetch several symbols concurrently on the fetch pool; returns {symbol: DataFrame or None}"""
+        return self.executor.map(lambda symbol: self.get_stock_data(symbol, period), symbols)
+    
+    def _clean_history(self, data):
+        """Normalise a raw yfinance history frame (datetime index, sorted, gap-filled)"""
+        if data is None or data.empty:
+            return data
+        
+        data = data.reset_index()
+        
+        # Handle different column names for date/datetime index
+        date_column = None
+        for col in ['Date', 'Datetime']:
+            if col in data.columns:
+                date_column = col
+                break
+        
+        if date_column:
+            data[date_column] = pd.to_datetime(data[date_column])
+            data.set_index(date_column, inplace=True)
+        else:
+            # If no date column found, use the existing index
+            data.index = pd.to_datetime(data.index)
+        
+        # Remove any duplicate indices
+        data = data[~data.index.duplicated(keep='first')]
+        
+        # Sort by date
+        data = data.sort_index()
+        
+        # Forward fill any missing values
+        data = data.ffill()
+        
+        # Remove rows with all NaN values
+        data = data.dropna(how='all')
+        
+        return data
+    
+    def _fetch_history(self, symbol, period, interval):
+        """Fetch cleaned history, downloading only bars newer than the persistent store"""
+        if not self.store.enabled:
+            return self._clean_history(self._history(symbol, period=period, interval=interval))
+        
+        # Concurrent fetches of one symbol would otherwise each merge into the same stored
+        # bars and the last write would drop the others' delta
+        with self.store.partition_lock(symbol, interval):
+            return self._fetch_into_store(symbol, period, interval)
+    
+    def _fetch_into_store(self, symbol, period, interval):
+        """Top up the stored partition for a symbol (caller holds its partition lock)"""
+        stored, metadata = self.store.read(symbol, interval)
+        
+        if self.store.covers(stored, metadata, period):
+            # Re-download from the last stored bar (it may still have been forming) onwards
+            last_bar = stored.index[-1]
+            start = last_bar.normalize() if interval == '1d' else last_bar
+            delta = self._clean_history(self._history(symbol, start=start, interval=interval))
+            
+            if delta is None or delta.empty:
+                return self.store.slice_period(stored, period)
+            
+            merged = self.store.merge(stored, delta)
+            self.store.write(symbol, interval, merged, metadata)
+            return self.store.slice_period(merged, period)
+        
+        # Cold partition (or not enough history): download the whole period once
+        data = self._clean_history(self._history(symbol, period=period, interval=interval))
+        if data is None or data.empty:
+            return data
+        
+        now = pd.Timestamp.now(tz=data.index.tz)
+        coverage_start = self.store.period_start(period, now)
+        if coverage_start is None:
+            coverage_start = data.index[0].normalize()
+        new_metadata = {
+            'coverage_start': coverage_start.isoformat(),
+            'full_history': period == 'max'
+        }
+        
+        # Keep older stored bars only when they join up with the fresh download
+        if stored is not None and not stored.empty and stored.index[-1] >= data.index[0]:
+            if metadata.get('coverage_start'):
+                new_metadata['coverage_start'] = min(pd.Timestamp(metadata['coverage_start']),
+                                                     coverage_start).isoformat()
+            new_metadata['full_history'] = new_metadata['full_history'] or metadata.get('full_history', False)
+            data = self.store.merge(stored, data)
+        
+        self.store.write(symbol, interval, data, new_metadata)
+        return self.store.slice_period(data, period)
+    
     def get_real_time_price(self, symbol):
         """Get real-time price for a stock"""
         try:
             if not symbol.endswith('.NS') and not symbol.endswith('.BO'):
                 symbol = symbol + '.NS'
             
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
+            info = self._info(symbol)
             
             return {
                 'current_price': info.get('currentPrice', 0),
@@ -218,8 +392,7 @@ class DataFetcher:
             if not symbol.endswith('.NS') and not symbol.endswith('.BO'):
                 symbol = symbol + '.NS'
             
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
+            info = self._info(symbol)
             
             return {
                 'name': info.get('longName', symbol),
@@ -242,8 +415,7 @@ class DataFetcher:
             if not symbol.endswith('.NS') and not symbol.endswith('.BO'):
                 symbol = symbol + '.NS'
             
-            ticker = yf.Ticker(symbol)
-            data = ticker.history(start=start_date, end=end_date)
+            data = self._history(symbol, start=start_date, end=end_date)
             
             if data.empty:
                 return None
@@ -265,8 +437,7 @@ class DataFetcher:
             if not symbol.endswith('.NS') and not symbol.endswith('.BO'):
                 symbol = symbol + '.NS'
             
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
+            info = self._info(symbol)
             
             # Check if we get valid info
             return 'longName' in info or 'shortName' in info
@@ -281,12 +452,14 @@ class DataFetcher:
         
         summary = {}
         
+        # One batched download for all index ETFs instead of a request per symbol
+        indices_data = self.get_many(list(INDIAN_INDICES.keys()), period='5d', interval='1d')
+        
         for symbol, name in INDIAN_INDICES.items():
             try:
-                ticker = yf.Ticker(symbol)
-                data = ticker.history(period='2d')
+                data = indices_data.get(symbol)
                 
-                if not data.empty:
+                if data is not None and not data.empty:
                     current = data['Close'].iloc[-1]
                     previous = data['Close'].iloc[-2] if len(data) > 1 else current
                     change = current - previous
@@ -310,9 +483,12 @@ class DataFetcher:
         
         stocks_data = []
         
+        # Daily bars for the whole universe in a few batched downloads
+        universe_data = self.get_many(list(INDIAN_STOCKS.keys()), period='5d', interval='1d')
+        
         for symbol, name in INDIAN_STOCKS.items():
             try:
-                data = self.get_stock_data(symbol, period='2d')
+                data = universe_data.get(symbol)
                 if data is not None and len(data) >= 2:
                     current = data['Close'].iloc[-1]
                     previous = data['Close'].iloc[-2]
@@ -0,0 +1,370 @@
+import json
+import os
+import threading
+import zlib
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from config.settings import DATA_CONFIG, MARKET_CONFIG, INDIAN_STOCKS
+from utils.ohlcv_store import OHLCVStore, SESSION_PERIODS
+from utils.resampler import interval_timedelta, session_offset
+
+
+class DataProvider(ABC):
+    """Source of raw market data used by DataFetcher.
+
+    history() returns frames shaped like ``yf.Ticker.history`` (DatetimeIndex
+    named Date/Datetime in market time, OHLCV + Dividends/Stock Splits),
+    info() a dict shaped like ``yf.Ticker.info`` and download() a
+    {symbol: frame} mapping for several symbols at once.
+    """
+
+    name = 'base'
+    remote = False  # Remote providers go through rate limiting and the OHLCV store
+
+    @abstractmethod
+    def history(self, symbol, period=None, interval='1d', start=None, end=None):
+        """Bars for a yfinance-style period, or for a start/end window"""
+
+    @abstractmethod
+    def info(self, symbol):
+        """Quote and company details for a symbol"""
+
+    def download(self, symbols, period='5d', interval='1d'):
+        """Fetch several symbols; providers without a batch endpoint loop over history()"""
+        results = {}
+        for symbol in symbols:
+            data = self.history(symbol, period=period, interval=interval)
+            if data is not None and not data.empty:
+                results[symbol] = data
+        return results
+
+    @staticmethod
+    def slice_history(data, period=None, start=None, end=None):
+        """Cut a full history down to a yfinance-style period or start/end window.
+
+        Periods are measured back from the last available bar rather than from
+        the wall clock, so recorded and synthetic data replay deterministically.
+        """
+        if data is None or data.empty:
+            return data
+        tz = data.index.tz
+
+        def as_timestamp(value):
+            value = pd.Timestamp(value)
+            if tz is not None and value.tzinfo is None:
+                value = value.tz_localize(tz)
+            return value
+
+        if start is not None or end is not None:
+            if start is not None:
+                data = data[data.index >= as_timestamp(start)]
+            if end is not None:
+                data = data[data.index < as_timestamp(end)]
+            return data
+        if period is None or period == 'max':
+            return data
+        if period in SESSION_PERIODS:
+            sessions = data.index.normalize()
+            first_session = sessions.unique()[-SESSION_PERIODS[period]:][0]
+            return data[sessions >= first_session]
+
+        period_start = OHLCVStore.period_start(period, data.index[-1])
+        if period_start is None:
+            return data
+        return data[data.index >= period_start]
+
+
+class YFinanceProvider(DataProvider):
+    """Live Yahoo Finance data"""
+
+    name = 'yfinance'
+    remote = True
+
+    def history(self, symbol, period=None, interval='1d', start=None, end=None):
+        kwargs = {'interval': interval, 'timeout': 10}
+        if start is not None or end is not None:
+            kwargs.update(start=start, end=end)
+        else:
+            kwargs['period'] = period or '1y'
+        return yf.Ticker(symbol).history(**kwargs)
+
+    def info(self, symbol):
+        return yf.Ticker(symbol).info
+
+    def download(self, symbols, period='5d', interval='1d'):
+        """One multi-ticker request for all symbols, split back into per-symbol frames"""
+        raw = yf.download(list(symbols), period=period, interval=interval, group_by='ticker',
+                          auto_adjust=True, threads=True, progress=False, timeout=10)
+        if raw is None or raw.empty:
+            return {}
+
+        results = {}
+        for symbol in symbols:
+            if isinstance(raw.columns, pd.MultiIndex):
+                if symbol not in raw.columns.get_level_values(0):
+                    continue
+                frame = raw[symbol]
+            else:
+                frame = raw
+            # Rows only exist for other tickers' trading days - drop them
+            frame = frame.dropna(how='all')
+            frame.columns.name = None
+            results[symbol] = frame
+        return results
+
+
+class ReplayProvider(DataProvider):
+    """Serves responses previously captured to disk by RecordingProvider.
+
+    Layout: ``<root>/history/<symbol>/<interval>.pkl`` holds the recorded bars
+    and ``<root>/info/<symbol>.json`` the recorded info dict. Symbols that were
+    never recorded come back empty, like unknown tickers on Yahoo.
+    """
+
+    name = 'replay'
+
+    def __init__(self, root=None):
+        self.root = root or DATA_CONFIG['provider']['replay_path']
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    def _history_path(self, symbol, interval):
+        return os.path.join(self.root, 'history', symbol, f"{interval}.pkl")
+
+    def _info_path(self, symbol):
+        return os.path.join(self.root, 'info', f"{symbol}.json")
+
+    def load(self, symbol, interval):
+        """Full recorded history for a symbol and interval (None if never recorded)"""
+        key = (symbol, interval)
+        with self._lock:
+            if key not in self._frames:
+                path = self._history_path(symbol, interval)
+                self._frames[key] = pd.read_pickle(path) if os.path.exists(path) else None
+            return self._frames[key]
+
+    def history(self, symbol, period=None, interval='1d', start=None, end=None):
+        data = self.load(symbol, interval)
+        if data is None:
+            return pd.DataFrame()
+        return self.slice_history(data, period, start, end).copy()
+
+    def info(self, symbol):
+        path = self._info_path(symbol)
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r') as f:
+            return json.load(f)
+
+
+class RecordingProvider(DataProvider):
+    """Wraps another provider and captures everything it returns for later replay"""
+
+    def __init__(self, inner, root=None):
+        self.inner = inner
+        self.replay = ReplayProvider(root)
+        self.name = f"recording:{inner.name}"
+        self.remote = inner.remote
+        self._lock = threading.Lock()
+
+    def _record_history(self, symbol, interval, data):
+        if data is None or data.empty:
+            return
+        with self._lock:
+            existing = self.replay.load(symbol, interval)
+            merged = OHLCVStore.merge(existing, data)
+            path = self.replay._history_path(symbol, interval)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            merged.to_pickle(path + '.tmp')
+            os.replace(path + '.tmp', path)
+            with self.replay._lock:
+                self.replay._frames[(symbol, interval)] = merged
+
+    def history(self, symbol, period=None, interval='1d', start=None, end=None):
+        data = self.inner.history(symbol, period=period, interval=interval, start=start, end=end)
+        self._record_history(symbol, interval, data)
+        return data
+
+    def info(self, symbol):
+        info = self.inner.info(symbol)
+        path = self.replay._info_path(symbol)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(info, f, indent=2, default=str)
+        return info
+
+    def download(self, symbols, period='5d', interval='1d'):
+        results = self.inner.download(symbols, period=period, interval=interval)
+        for symbol, data in results.items():
+            self._record_history(symbol, interval, data)
+        return results
+
+
+class SyntheticProvider(DataProvider):
+    """Deterministic, realistic-looking OHLCV for any symbol and history length.
+
+    Closes follow a geometric Brownian motion whose volatility switches between
+    calm and turbulent regimes; sessions open with overnight gaps (occasionally
+    large ones) and volume carries weekday and intraday U-shaped seasonality.
+    The same seed, symbol and end date always produce the same bars.
+    """
+
+    name = 'synthetic'
+
+    def __init__(self, seed=None, history_bars=None, intraday_sessions=None, end=None):
+        config = DATA_CONFIG['provider']['synthetic']
+        self.seed = config['seed'] if seed is None else seed
+        self.history_bars = history_bars or config['history_bars']
+        self.intraday_sessions = intraday_sessions or config['intraday_sessions']
+        self.end = pd.Timestamp(end or pd.Timestamp.now(tz=MARKET_CONFIG['timezone']).date())
+        self.timezone = MARKET_CONFIG['timezone']
+        self.session_days = pd.offsets.CustomBusinessDay(holidays=MARKET_CONFIG.get('holidays', []))
+        self._frames = {}
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def _rng(self, symbol, stream):
+        return np.random.default_rng([self.seed, zlib.crc32(symbol.encode()), stream])
+
+    def _session_index(self, interval):
+        """Bar timestamps: trading days for daily bars, 09:15-15:30 bars otherwise"""
+        # Every symbol shares the same calendar, so build it once per interval
+        if interval not in self._indexes:
+            self._indexes[interval] = self._build_session_index(interval)
+        return self._indexes[interval]
+
+    def _build_session_index(self, interval):
+        if interval == '1d':
+            days = pd.date_range(end=self.end, periods=self.history_bars, freq=self.session_days)
+            index = days.tz_localize(self.timezone)
+            index.name = 'Date'
+            return index
+
+        step = interval_timedelta(interval)
+        open_offset = session_offset()
+        hours, minutes = MARKET_CONFIG['trading_hours']['end'].split(':')
+        session_length = pd.Timedelta(hours=int(hours), minutes=int(minutes)) - open_offset
+        bar_offsets = pd.TimedeltaIndex(open_offset + step * np.arange(int(np.ceil(session_length / step))))
+        days = pd.date_range(end=self.end, periods=self.intraday_sessions, freq=self.session_days)
+        index = pd.DatetimeIndex((days.values[:, None] + bar_offsets.values[None, :]).ravel())
+        index = index.tz_localize(self.timezone)
+        index.name = 'Datetime'
+        return index
+
+    def generate(self, symbol, interval='1d'):
+        """Full synthetic history for a symbol and interval (cached per instance)"""
+        key = (symbol, interval)
+        with self._lock:
+            if key in self._frames:
+                return self._frames[key]
+
+        index = self._session_index(interval)
+        n = len(index)
+        rng = self._rng(symbol, 0 if interval == '1d' else zlib.crc32(interval.encode()))
+
+        # Fraction of a trading day covered by one bar
+        if interval == '1d':
+            bar_fraction = 1.0
+            session_start = np.ones(n, dtype=bool)
+        else:
+            sessions = index.normalize()
+            session_start = np.r_[True, sessions[1:] != sessions[:-1]]
+            bar_fraction = 1.0 / max(1, np.count_nonzero(sessions == sessions[0]))
+
+        # Two-state volatility regime: switch with a small probability each bar
+        calm_vol, turbulent_vol = rng.uniform(0.008, 0.015), rng.uniform(0.025, 0.045)
+        switch_probability = 0.02 * bar_fraction
+        regime = np.cumsum(rng.random(n) < switch_probability) % 2
+        daily_vol = np.where(regime == 1, turbulent_vol, calm_vol)
+        bar_vol = daily_vol * np.sqrt(bar_fraction)
+
+        drift = rng.uniform(-0.05, 0.20) / 252 * bar_fraction
+        log_returns = (drift - 0.5 * bar_vol ** 2) + bar_vol * rng.standard_normal(n)
+
+        # Overnight gaps at each session open, occasionally a large news gap
+        gap_vol = 0.3 * daily_vol * np.where(rng.random(n) < 0.03, 5.0, 1.0)
+        gaps = np.where(session_start, gap_vol * rng.standard_normal(n), 0.0)
+        gaps[0] = 0.0
+
+        start_price = rng.uniform(50, 3000)
+        log_close = np.log(start_price) + np.cumsum(gaps + log_returns)
+        close = np.exp(log_close)
+        open_ = np.exp(log_close - log_returns)
+        wick = bar_vol * 0.5
+        high = np.maximum(open_, close) * np.exp(np.abs(rng.standard_normal(n)) * wick)
+        low = np.minimum(open_, close) * np.exp(-np.abs(rng.standard_normal(n)) * wick)
+
+        # Volume: lognormal noise, busier on big moves, weekday and intraday seasonality
+        base_volume = rng.uniform(2e5, 2e7) * bar_fraction
+        activity = 1.0 + 2.0 * np.abs(log_returns) / bar_vol.mean()
+        weekday = 1.0 + 0.05 * (index.dayofweek.values == 0) + 0.08 * (index.dayofweek.values == 4)
+        if interval == '1d':
+            intraday_shape = 1.0
+        else:
+            minutes_into_session = (index - index.normalize() - session_offset()) / pd.Timedelta(minutes=1)
+            position = np.asarray(minutes_into_session) / 375.0  # 09:15-15:30 is 375 minutes
+            intraday_shape = 1.0 + 1.5 * (2 * position - 1) ** 2
+        volume = base_volume * activity * weekday * intraday_shape * rng.lognormal(0, 0.35, n)
+
+        data = pd.DataFrame({
+            'Open': open_,
+            'High': high,
+            'Low': low,
+            'Close': close,
+            'Volume': np.round(volume),
+            'Dividends': 0.0,
+            'Stock Splits': 0.0
+        }, index=index)
+
+        with self._lock:
+            self._frames[key] = data
+        return data
+
+    def history(self, symbol, period=None, interval='1d', start=None, end=None):
+        return self.slice_history(self.generate(symbol, interval), period, start, end).copy()
+
+    def info(self, symbol):
+        daily = self.generate(symbol, '1d')
+        last, previous = daily.iloc[-1], daily.iloc[-2]
+        name = INDIAN_STOCKS.get(symbol.replace('.NS', '').replace('.BO', ''), symbol)
+        rng = self._rng(symbol, 1)
+        return {
+            'symbol': symbol,
+            'longName': name,
+            'shortName': name,
+            'sector': 'Synthetic',
+            'industry': 'Synthetic Data',
+            'country': 'India',
+            'currency': 'INR',
+            'currentPrice': float(last['Close']),
+            'previousClose': float(previous['Close']),
+            'open': float(last['Open']),
+            'dayHigh': float(last['High']),
+            'dayLow': float(last['Low']),
+            'volume': int(last['Volume']),
+            'marketCap': int(last['Close'] * rng.uniform(1e8, 1e10)),
+            'trailingPE': float(rng.uniform(8, 60)),
+            'dividendYield': float(rng.uniform(0, 0.04))
+        }
+
+
+def create_provider(name=None):
+    """Build the configured provider (DATA_CONFIG['provider'], overridable via STOCKTRENDAI_DATA_PROVIDER)"""
+    config = DATA_CONFIG['provider']
+    name = name or os.environ.get('STOCKTRENDAI_DATA_PROVIDER') or config['name']
+
+    if name == 'yfinance':
+        return YFinanceProvider()
+    if name == 'replay':
+        return ReplayProvider()
+    if name == 'record':
+        return RecordingProvider(YFinanceProvider())
+    if name == 'synthetic':
+        return SyntheticProvider()
+
+    print(f"Unknown data provider '{name}', using yfinance")
+    return YFinanceProvider()
@@ -0,0 +1,318 @@
+import copy
+import threading
+
+from utils.cache import LRUCache
+from utils.data_fetcher import DataFetcher
+from utils.technical_indicators import TechnicalIndicators, INDICATOR_MEMO
+from utils.streaming_indicators import IndicatorStream
+from utils.feature_store import FEATURE_STORE
+from utils.frame_schema import SCHEMA_CONFIG, enable_copy_on_write, snapshot
+from utils.model_utils import ModelUtils
+from utils.model_registry import ModelRegistry, schema_hash
+from utils.prediction_orchestrator import PredictionOrchestrator
+from utils.training_queue import TrainingQueue
+from utils.retraining import RetrainPolicy, return_volatility
+from utils.advanced_analytics import AdvancedAnalytics
+from utils.news_sentiment import NewsSentimentAnalyzer
+from models.xgboost_model import XGBoostPredictor
+from models.lstm_model import LSTMPredictor
+from models.prophet_model import ProphetPredictor
+from models.ensemble_model import EnsemblePredictor
+from models.transformer_model import TransformerPredictor
+from models.gru_model import GRUPredictor
+from models.stacking_ensemble import StackingEnsemblePredictor
+from config.settings import DATA_CONFIG, CACHE_CONFIG, MODEL_PERSISTENCE
+
+
+class StockTrendEngine:
+    """Process-wide engine shared by every Streamlit session.
+
+    Owns the expensive state (data cache, trained predictors, analytics
+    caches) so that a script rerun only has to look things up here.
+    Sessions keep nothing but their lightweight selections.
+    """
+
+    def __init__(self):
+        self.data_fetcher = DataFetcher()
+        self.tech_indicators = TechnicalIndicators()
+        self.model_utils = ModelUtils()
+        self.advanced_analytics = AdvancedAnalytics()
+        self.news_sentiment = NewsSentimentAnalyzer()
+        self.predictors = {
+            'XGBoost': XGBoostPredictor(),
+            'LSTM': LSTMPredictor(),
+            'Prophet': ProphetPredictor(),
+            'Ensemble': EnsemblePredictor(),
+            'Transformer': TransformerPredictor(),
+            'GRU': GRUPredictor(),
+            'Stacking': StackingEnsemblePredictor()
+        }
+
+        # Processed (OHLCV + indicators) frames shared between sessions
+        self.processed_cache = LRUCache(max_bytes=CACHE_CONFIG['processed']['max_bytes'],
+                                        max_entries=CACHE_CONFIG['processed']['max_entries'],
+                                        default_ttl=DATA_CONFIG['cache_duration'], name='processed')
+        # Streaming indicator state per symbol/period, so a refresh only computes the new bars
+        self.indicator_streams = LRUCache(max_bytes=CACHE_CONFIG['indicator_streams']['max_bytes'],
+                                          max_entries=CACHE_CONFIG['indicator_streams']['max_entries'],
+                                          name='indicator_streams')
+
+        # Trained predictors per (model, symbol, interval, feature schema, cutoff); the shared
+        # instances above only serve frames that do not say which symbol they hold
+        self.model_registry = ModelRegistry()
+        self.model_schemas = {name: schema_hash(predictor) for name, predictor in self.predictors.items()}
+        # Per-symbol predictors that have not trained yet (e.g. their library is missing)
+        self.untrained_predictors = LRUCache(max_entries=MODEL_PERSISTENCE['max_loaded_models'],
+                                             name='untrained_models')
+
+        # Predictors keep trained state on the instance, so serialise access per model
+        self._predictor_locks = {name: threading.Lock() for name in self.predictors}
+        # Runs several predictors at once in worker processes (started on first use)
+        self.orchestrator = PredictionOrchestrator(self)
+        # Trains models for cold symbols in worker processes while fallbacks are served,
+        # and catches registered models up with new bars
+        self.training_queue = TrainingQueue(self)
+        self.retrain_policy = RetrainPolicy()
+
+    def get_processed_data(self, symbol, period):
+        """Get stock data with technical indicators, shared across sessions"""
+        cache_key = f"{symbol}_{period}"
+        cached = self.processed_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        data = self.data_fetcher.get_stock_data(symbol, period)
+        if data is None or data.empty:
+            return data
+
+        try:
+            stream = self.indicator_streams.get(cache_key)
+            if stream is None:
+                stream = IndicatorStream(compact=SCHEMA_CONFIG['enabled'])
+            data = stream.refresh(data)
+            # Re-insert so the cache accounts for the grown frame
+            self.indicator_streams.set(cache_key, stream)
+        except Exception as e:
+            # Continue with basic data if technical indicators fail
+            print(f"Technical indicators calculation failed for {symbol}: {str(e)}")
+
+        # Same market-hours-aware lifetime as the raw data it was built from
+        ttl = self.data_fetcher.cache_ttl(intraday=period in ['1d', '5d'])
+        self.processed_cache.set(cache_key, data, ttl=ttl)
+
+        return data
+
+    def get_panel_indicators(self, symbols, period='1y', columns=None):
+        """Indicators for a whole universe in one vectorized pass: {column: DataFrame(time x symbols)}"""
+        cache_key = f"panel_{period}_{'_'.join(sorted(symbols))}_{'_'.join(columns or [])}"
+        cached = self.processed_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        universe = self.data_fetcher.get_many(symbols, period=period, interval='1d')
+        try:
+            panel = self.tech_indicators.add_panel_indicators(universe, columns)
+        except Exception as e:
+            print(f"Panel indicator calculation failed for {len(universe)} symbols: {str(e)}")
+            return {}
+
+        self.processed_cache.set(cache_key, panel, ttl=self.data_fetcher.cache_ttl())
+        return panel
+
+    def invalidate(self, symbol=None):
+        """Drop cached data for one symbol, or everything when symbol is None"""
+        if symbol is None:
+            self.processed_cache.clear()
+            self.indicator_streams.clear()
+            INDICATOR_MEMO.clear()
+            FEATURE_STORE.cache.clear()
+        else:
+            self.processed_cache.delete_prefix(f"{symbol}_")
+        self.data_fetcher.clear_cache(symbol)
+
+    def cache_stats(self):
+        """Usage and hit/miss/eviction counters for every shared cache"""
+        return [
+            self.processed_cache.stats(),
+            self.indicator_streams.stats(),
+            INDICATOR_MEMO.stats(),
+            FEATURE_STORE.cache.stats(),
+            self.model_registry.loaded.stats(),
+            self.data_fetcher.cache.stats(),
+            self.news_sentiment.cache.stats(),
+            self.advanced_analytics.analysis_cache.stats()
+        ]
+
+    def required_indicators(self, model_names):
+        """Union of the indicator columns the given models read, in first-seen order"""
+        columns = []
+        for name in model_names:
+            for column in getattr(self.predictors[name], 'required_indicators', []):
+                if column not in columns:
+                    columns.append(column)
+        return columns
+
+    def with_indicators(self, model_name, data):
+        """Add the indicator columns the model reads when the caller passed bare OHLCV"""
+        missing = [column for column in self.required_indicators([model_name]) if column not in data.columns]
+        return self.tech_indicators.add_indicators(data, missing) if missing else data
+
+    def predict(self, model_name, data):
+        """Run a single predictor under its lock.
+
+        Predictors treat `data` as read-only: derived columns and targets
+        live in their own frames/arrays, never in the shared input. They get
+        a copy-on-write view, so even a stray write cannot reach the cached
+        frame and no bars are copied. On a cold symbol the predictor's
+        fallback is returned while the model trains in the background.
+        """
+        data = self.with_indicators(model_name, data)
+        fallback = self.schedule_training(model_name, data)
+        if fallback is not None:
+            return fallback
+        with self._predictor_locks[model_name]:
+            predictor = self.predictor_for(model_name, data)
+            trained = predictor.is_trained
+            result = predictor.predict(snapshot(data))
+            if not trained and predictor.is_trained:
+                self._register(model_name, predictor, data)
+            return result
+
+    def schedule_training(self, model_name, data):
+        """Queue the background training the frame's model needs.
+
+        A cold model gets a training job and its fallback prediction is
+        returned; a registered model that new bars have left behind gets a
+        catch-up job (see train) and None is returned, as it is when the
+        model is current or has to train synchronously.
+        """
+        data = self.with_indicators(model_name, data)
+        with self._predictor_locks[model_name]:
+            predictor = self.predictor_for(model_name, data)
+            if predictor.is_trained:
+                if self.training_queue.enabled and self.retrain_action(model_name, data)[0] != 'keep':
+                    self.training_queue.submit(model_name, data)
+                return None
+            if not self.training_queue.submit(model_name, data):
+                return None
+            return predictor.fallback_prediction(snapshot(data))
+
+    def registered_model(self, model_name, data):
+        """(cutoff, metadata, new bars since the cutoff) of the frame's registered model, or None"""
+        symbol, interval = data.attrs.get('symbol'), data.attrs.get('interval')
+        if not symbol or not interval or data.empty:
+            return None
+        schema = self.model_schemas[model_name]
+        cutoff = self.model_registry.latest(model_name, symbol, interval, schema, as_of=data.index[-1])
+        if cutoff is None:
+            return None
+        metadata = self.model_registry.metadata(model_name, symbol, interval, schema, cutoff) or {}
+        cutoff_time = self.model_registry.parse_cutoff(cutoff, data.index.tz)
+        return cutoff, metadata, len(data.index) - data.index.searchsorted(cutoff_time, side='right')
+
+    def retrain_action(self, model_name, data):
+        """Retrain policy's (action, reason) for the frame's registered model"""
+        registered = self.registered_model(model_name, data)
+        if registered is None:
+            return 'refit', "no registered model"
+        cutoff, metadata, new_bars = registered
+        full_fit_at = self.model_registry.parse_cutoff(metadata.get('full_fit_cutoff', cutoff), data.index.tz)
+        can_update = hasattr(self.predictors[model_name], 'update')
+        return self.retrain_policy.decide(metadata, data, new_bars, full_fit_at, can_update)
+
+    def train(self, model_name, data):
+        """Bring the frame's model up to date and register it; True when it is current.
+
+        As the retrain policy decides, the registered model is warm-started
+        on the recent bars (a copy, so the entry it came from is untouched)
+        or replaced by a full refit. Cold and untagged frames get a full fit.
+        """
+        data = self.with_indicators(model_name, data)
+        if data.attrs.get('symbol') and data.attrs.get('interval'):
+            # Another process may have registered a newer model since this one listed them
+            self.model_registry.cutoffs(model_name, data.attrs['symbol'], data.attrs['interval'],
+                                        self.model_schemas[model_name], refresh=True)
+        action, reason = self.retrain_action(model_name, data)
+        if action == 'keep':
+            return True
+
+        if action == 'update':
+            cutoff, metadata, new_bars = self.registered_model(model_name, data)
+            symbol, interval = data.attrs['symbol'], data.attrs['interval']
+            predictor = copy.deepcopy(self.model_registry.get(model_name, symbol, interval,
+                                                              self.model_schemas[model_name], as_of=data.index[-1]))
+            if predictor is not None and predictor.update(snapshot(data)) is not None:
+                self._register(model_name, predictor, data, {
+                    'mode': 'incremental',
+                    'new_bars': int(new_bars),
+                    'updates': metadata.get('updates', 0) + 1,
+                    # Drift and age stay measured against the last full fit
+                    'full_fit_cutoff': metadata.get('full_fit_cutoff', cutoff),
+                    'return_volatility': metadata.get('return_volatility')
+                })
+                return True
+            reason = "incremental update failed"
+
+        if self.registered_model(model_name, data) is not None:
+            print(f"Full refit of {model_name} for {data.attrs['symbol']}: {reason}")
+        predictor = type(self.predictors[model_name])()
+        predictor.predict(snapshot(data))  # Trains on first use
+        if not predictor.is_trained:
+            return False
+        self._register(model_name, predictor, data)
+        return True
+
+    def model_trained(self, model_name, symbol, interval):
+        """Pick up a model another process has just registered"""
+        self.model_registry.cutoffs(model_name, symbol, interval, self.model_schemas[model_name], refresh=True)
+        self.untrained_predictors.delete((model_name, symbol, interval))
+
+    def predict_many(self, model_names, data):
+        """Yield (model name, result, error, seconds) for each model as it finishes"""
+        return self.orchestrator.run(model_names, data)
+
+    def predictor_for(self, model_name, data):
+        """Predictor trained for the frame's symbol and interval (as tagged by DataFetcher).
+
+        The latest registered model trained no later than the frame's last bar
+        comes from the registry's LRU, or from disk; without one a fresh
+        predictor is returned, which trains on first use.
+        """
+        symbol, interval = data.attrs.get('symbol'), data.attrs.get('interval')
+        if not symbol or not interval or data.empty:
+            return self.predictors[model_name]
+        predictor = self.model_registry.get(model_name, symbol, interval, self.model_schemas[model_name],
+                                            as_of=data.index[-1])
+        if predictor is None:
+            predictor = self.untrained_predictors.get((model_name, symbol, interval))
+        if predictor is None:
+            predictor = type(self.predictors[model_name])()
+            self.untrained_predictors.set((model_name, symbol, interval), predictor)
+        return predictor
+
+    def _register(self, model_name, predictor, data, metadata=None):
+        """Store a predictor that has just trained on data (a full fit unless metadata says otherwise)"""
+        symbol, interval = data.attrs.get('symbol'), data.attrs.get('interval')
+        if symbol and interval:
+            cutoff = self.model_registry.format_cutoff(data.index[-1])
+            metadata = dict({'mode': 'full', 'updates': 0, 'full_fit_cutoff': cutoff,
+                             'return_volatility': return_volatility(data)}, **(metadata or {}))
+            metadata['training_rows'] = len(data)
+            self.untrained_predictors.delete((model_name, symbol, interval))
+            self.model_registry.save(model_name, symbol, interval, self.model_schemas[model_name],
+                                     data.index[-1], predictor, metadata)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """Return the process-wide StockTrendEngine, creating it on first use"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                enable_copy_on_write()
+                _engine = StockTrendEngine()
+    return _engine
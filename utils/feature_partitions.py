@@ -0,0 +1,135 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from config.settings import DATA_CONFIG
+
+
+class FeaturePartitions:
+    """On-disk feature matrices, one partition per feature version, symbol and interval.
+
+    Each partition is ``<root>/version=<version>/interval=<interval>/symbol=<symbol>/``
+    holding numbered parts - ``part-00000.values.npy`` (float32, column-major,
+    memory-mappable) with ``part-00000.index.npy`` (bar timestamps as int64
+    nanoseconds) - and a ``manifest.json`` listing the parts, the feature
+    columns and groups. New bars are appended as a new part; the manifest is
+    replaced last, so readers only ever see complete parts.
+    """
+
+    def __init__(self, root=None):
+        store_config = DATA_CONFIG['feature_store']
+        self.root = root or store_config['path']
+        self.enabled = store_config['enabled']
+        self.max_parts = store_config['max_parts']
+        self._lock = threading.Lock()
+
+    def _partition_dir(self, version, symbol, interval):
+        """Directory holding a version/symbol/interval partition"""
+        return os.path.join(self.root, f"version={version}", f"interval={interval}", f"symbol={symbol}")
+
+    def read_manifest(self, version, symbol, interval):
+        """Manifest of a partition, None if it has not been built"""
+        manifest_path = os.path.join(self._partition_dir(version, symbol, interval), 'manifest.json')
+        if not os.path.exists(manifest_path):
+            return None
+        try:
+            with open(manifest_path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Error reading feature manifest for {symbol} ({interval}): {str(e)}")
+            return None
+
+    def read(self, version, symbol, interval):
+        """Memory-map a partition -> (values, index, manifest), (None, None, None) if missing.
+
+        A single part is returned as a read-only memory map; several parts
+        are stitched into one column-major array.
+        """
+        manifest = self.read_manifest(version, symbol, interval)
+        if manifest is None or not manifest['parts']:
+            return None, None, None
+        partition = self._partition_dir(version, symbol, interval)
+        try:
+            parts = [np.load(os.path.join(partition, f"{part['name']}.values.npy"), mmap_mode='r')
+                     for part in manifest['parts']]
+            stamps = np.concatenate([np.load(os.path.join(partition, f"{part['name']}.index.npy"))
+                                     for part in manifest['parts']])
+        except Exception as e:
+            print(f"Error reading feature partition for {symbol} ({interval}): {str(e)}")
+            return None, None, None
+
+        if len(parts) == 1:
+            values = parts[0]
+        else:
+            values = np.empty((len(stamps), len(manifest['columns'])), dtype=np.float32, order='F')
+            np.concatenate(parts, axis=0, out=values)
+            values.flags.writeable = False
+        index = pd.to_datetime(stamps, utc=True)
+        index = index.tz_convert(manifest['tz']) if manifest.get('tz') else index.tz_localize(None)
+        return values, index, manifest
+
+    def write(self, version, symbol, interval, values, index, manifest, append=False):
+        """Write bars as a new part, replacing the partition unless append=True.
+
+        Appends that take a partition past ``max_parts`` parts are compacted
+        into one part so reads stay a single memory map.
+        """
+        partition = self._partition_dir(version, symbol, interval)
+        with self._lock:
+            current = self.read_manifest(version, symbol, interval) if append else None
+            parts = list(current['parts']) if current else []
+            if len(parts) + 1 > self.max_parts:
+                values_old, index_old, _ = self.read(version, symbol, interval)
+                values = np.concatenate([values_old, values], axis=0)
+                index = index_old.append(index)
+                parts = []
+
+            manifest = dict(manifest)
+            previous = current or self.read_manifest(version, symbol, interval)
+            part_number = previous.get('next_part', 0) if previous else 0
+            name = f"part-{part_number:05d}"
+            parts.append({'name': name, 'rows': len(index),
+                          'first_bar': index[0].isoformat(), 'last_bar': index[-1].isoformat()})
+            manifest.update({
+                'parts': parts,
+                'next_part': part_number + 1,
+                'rows': sum(part['rows'] for part in parts),
+                'first_bar': parts[0]['first_bar'],
+                'last_bar': parts[-1]['last_bar'],
+                'tz': str(index.tz) if index.tz is not None else None,
+                'last_updated': datetime.now().isoformat()
+            })
+
+            try:
+                os.makedirs(partition, exist_ok=True)
+                values_path = os.path.join(partition, f"{name}.values.npy")
+                index_path = os.path.join(partition, f"{name}.index.npy")
+                # np.save appends .npy to names without it, so the temporaries keep the suffix
+                np.save(values_path + '.tmp.npy', np.asfortranarray(values, dtype=np.float32))
+                np.save(index_path + '.tmp.npy', index.as_unit('ns').asi8)
+                os.replace(values_path + '.tmp.npy', values_path)
+                os.replace(index_path + '.tmp.npy', index_path)
+                manifest_path = os.path.join(partition, 'manifest.json')
+                with open(manifest_path + '.tmp', 'w') as f:
+                    json.dump(manifest, f, indent=2)
+                os.replace(manifest_path + '.tmp', manifest_path)
+            except Exception as e:
+                print(f"Error writing feature partition for {symbol} ({interval}): {str(e)}")
+                return False
+
+            self._remove_unlisted_parts(partition, {part['name'] for part in parts})
+            return True
+
+    @staticmethod
+    def _remove_unlisted_parts(partition, names):
+        """Delete parts a rewrite or compaction has replaced"""
+        for filename in os.listdir(partition):
+            if filename.startswith('part-') and filename.split('.')[0] not in names:
+                try:
+                    os.remove(os.path.join(partition, filename))
+                except OSError:
+                    pass
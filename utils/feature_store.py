@@ -0,0 +1,297 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from utils.cache import LRUCache, frame_fingerprint
+from utils.fetch_executor import SingleFlight
+from utils.feature_partitions import FeaturePartitions
+from utils.technical_indicators import TechnicalIndicators, INDICATOR_COLUMNS
+from config.settings import CACHE_CONFIG, TECHNICAL_INDICATORS
+
+# Bump when a feature builder changes; together with the indicator settings it names the on-disk version
+FEATURE_VERSION = 1
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Indicator columns copied into the 'indicators' group when the frame has them
+INDICATOR_FEATURES = {
+    'sma_20': 'SMA_20', 'sma_50': 'SMA_50', 'ema_20': 'EMA_20', 'rsi': 'RSI', 'macd': 'MACD',
+    'macd_signal': 'MACD_Signal', 'bb_upper': 'BB_Upper', 'bb_lower': 'BB_Lower', 'volatility': 'Volatility'
+}
+
+
+def _ohlcv(data, indicators):
+    return {'open': data['Open'], 'high': data['High'], 'low': data['Low'],
+            'close': data['Close'], 'volume': data['Volume']}
+
+
+def _indicators(data, indicators):
+    return {name: data[column] for name, column in INDICATOR_FEATURES.items() if column in data.columns}
+
+
+def _returns(data, indicators):
+    return {'price_change': data['Close'].pct_change(), 'volume_change': data['Volume'].pct_change()}
+
+
+def _ratios(data, indicators):
+    price_range = data['High'] - data['Low']
+    return {'high_low_ratio': data['High'] / data['Low'],
+            'close_open_ratio': data['Close'] / data['Open'],
+            'price_range': price_range / data['Close'],
+            'price_range_abs': price_range}
+
+
+def _moving_averages(data, indicators):
+    close_ma = indicators.calculate_sma_windows(data, [5, 10, 20])
+    volume_ma = indicators.calculate_sma_windows(data, [5, 10, 20], column='Volume')
+    features = {}
+    for window in [5, 10, 20]:
+        features[f'ma_{window}'] = close_ma[window]
+        features[f'price_ma_{window}_ratio'] = data['Close'] / close_ma[window]
+        features[f'volume_ma_{window}'] = volume_ma[window]
+    features['volume_ma_ratio'] = data['Volume'] / volume_ma[20]
+    return features
+
+
+def _volatility(data, indicators):
+    volatility = indicators.calculate_std_windows(data, [5, 20])
+    return {'volatility_5': volatility[5], 'volatility_20': volatility[20]}
+
+
+def _momentum(data, indicators):
+    close_lags = indicators.calculate_lags(data, [5, 10])
+    return {'momentum_5': data['Close'] / close_lags[5], 'momentum_10': data['Close'] / close_lags[10]}
+
+
+def _extremes(data, indicators):
+    return {'price_vs_5day_high': data['Close'] / data['High'].rolling(5).max(),
+            'price_vs_5day_low': data['Close'] / data['Low'].rolling(5).min(),
+            'price_vs_20day_high': data['Close'] / data['High'].rolling(20).max(),
+            'price_vs_20day_low': data['Close'] / data['Low'].rolling(20).min()}
+
+
+def _oscillators(data, indicators):
+    features = {}
+    if 'RSI' in data.columns:
+        features['rsi_normalized'] = (data['RSI'] - 50) / 50
+    if 'MACD' in data.columns and 'MACD_Signal' in data.columns:
+        features['macd_histogram'] = data['MACD'] - data['MACD_Signal']
+    if 'BB_Upper' in data.columns and 'BB_Lower' in data.columns:
+        features['bb_position'] = (data['Close'] - data['BB_Lower']) / (data['BB_Upper'] - data['BB_Lower'])
+        features['bb_width'] = data['BB_Upper'] - data['BB_Lower']
+    return features
+
+
+def _volume(data, indicators):
+    return {'price_volume': data['Close'] * data['Volume'],
+            'volume_price_trend': (data['Volume'] * data['Close'].diff()).cumsum()}
+
+
+def _lags(data, indicators):
+    close_lags = indicators.calculate_lags(data, [1, 2, 3, 5])
+    volume_lags = indicators.calculate_lags(data, [1, 2, 3, 5], column='Volume')
+    features = {}
+    for lag in [1, 2, 3, 5]:
+        features[f'close_lag_{lag}'] = close_lags[lag]
+        features[f'volume_lag_{lag}'] = volume_lags[lag]
+    return features
+
+
+# Feature groups in matrix order; each builder returns {feature name: column}
+FEATURE_GROUPS = {
+    'ohlcv': _ohlcv,
+    'indicators': _indicators,
+    'returns': _returns,
+    'ratios': _ratios,
+    'moving_averages': _moving_averages,
+    'volatility': _volatility,
+    'momentum': _momentum,
+    'extremes': _extremes,
+    'oscillators': _oscillators,
+    'volume': _volume,
+    'lags': _lags
+}
+
+
+class FeatureMatrix:
+    """float32 feature matrix for one price frame, its columns organised in named groups"""
+
+    def __init__(self, values, columns, index, groups):
+        self.values = values  # (bars x features), column-major so each feature is contiguous
+        self.columns = columns
+        self.index = index
+        self.groups = groups  # group -> (first column, end column)
+        self._positions = {column: i for i, column in enumerate(columns)}
+
+    def __contains__(self, column):
+        return column in self._positions
+
+    def __len__(self):
+        return len(self.index)
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + self.values.nbytes + int(self.index.memory_usage(deep=True))
+
+    def group_columns(self, groups):
+        """Feature names of the given groups, in matrix order"""
+        return [column for group in groups if group in self.groups
+                for column in self.columns[slice(*self.groups[group])]]
+
+    def frame(self, columns, names=None):
+        """DataFrame over the given features, renamed to `names`.
+
+        A run of adjacent features (a group, or neighbouring groups) is a view
+        of the matrix; other selections gather a float32 copy.
+        """
+        positions = [self._positions[column] for column in columns]
+        if positions and positions == list(range(positions[0], positions[0] + len(positions))):
+            values = self.values[:, positions[0]:positions[-1] + 1]
+        else:
+            values = self.values[:, positions]
+        return pd.DataFrame(values, index=self.index, columns=list(names or columns), copy=False)
+
+    def group_frame(self, groups):
+        """DataFrame over whole groups"""
+        return self.frame(self.group_columns(groups))
+
+
+def feature_version():
+    """Short hash of FEATURE_VERSION and the indicator settings the features depend on"""
+    digest = hashlib.blake2b(repr((FEATURE_VERSION, sorted(TECHNICAL_INDICATORS.items()))).encode(),
+                             digest_size=6)
+    return digest.hexdigest()
+
+
+class FeatureStore:
+    """Feature matrices shared by every predictor, built once per price frame.
+
+    Matrices are keyed by frame_fingerprint of the input - symbol, interval
+    and as-of bar for DataFetcher frames - so all the models predicting on
+    one frame reuse a single build. Concurrent requests for the same frame
+    wait on the one build in progress. Tagged frames holding the same bars
+    as an on-disk partition (see build_features.py), from its first bar up
+    to any stored bar, are served from there; OBV-style cumulative features
+    and rolling warm-ups depend on where a frame starts, so frames starting
+    later are built.
+    """
+
+    def __init__(self):
+        self.cache = LRUCache(max_bytes=CACHE_CONFIG['feature_store']['max_bytes'],
+                              max_entries=CACHE_CONFIG['feature_store']['max_entries'],
+                              name='feature_store')
+        self.single_flight = SingleFlight()
+        self.tech_indicators = TechnicalIndicators()
+        self.partitions = FeaturePartitions()
+        self.version = feature_version()
+
+    def get(self, data):
+        """FeatureMatrix with every feature group for an OHLCV (+ indicators) frame"""
+        key = frame_fingerprint(data)
+        matrix = self.cache.get(key)
+        if matrix is None:
+            matrix = self.single_flight.do(key, self._build_and_cache, data, key)
+        return matrix
+
+    def _build_and_cache(self, data, key):
+        matrix = self._stored(data)
+        if matrix is None:
+            matrix = self.build(data)
+        self.cache.set(key, matrix)
+        return matrix
+
+    def _stored(self, data):
+        """Persisted features for exactly the bars of a tagged frame, None if not on disk"""
+        symbol, interval = data.attrs.get('symbol'), data.attrs.get('interval')
+        if not (self.partitions.enabled and symbol and interval and len(data)):
+            return None
+        # Stored rows were built over the partition's whole history, so they only match a
+        # build of this frame when the frame starts on the same bar
+        manifest = self.partitions.read_manifest(self.version, symbol, interval)
+        if not manifest or pd.Timestamp(manifest['first_bar']) != data.index[0]:
+            return None
+        matrix = self.load(symbol, interval, start=data.index[0], end=data.index[-1])
+        if matrix is None or not matrix.index.equals(data.index):
+            return None
+        # A re-adjusted or still-forming last bar means the stored row is stale
+        if matrix.values[-1, matrix.columns.index('close')] != np.float32(data['Close'].iloc[-1]):
+            return None
+        return matrix
+
+    def load(self, symbol, interval='1d', start=None, end=None):
+        """Memory-mapped FeatureMatrix for a symbol's persisted bars between start and end (inclusive)"""
+        values, index, manifest = self.partitions.read(self.version, symbol, interval)
+        if values is None:
+            return None
+        first = index.searchsorted(pd.Timestamp(start)) if start is not None else 0
+        last = index.searchsorted(pd.Timestamp(end), side='right') if end is not None else len(index)
+        groups = {group: tuple(bounds) for group, bounds in manifest['groups'].items()}
+        return FeatureMatrix(values[first:last], manifest['columns'], index[first:last], groups)
+
+    def persist(self, symbol, data, interval='1d', rebuild=False):
+        """Write a symbol's features to disk, appending only bars newer than the stored ones.
+
+        Features are computed over the whole OHLCV history so every stored
+        row matches a full rebuild. The partition is rewritten instead when
+        the feature columns changed, history was extended backwards or the
+        last stored bar was revised. Returns the number of rows written.
+        """
+        if data is None or data.empty:
+            return 0
+        manifest = None if rebuild else self.partitions.read_manifest(self.version, symbol, interval)
+        start = 0
+        if manifest and manifest['first_bar'] == data.index[0].isoformat():
+            last_bar = pd.Timestamp(manifest['last_bar'])
+            position = data.index.searchsorted(last_bar)
+            if (position < len(data) and data.index[position] == last_bar and
+                    np.allclose(data[OHLCV_COLUMNS].iloc[position].to_numpy(dtype=float),
+                                manifest['source_last'], rtol=1e-9, equal_nan=True)):
+                start = position + 1
+        if manifest and start == len(data):
+            return 0  # Already up to date
+
+        processed = data if set(INDICATOR_COLUMNS) <= set(data.columns) else \
+            self.tech_indicators.add_indicators(data, INDICATOR_COLUMNS)
+        matrix = self.build(processed)
+        append = start > 0 and manifest['columns'] == matrix.columns
+        if not append:
+            start = 0
+        written = self.partitions.write(self.version, symbol, interval, matrix.values[start:],
+                                        matrix.index[start:], {
+                                            'version': self.version,
+                                            'symbol': symbol,
+                                            'interval': interval,
+                                            'columns': matrix.columns,
+                                            'groups': matrix.groups,
+                                            'source_last': data[OHLCV_COLUMNS].iloc[-1].tolist()
+                                        }, append=append)
+        return len(data) - start if written else 0
+
+    def build(self, data):
+        """Compute all feature groups and pack them into one float32 matrix"""
+        # Compact (float32) frames are widened so returns and ratios are computed in float64
+        narrow = {column: np.float64 for column, dtype in data.dtypes.items() if dtype == np.float32}
+        if narrow:
+            data = data.astype(narrow)
+        features = {}
+        groups = {}
+        for group, builder in FEATURE_GROUPS.items():
+            try:
+                columns = builder(data, self.tech_indicators)
+            except Exception as e:
+                print(f"Feature group '{group}' failed: {str(e)}")
+                continue
+            groups[group] = (len(features), len(features) + len(columns))
+            features.update(columns)
+
+        values = np.empty((len(data), len(features)), dtype=np.float32, order='F')
+        for position, column in enumerate(features.values()):
+            values[:, position] = np.asarray(column, dtype=np.float64)
+        values[np.isinf(values)] = np.nan
+        values.flags.writeable = False  # Shared by every model; views must not be written through
+
+        return FeatureMatrix(values, list(features), data.index, groups)
+
+
+# Process-wide store, like INDICATOR_MEMO
+FEATURE_STORE = FeatureStore()
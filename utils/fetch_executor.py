@@ -0,0 +1,246 @@
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from config.settings import API_CONFIG
+
+
+class RateLimitError(Exception):
+    """Raised when no request token became available within the allowed wait"""
+
+
+class CircuitOpenError(Exception):
+    """Raised when calls to a host are suspended by its circuit breaker"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket holding up to `capacity` tokens, refilled at `rate` tokens/second"""
+
+    def __init__(self, capacity, rate):
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def try_acquire(self, tokens=1):
+        """Take tokens if available; return 0 on success or the seconds to wait otherwise"""
+        with self._lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+
+    def acquire(self, tokens=1, timeout=None):
+        """Block until tokens are available; False if that would exceed timeout seconds"""
+        tokens = min(tokens, self.capacity)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0.0:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or wait > remaining:
+                    return False
+            time.sleep(wait)
+
+    def release(self, tokens=1):
+        """Give back tokens taken for a request that was never sent"""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + tokens)
+
+
+class CircuitBreaker:
+    """Per-host circuit breaker (closed -> open after repeated failures -> half-open probe)"""
+
+    def __init__(self, failure_threshold=5, reset_timeout=60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.state = 'closed'
+        self.opened_at = 0.0
+        self.probe_started_at = None  # Set while the single half-open probe is in flight
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Check whether a call may go through, moving open -> half-open after the timeout.
+
+        While half-open only one probe is let through until its outcome is
+        recorded; a probe that never reports back is given up on after
+        reset_timeout so the breaker cannot stay stuck.
+        """
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            now = time.monotonic()
+            if self.state == 'open':
+                if now - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = 'half-open'
+            if self.probe_started_at is not None and now - self.probe_started_at < self.reset_timeout:
+                return False
+            self.probe_started_at = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.state = 'closed'
+            self.probe_started_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.probe_started_at = None
+            if self.state == 'half-open' or self.failures >= self.failure_threshold:
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+
+class SingleFlight:
+    """Collapse concurrent calls that share a key into a single execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight block on the same Future and receive its result (or error).
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def in_flight(self):
+        """Number of keys currently being fetched"""
+        with self._lock:
+            return len(self._inflight)
+
+
+class FetchExecutor:
+    """Thread-pool executor for upstream data requests.
+
+    Every request goes through a shared token-bucket limiter built from
+    API_CONFIG['rate_limits'], is retried with jittered exponential backoff
+    and is guarded by a circuit breaker for its host.
+    """
+
+    def __init__(self, max_workers=None):
+        rate_limits = API_CONFIG['rate_limits']
+        executor_config = API_CONFIG['executor']
+
+        self.buckets = [
+            TokenBucket(rate_limits['requests_per_minute'], rate_limits['requests_per_minute'] / 60.0),
+            TokenBucket(rate_limits['requests_per_hour'], rate_limits['requests_per_hour'] / 3600.0)
+        ]
+        self.max_wait = rate_limits['max_wait']
+        self.max_retries = API_CONFIG['yahoo_finance']['max_retries']
+        self.backoff_base = executor_config['backoff_base']
+        self.backoff_max = executor_config['backoff_max']
+        self.default_host = urlparse(API_CONFIG['yahoo_finance']['base_url']).netloc
+
+        self.breakers = {}
+        self._breakers_lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(
+            max_workers=max_workers or executor_config['max_workers'],
+            thread_name_prefix='data-fetch'
+        )
+
+    def breaker(self, host=None):
+        """Get (or create) the circuit breaker for a host"""
+        host = host or self.default_host
+        with self._breakers_lock:
+            if host not in self.breakers:
+                breaker_config = API_CONFIG['executor']['circuit_breaker']
+                self.breakers[host] = CircuitBreaker(
+                    failure_threshold=breaker_config['failure_threshold'],
+                    reset_timeout=breaker_config['reset_timeout']
+                )
+            return self.breakers[host]
+
+    def backoff_delay(self, attempt):
+        """Full-jitter exponential backoff delay for a retry attempt"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def acquire(self, tokens=1):
+        """Wait for request tokens from every bucket"""
+        acquired = []
+        for bucket in self.buckets:
+            if not bucket.acquire(tokens, timeout=self.max_wait):
+                # The request is not sent, so the buckets that did grant a token get it back
+                for granted in acquired:
+                    granted.release(min(tokens, granted.capacity))
+                raise RateLimitError(f"Rate limit reached, no token within {self.max_wait}s")
+            acquired.append(bucket)
+
+    def call(self, func, *args, host=None, tokens=1, retries=None, **kwargs):
+        """Run an upstream request with rate limiting, retries and the host's circuit breaker"""
+        breaker = self.breaker(host)
+        # retries counts attempts, so at least one request is always made
+        retries = max(1, self.max_retries if retries is None else retries)
+        last_error = None
+
+        for attempt in range(retries):
+            if not breaker.allow():
+                raise CircuitOpenError(f"Circuit open for {host or self.default_host}")
+
+            self.acquire(tokens)
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                breaker.record_failure()
+                last_error = e
+                if attempt < retries - 1:
+                    time.sleep(self.backoff_delay(attempt))
+                continue
+
+            breaker.record_success()
+            return result
+
+        raise last_error
+
+    def submit(self, func, *args, **kwargs):
+        """Schedule func on the fetch pool and return its Future"""
+        return self.pool.submit(func, *args, **kwargs)
+
+    def map(self, func, items):
+        """Run func(item) for every item in parallel; returns {item: result or None}"""
+        futures = {item: self.pool.submit(func, item) for item in items}
+        results = {}
+        for item, future in futures.items():
+            try:
+                results[item] = future.result()
+            except Exception as e:
+                print(f"Parallel fetch failed for {item}: {str(e)}")
+                results[item] = None
+        return results
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from config.settings import DATA_CONFIG
+
+SCHEMA_CONFIG = DATA_CONFIG['compact_schema']
+
+INT32_MAX = np.iinfo(np.int32).max
+
+
+def enable_copy_on_write():
+    """Turn on pandas copy-on-write if configured; called once at startup (see get_engine).
+
+    Copies and slices then share memory until one side is written, so the
+    defensive copies taken between fetcher, caches, indicators and models
+    cost nothing.
+    """
+    if SCHEMA_CONFIG['copy_on_write']:
+        pd.set_option('mode.copy_on_write', True)
+
+
+def snapshot(data):
+    """Copy a frame that the caller may go on to modify.
+
+    Lazy (shallow) under copy-on-write, a full copy otherwise.
+    """
+    return data.copy(deep=not pd.get_option('mode.copy_on_write'))
+
+
+def compact_frame(data, flag_columns=(), enabled=None, downcast_floats=True):
+    """Shrink a price/indicator frame to the compact schema.
+
+    float64 columns become float32, 0/1 flag columns int8 and integer
+    volumes int32 when they fit; columns nothing reads (DATA_CONFIG
+    ['compact_schema']['drop_columns']) are dropped. Frames that indicators
+    are still to be computed from keep float64 (``downcast_floats=False``),
+    so only results are rounded to float32, not the prices they come from.
+    """
+    enabled = SCHEMA_CONFIG['enabled'] if enabled is None else enabled
+    if not enabled or data is None or data.empty:
+        return data
+
+    unused = [column for column in SCHEMA_CONFIG['drop_columns'] if column in data.columns]
+    if unused:
+        data = data.drop(columns=unused)
+
+    dtypes = {}
+    for column, dtype in data.dtypes.items():
+        if column in flag_columns:
+            if dtype != np.int8 and data[column].notna().all():
+                dtypes[column] = np.int8
+        elif dtype == np.float64 and downcast_floats:
+            dtypes[column] = np.float32
+        elif column == 'Volume' and pd.api.types.is_integer_dtype(dtype) and dtype != np.int32:
+            if data[column].abs().max() <= INT32_MAX:
+                dtypes[column] = np.int32
+    return data.astype(dtypes) if dtypes else data
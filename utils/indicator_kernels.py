@@ -0,0 +1,386 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+from config.settings import TECHNICAL_INDICATORS
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Windows (rows x symbols) processed per sliding-window block, bounds the temporary arrays
+CHUNK_ROWS = 65536
+
+BACKENDS = ['auto', 'numba', 'numpy', 'pandas']
+
+
+def resolve_backend(name=None):
+    """Turn a configured backend name into the one that will actually run.
+
+    'auto' picks numba when it is installed and NumPy otherwise; asking for
+    numba without it installed falls back to NumPy. 'pandas' keeps the
+    original rolling(...).apply implementations (the reference for parity).
+    """
+    name = name or TECHNICAL_INDICATORS['kernel_backend']
+    if name not in BACKENDS:
+        print(f"Unknown indicator backend '{name}', using auto")
+        name = 'auto'
+    if name == 'auto':
+        return 'numba' if NUMBA_AVAILABLE else 'numpy'
+    if name == 'numba' and not NUMBA_AVAILABLE:
+        print("Numba not available - using NumPy indicator kernels")
+        return 'numpy'
+    return name
+
+
+# ---------------------------------------------------------------------------
+# NumPy kernels (sliding_window_view, processed in blocks)
+# ---------------------------------------------------------------------------
+
+def _windowed(values, window, reducer):
+    """Apply reducer(block of windows) -> one value per window; first window-1 outputs are NaN.
+
+    Windows run down axis 0, so a 2-D (time x symbols) array is reduced for
+    every symbol at once.
+    """
+    out = np.full_like(values, np.nan)  # Keeps the input's memory layout
+    if window <= 0 or len(values) < window:
+        return out
+    windows = sliding_window_view(values, window, axis=0)
+    rows = max(1, CHUNK_ROWS // max(1, values[0].size))
+    for start in range(0, len(windows), rows):
+        block = windows[start:start + rows]
+        out[window - 1 + start:window - 1 + start + len(block)] = reducer(block)
+    return out
+
+
+def _columnwise(kernel, *arrays):
+    """Run a 1-D kernel over every column of 2-D (time x symbols) inputs"""
+    out = np.full_like(arrays[0], np.nan)
+    for column in range(arrays[0].shape[1]):
+        out[:, column] = kernel(*(np.ascontiguousarray(a[:, column]) for a in arrays))
+    return out
+
+
+def _rolling_mad_numpy(values, window):
+    return _windowed(values, window,
+                     lambda block: np.abs(block - block.mean(axis=-1, keepdims=True)).mean(axis=-1))
+
+
+def _rolling_max_numpy(values, window):
+    # NaN anywhere in a window propagates, like pandas with min_periods=window
+    return _windowed(values, window, lambda block: block.max(axis=-1))
+
+
+def _rolling_min_numpy(values, window):
+    return _windowed(values, window, lambda block: block.min(axis=-1))
+
+
+def _true_range_numpy(high, low, close):
+    prev_close = np.empty_like(close)
+    prev_close[0] = np.nan
+    prev_close[1:] = close[:-1]
+    return np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def _wilder_numpy(values, window):
+    out = np.full(len(values), np.nan)
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid) == 0:
+        return out
+    start = valid[0]
+    seed_end = start + window
+    if seed_end > len(values):
+        return out
+    # Seed with the simple average of the first full window, then y = y_prev + (x - y_prev) / window
+    seed = values[start:seed_end].mean()
+    out[seed_end - 1] = seed
+    alpha = 1.0 / window
+    rest = values[seed_end:]
+    if len(rest):
+        out[seed_end:], _ = lfilter([alpha], [1.0, alpha - 1.0], rest, zi=[(1.0 - alpha) * seed])
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Numba kernels (single pass loops, compiled on first use)
+# ---------------------------------------------------------------------------
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _rolling_mad_numba(values, window):
+        n = len(values)
+        out = np.full(n, np.nan)
+        for i in range(window - 1, n):
+            total = 0.0
+            for j in range(i - window + 1, i + 1):
+                total += values[j]
+            mean = total / window
+            deviation = 0.0
+            for j in range(i - window + 1, i + 1):
+                deviation += abs(values[j] - mean)
+            out[i] = deviation / window
+        return out
+
+    @njit(cache=True)
+    def _rolling_extreme_numba(values, window, sign):
+        # Monotonic deque of candidate positions; sign=1 for max, -1 for min
+        n = len(values)
+        out = np.full(n, np.nan)
+        candidates = np.empty(n, dtype=np.int64)
+        head = 0
+        tail = 0
+        last_nan = -window - 1
+        for i in range(n):
+            x = values[i]
+            if np.isnan(x):
+                last_nan = i
+            else:
+                while tail > head and sign * values[candidates[tail - 1]] <= sign * x:
+                    tail -= 1
+                candidates[tail] = i
+                tail += 1
+            while tail > head and candidates[head] <= i - window:
+                head += 1
+            if i >= window - 1 and i - last_nan >= window and tail > head:
+                out[i] = values[candidates[head]]
+        return out
+
+    @njit(cache=True)
+    def _true_range_numba(high, low, close):
+        n = len(high)
+        out = np.full(n, np.nan)
+        for i in range(1, n):
+            high_low = high[i] - low[i]
+            high_close = abs(high[i] - close[i - 1])
+            low_close = abs(low[i] - close[i - 1])
+            out[i] = max(high_low, max(high_close, low_close))
+            if np.isnan(high_low) or np.isnan(high_close) or np.isnan(low_close):
+                out[i] = np.nan
+        return out
+
+    @njit(cache=True)
+    def _wilder_numba(values, window):
+        n = len(values)
+        out = np.full(n, np.nan)
+        start = 0
+        while start < n and np.isnan(values[start]):
+            start += 1
+        if start + window > n:
+            return out
+        total = 0.0
+        for j in range(start, start + window):
+            total += values[j]
+        smoothed = total / window
+        out[start + window - 1] = smoothed
+        for i in range(start + window, n):
+            smoothed += (values[i] - smoothed) / window
+            out[i] = smoothed
+        return out
+
+    @njit(cache=True)
+    def _ewm_windows_numba(values, decays):
+        # One pass over the bars updating every span's weighted sum and weight together
+        n = len(values)
+        k = len(decays)
+        out = np.full((n, k), np.nan)
+        weighted = np.zeros(k)
+        weights = np.zeros(k)
+        for i in range(n):
+            x = values[i]
+            valid = not np.isnan(x)
+            for column in range(k):
+                weighted[column] *= decays[column]
+                weights[column] *= decays[column]
+                if valid:
+                    weighted[column] += x
+                    weights[column] += 1.0
+                if weights[column] > 0:
+                    out[i, column] = weighted[column] / weights[column]
+                elif i > 0:
+                    out[i, column] = out[i - 1, column]  # pandas repeats the last mean
+        return out
+
+
+# ---------------------------------------------------------------------------
+# Public kernels (float64 arrays in, float64 arrays out; 1-D series or 2-D time x symbols)
+# ---------------------------------------------------------------------------
+
+def _as_array(values):
+    values = np.asarray(values, dtype=np.float64)
+    # Panels keep their layout (pandas hands them over column-major); series must be contiguous for numba
+    return values if values.ndim == 2 else np.ascontiguousarray(values)
+
+
+def _numba(kernel, *arrays):
+    """Numba kernels are 1-D loops, so 2-D panels go through them a column at a time"""
+    if arrays[0].ndim == 2:
+        return _columnwise(kernel, *arrays)
+    return kernel(*arrays)
+
+
+def rolling_mad(values, window, backend=None):
+    """Rolling mean absolute deviation around each window's mean"""
+    values = _as_array(values)
+    if resolve_backend(backend) == 'numba':
+        return _numba(lambda v: _rolling_mad_numba(v, window), values)
+    return _rolling_mad_numpy(values, window)
+
+
+def rolling_max(values, window, backend=None):
+    """Rolling maximum over a fixed window"""
+    values = _as_array(values)
+    if resolve_backend(backend) == 'numba':
+        return _numba(lambda v: _rolling_extreme_numba(v, window, 1.0), values)
+    return _rolling_max_numpy(values, window)
+
+
+def rolling_min(values, window, backend=None):
+    """Rolling minimum over a fixed window"""
+    values = _as_array(values)
+    if resolve_backend(backend) == 'numba':
+        return _numba(lambda v: _rolling_extreme_numba(v, window, -1.0), values)
+    return _rolling_min_numpy(values, window)
+
+
+def true_range(high, low, close, backend=None):
+    """True range; undefined (NaN) on the first bar, which has no previous close"""
+    high, low, close = _as_array(high), _as_array(low), _as_array(close)
+    if resolve_backend(backend) == 'numba':
+        return _numba(_true_range_numba, high, low, close)
+    return _true_range_numpy(high, low, close)
+
+
+def wilder_smooth(values, window, backend=None):
+    """Wilder's smoothing (RMA): SMA seed over the first full window, then alpha = 1/window"""
+    values = _as_array(values)
+    kernel = _wilder_numba if resolve_backend(backend) == 'numba' else _wilder_numpy
+    # Each symbol seeds at its own first valid value, so this one always runs per column
+    if values.ndim == 2:
+        return _columnwise(lambda v: kernel(v, window), values)
+    return kernel(values, window)
+
+
+def rolling_mean(values, window, backend=None):
+    """Rolling mean over a fixed window; NaN until the window is full or while it holds a NaN"""
+    return _windowed(_as_array(values), window, lambda block: block.mean(axis=-1))
+
+
+def rolling_std(values, window, ddof=1, backend=None):
+    """Rolling (sample) standard deviation over a fixed window"""
+    if window <= ddof:
+        return np.full_like(_as_array(values), np.nan)  # Undefined, as in pandas
+    return _windowed(_as_array(values), window, lambda block: block.std(axis=-1, ddof=ddof))
+
+
+def ewm_mean(values, span, backend=None):
+    """Exponentially weighted mean matching pandas ewm(span=span, adjust=True).
+
+    Weights decay by (1 - alpha) per row whether or not the row is NaN, as
+    pandas does with ignore_na=False, so both the weighted sum and the sum of
+    weights are single first-order filters down axis 0.
+    """
+    values = _as_array(values)
+    decay = 1.0 - 2.0 / (span + 1.0)
+    valid = ~np.isnan(values)
+    weighted = lfilter([1.0], [1.0, -decay], np.where(valid, values, 0.0), axis=0)
+    weights = lfilter([1.0], [1.0, -decay], valid.astype(np.float64), axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out = weighted / weights
+    stale = weights == 0
+    if stale.any():
+        # No weight left (before the first value, or span=1 over a NaN): pandas repeats the last mean
+        out[stale] = np.nan
+        rows = np.arange(len(out)).reshape((-1,) + (1,) * (out.ndim - 1))
+        rows = np.maximum.accumulate(np.where(stale, 0, rows), axis=0)
+        out = np.take_along_axis(out, rows, axis=0)
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Multi-window kernels (1-D series in, one output column per window)
+# ---------------------------------------------------------------------------
+
+def rolling_mean_windows(values, windows, backend=None):
+    """Rolling means for several windows from a single prefix sum -> (len(values), len(windows))"""
+    values = _as_array(values)
+    n = len(values)
+    out = np.full((n, len(windows)), np.nan)
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return out
+    # Centre on the first value so the running sum stays small next to the prices it adds up
+    centre = values[valid][0]
+    sums = np.concatenate([[0.0], np.cumsum(np.where(valid, values - centre, 0.0))])
+    gaps = np.concatenate([[0], np.cumsum(~valid)])
+    for column, window in enumerate(windows):
+        if window <= 0 or window > n:
+            continue
+        ends = np.arange(window, n + 1)
+        means = (sums[ends] - sums[ends - window]) / window + centre
+        # A NaN anywhere in the window makes the mean NaN, as with pandas rolling
+        out[window - 1:, column] = np.where(gaps[ends] - gaps[ends - window] > 0, np.nan, means)
+    return out
+
+
+def rolling_std_windows(values, windows, ddof=1, backend=None):
+    """Rolling standard deviations for several windows from shared running sums -> (len(values), len(windows)).
+
+    Each bar's widest window is read backwards as deviations from that bar's
+    own value, and running sums of the deviations and their squares along
+    it give every narrower window's variance at once. Deviations from a
+    value inside the window keep the sums small, so there is none of the
+    cancellation a prefix sum over raw prices would suffer.
+    """
+    values = _as_array(values)
+    n = len(values)
+    windows = list(windows)
+    out = np.full((n, len(windows)), np.nan)
+    usable = [column for column, window in enumerate(windows) if ddof < window <= n]
+    if not usable:
+        return out
+    sizes = np.array([windows[column] for column in usable])
+    widest = int(sizes.max())
+    # NaN padding leaves the first window-1 bars of every window undefined, as in pandas
+    padded = np.concatenate([np.full(widest - 1, np.nan), values])
+    view = sliding_window_view(padded, widest)[:, ::-1]
+    rows = max(1, CHUNK_ROWS // widest)
+    for start in range(0, n, rows):
+        block = view[start:start + rows]
+        deviations = block - block[:, :1]
+        sums = np.cumsum(deviations, axis=1)[:, sizes - 1]
+        squares = np.cumsum(deviations * deviations, axis=1)[:, sizes - 1]
+        # A NaN anywhere in the window carries through the running sums, as with pandas rolling
+        variance = (squares - sums * sums / sizes) / (sizes - ddof)
+        out[start:start + rows, usable] = np.sqrt(np.maximum(variance, 0.0))
+    return out
+
+
+def ewm_mean_windows(values, spans, backend=None):
+    """ewm(span=s, adjust=True).mean() for several spans -> (len(values), len(spans)).
+
+    The numba kernel advances every span in one pass over the bars. Each
+    span is its own recurrence, so the NumPy path runs one lfilter per span.
+    """
+    values = _as_array(values)
+    spans = list(spans)
+    if resolve_backend(backend) == 'numba' and len(values):
+        decays = 1.0 - 2.0 / (np.asarray(spans, dtype=np.float64) + 1.0)
+        return _ewm_windows_numba(values, decays)
+    out = np.full((len(values), len(spans)), np.nan)
+    for column, span in enumerate(spans):
+        out[:, column] = ewm_mean(values, span)
+    return out
+
+
+def lag_windows(values, lags, backend=None):
+    """values shifted by each lag (negative lags look ahead) in one gather -> (len(values), len(lags))"""
+    values = _as_array(values)
+    n = len(values)
+    positions = np.arange(n)[:, None] - np.asarray(lags, dtype=np.int64)[None, :]
+    outside = (positions < 0) | (positions >= n)
+    out = values[np.clip(positions, 0, max(n - 1, 0))] if n else np.empty(positions.shape)
+    out[outside] = np.nan
+    return out
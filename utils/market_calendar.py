@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, time
+
+import pytz
+
+from config.settings import MARKET_CONFIG
+
+
+class MarketCalendar:
+    """Trading-session calendar for the Indian market built from MARKET_CONFIG"""
+
+    def __init__(self, config=None):
+        config = config or MARKET_CONFIG
+        self.timezone = pytz.timezone(config['timezone'])
+        self.open_time = self._parse_time(config['trading_hours']['start'])
+        self.close_time = self._parse_time(config['trading_hours']['end'])
+        self.market_days = set(config['market_days'])
+        self.holidays = {datetime.strptime(day, '%Y-%m-%d').date() for day in config.get('holidays', [])}
+        # Bars are still being finalised for a short while after the close
+        self.post_close_grace = timedelta(minutes=config.get('post_close_grace_minutes', 0))
+
+    @staticmethod
+    def _parse_time(value):
+        hours, minutes = value.split(':')
+        return time(int(hours), int(minutes))
+
+    def now(self):
+        """Current time in the market timezone"""
+        return datetime.now(self.timezone)
+
+    def _localize(self, moment):
+        if moment is None:
+            return self.now()
+        if moment.tzinfo is None:
+            return self.timezone.localize(moment)
+        return moment.astimezone(self.timezone)
+
+    def is_trading_day(self, day):
+        """Check whether a date is a market day that is not a holiday"""
+        return day.strftime('%A') in self.market_days and day not in self.holidays
+
+    def is_open(self, moment=None):
+        """Check whether the market is in session"""
+        moment = self._localize(moment)
+        return (self.is_trading_day(moment.date()) and
+                self.open_time <= moment.time() <= self.close_time)
+
+    def status(self, moment=None):
+        """'OPEN' while the market is in session, 'CLOSED' otherwise"""
+        return "OPEN" if self.is_open(moment) else "CLOSED"
+
+    def next_open(self, moment=None):
+        """Start of the next trading session after the given moment"""
+        moment = self._localize(moment)
+        day = moment.date()
+        if moment.time() >= self.open_time:
+            day += timedelta(days=1)
+        while not self.is_trading_day(day):
+            day += timedelta(days=1)
+        return self.timezone.localize(datetime.combine(day, self.open_time))
+
+    def last_close(self, moment=None):
+        """End of the most recent completed trading session before the given moment"""
+        moment = self._localize(moment)
+        day = moment.date()
+        if moment.time() <= self.close_time:
+            day -= timedelta(days=1)
+        while not self.is_trading_day(day):
+            day -= timedelta(days=1)
+        return self.timezone.localize(datetime.combine(day, self.close_time))
+
+    def cache_ttl(self, live_ttl, moment=None):
+        """Cache lifetime in seconds for market data fetched at the given moment.
+
+        While the market is in session (and for the post-close grace period)
+        bars keep changing, so live_ttl applies. Otherwise nothing can change
+        before the next session opens, so entries stay valid until then.
+        """
+        moment = self._localize(moment)
+        if self.is_open(moment) or moment - self.last_close(moment) < self.post_close_grace:
+            return live_ttl
+        return max(live_ttl, (self.next_open(moment) - moment).total_seconds())
+
+    def hours_label(self):
+        """Trading hours formatted for display, e.g. '9:15 AM - 3:30 PM IST'"""
+        def fmt(value):
+            return datetime.combine(datetime.today(), value).strftime('%I:%M %p').lstrip('0')
+        zone = self.now().strftime('%Z')
+        return f"{fmt(self.open_time)} - {fmt(self.close_time)} {zone}"
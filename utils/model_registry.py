@@ -0,0 +1,208 @@
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import uuid
+from datetime import datetime
+
+import pandas as pd
+
+from utils.cache import LRUCache
+from utils.feature_store import feature_version
+from utils.model_utils import ModelUtils
+from config.settings import MODEL_PERSISTENCE
+
+CUTOFF_FORMAT = '%Y%m%dT%H%M%S'
+
+
+def schema_hash(predictor):
+    """Short hash of the features a predictor is trained on.
+
+    Covers the feature store version and the predictor's declared inputs,
+    so a model is never loaded against a feature layout it was not fitted on.
+    """
+    spec = (feature_version(), type(predictor).__name__,
+            list(getattr(predictor, 'required_indicators', [])),
+            list(getattr(predictor, 'feature_groups', [])),
+            list(getattr(predictor, 'feature_columns', [])),
+            getattr(predictor, 'sequence_length', None))
+    if hasattr(predictor, 'model_version'):
+        spec += (predictor.model_version,)  # Bumped when a predictor's trained state changes shape
+    return hashlib.blake2b(repr(spec).encode(), digest_size=6).hexdigest()
+
+
+def keras_to_bytes(model):
+    """Serialise a Keras model to .keras bytes (for predictors' __getstate__)"""
+    if model is None:
+        return None
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'model.keras')
+        model.save(path)
+        with open(path, 'rb') as f:
+            return f.read()
+
+
+def keras_from_bytes(data, load_model):
+    """Rebuild a Keras model saved by keras_to_bytes with the given load_model function"""
+    if data is None:
+        return None
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'model.keras')
+        with open(path, 'wb') as f:
+            f.write(data)
+        return load_model(path)
+
+
+class ModelRegistry:
+    """Versioned on-disk store of trained predictors with an LRU of loaded ones.
+
+    Entries are keyed by (model type, symbol, interval, feature-schema hash,
+    training cutoff) and live in
+    ``<root>/<model type>/<symbol>/<interval>/<schema>/<cutoff>/`` as a
+    pickled predictor plus ``model_metadata.json`` (written with
+    ModelUtils.save_model_metadata). Each entry is written to a temporary
+    directory and renamed into place, so readers never see half a model;
+    retraining on an existing cutoff swaps the files in one at a time, so
+    the entry never goes missing. Only the latest ``keep_cutoffs`` cutoffs
+    of each model are kept on disk.
+    """
+
+    def __init__(self, root=None, max_loaded=None, keep_cutoffs=None):
+        self.root = root or MODEL_PERSISTENCE['registry_path']
+        self.keep_cutoffs = keep_cutoffs or MODEL_PERSISTENCE['keep_cutoffs']
+        self.model_utils = ModelUtils()
+        # Deserialized predictors; switching back to a recent symbol is a dictionary lookup
+        self.loaded = LRUCache(max_entries=max_loaded or MODEL_PERSISTENCE['max_loaded_models'], name='models')
+        self._cutoffs = {}  # (model type, symbol, interval, schema) -> sorted training cutoffs
+        self._metadata = {}  # Entry key -> metadata, read once per entry
+        self._lock = threading.Lock()
+
+    def _entry_dir(self, model_type, symbol, interval, schema, cutoff=None):
+        parts = [self.root, model_type, symbol.replace(os.sep, '_'), interval, schema]
+        return os.path.join(*parts, cutoff) if cutoff else os.path.join(*parts)
+
+    @staticmethod
+    def format_cutoff(timestamp):
+        """Directory name for a training cutoff (last bar the model was trained on)"""
+        return pd.Timestamp(timestamp).strftime(CUTOFF_FORMAT)
+
+    @staticmethod
+    def parse_cutoff(cutoff, tz=None):
+        """Timestamp of a training cutoff, in the time zone of the bars it came from"""
+        timestamp = pd.Timestamp(datetime.strptime(cutoff, CUTOFF_FORMAT))
+        return timestamp.tz_localize(tz) if tz is not None else timestamp
+
+    def cutoffs(self, model_type, symbol, interval, schema, refresh=False):
+        """Training cutoffs available for a model, oldest first"""
+        prefix = (model_type, symbol, interval, schema)
+        with self._lock:
+            if refresh or prefix not in self._cutoffs:
+                directory = self._entry_dir(*prefix)
+                names = os.listdir(directory) if os.path.isdir(directory) else []
+                # Keep entries saved by this process even if writing them to disk failed
+                listed = {name for name in names if not name.startswith('.')}
+                self._cutoffs[prefix] = sorted(listed.union(self._cutoffs.get(prefix, [])))
+            return list(self._cutoffs[prefix])
+
+    def latest(self, model_type, symbol, interval, schema, as_of=None):
+        """Cutoff of the latest model trained no later than `as_of` (None = any), or None"""
+        limit = self.format_cutoff(as_of) if as_of is not None else None
+        cutoffs = self._usable(self.cutoffs(model_type, symbol, interval, schema), limit)
+        if not cutoffs:
+            # Another process (e.g. a prediction worker) may have registered one since we listed
+            cutoffs = self._usable(self.cutoffs(model_type, symbol, interval, schema, refresh=True), limit)
+        return cutoffs[-1] if cutoffs else None
+
+    def get(self, model_type, symbol, interval, schema, as_of=None):
+        """Latest predictor trained no later than `as_of` (None = any), or None"""
+        cutoff = self.latest(model_type, symbol, interval, schema, as_of)
+        if cutoff is None:
+            return None
+
+        key = (model_type, symbol, interval, schema, cutoff)
+        predictor = self.loaded.get(key)
+        if predictor is None:
+            predictor = self._load(key)
+            if predictor is not None:
+                self.loaded.set(key, predictor)
+        return predictor
+
+    @staticmethod
+    def _usable(cutoffs, limit):
+        return [cutoff for cutoff in cutoffs if cutoff <= limit] if limit else cutoffs
+
+    def _load(self, key):
+        path = os.path.join(self._entry_dir(*key), 'model.pkl')
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            print(f"Error loading {key[0]} model for {key[1]} ({key[2]}): {str(e)}")
+            return None
+
+    def save(self, model_type, symbol, interval, schema, cutoff, predictor, metadata=None):
+        """Register a trained predictor; it is kept loaded even if writing it to disk fails"""
+        cutoff = self.format_cutoff(cutoff)
+        key = (model_type, symbol, interval, schema, cutoff)
+        self.loaded.set(key, predictor)
+        with self._lock:
+            cutoffs = self._cutoffs.setdefault(key[:4], [])
+            if cutoff not in cutoffs:
+                cutoffs.append(cutoff)
+                cutoffs.sort()
+
+        metadata = dict(metadata or {})
+        metadata.update({'model_type': model_type, 'symbol': symbol, 'interval': interval,
+                         'schema': schema, 'training_cutoff': cutoff,
+                         'predictor': type(predictor).__name__, 'trained_at': datetime.now().isoformat()})
+        self._metadata[key] = metadata
+
+        final = self._entry_dir(*key)
+        staging = os.path.join(os.path.dirname(final), f".{cutoff}.tmp-{uuid.uuid4().hex}")
+        try:
+            os.makedirs(staging)
+            with open(os.path.join(staging, 'model.pkl'), 'wb') as f:
+                pickle.dump(predictor, f)
+            if not self.model_utils.save_model_metadata('model', metadata, directory=staging):
+                raise OSError("metadata could not be written")
+            try:
+                os.replace(staging, final)
+            except OSError:
+                if not os.path.isdir(final):
+                    raise
+                # Retrained on the same cutoff: replace the live entry's files in place
+                for name in sorted(os.listdir(staging), key=lambda name: name == 'model.pkl'):
+                    os.replace(os.path.join(staging, name), os.path.join(final, name))
+                shutil.rmtree(staging, ignore_errors=True)
+        except Exception as e:
+            print(f"Error saving {model_type} model for {symbol} ({interval}): {str(e)}")
+            shutil.rmtree(staging, ignore_errors=True)
+            return False
+        self._prune(key[:4])
+        return True
+
+    def _prune(self, prefix):
+        """Delete all but the latest keep_cutoffs entries of a model"""
+        cutoffs = self.cutoffs(*prefix, refresh=True)
+        stale = cutoffs[:-self.keep_cutoffs]
+        if not stale:
+            return
+        with self._lock:
+            self._cutoffs[prefix] = [cutoff for cutoff in self._cutoffs[prefix] if cutoff not in stale]
+        for cutoff in stale:
+            key = prefix + (cutoff,)
+            self.loaded.delete(key)
+            self._metadata.pop(key, None)
+            shutil.rmtree(self._entry_dir(*key), ignore_errors=True)
+
+    def metadata(self, model_type, symbol, interval, schema, cutoff):
+        """Metadata recorded for a registry entry"""
+        key = (model_type, symbol, interval, schema, cutoff)
+        if key not in self._metadata:
+            metadata = self.model_utils.load_model_metadata('model', directory=self._entry_dir(*key))
+            if metadata is None:
+                return None
+            self._metadata[key] = metadata
+        return self._metadata[key]
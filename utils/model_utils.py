@@ -17,24 +17,26 @@ class ModelUtils:
         if not os.path.exists(self.models_dir):
             os.makedirs(self.models_dir)
     
-    def save_model_metadata(self, model_name, metadata):
-        """Save model metadata to JSON file"""
+    def save_model_metadata(self, model_name, metadata, directory=None):
+        """Save model metadata to JSON file (in directory, default the models directory)"""
         try:
-            metadata_path = os.path.join(self.models_dir, f"{model_name}_metadata.json")
+            metadata_path = os.path.join(directory or self.models_dir, f"{model_name}_metadata.json")
             metadata['last_updated'] = datetime.now().isoformat()
             
-            with open(metadata_path, 'w') as f:
-                json.dump(metadata, f, indent=2)
+            # Write then rename, so a reader never sees a partial file
+            with open(metadata_path + '.tmp', 'w') as f:
+                json.dump(metadata, f, indent=2, default=str)
+            os.replace(metadata_path + '.tmp', metadata_path)
             
             return True
         except Exception as e:
             print(f"Error saving metadata for {model_name}: {str(e)}")
             return False
     
-    def load_model_metadata(self, model_name):
+    def load_model_metadata(self, model_name, directory=None):
         """Load model metadata from JSON file"""
         try:
-            metadata_path = os.path.join(self.models_dir, f"{model_name}_metadata.json")
+            metadata_path = os.path.join(directory or self.models_dir, f"{model_name}_metadata.json")
             
             if os.path.exists(metadata_path):
                 with open(metadata_path, 'r') as f:
@@ -7,12 +7,17 @@ import streamlit as st
 from textblob import TextBlob
 import re
 
+from utils.cache import LRUCache
+from config.settings import CACHE_CONFIG
+
 class NewsSentimentAnalyzer:
     """News sentiment analysis and market intelligence system"""
     
     def __init__(self):
-        self.cache = {}
         self.cache_duration = 300  # 5 minutes
+        self.cache = LRUCache(max_bytes=CACHE_CONFIG['news']['max_bytes'],
+                              max_entries=CACHE_CONFIG['news']['max_entries'],
+                              default_ttl=self.cache_duration, name='news')
         
     def clean_text(self, text):
         """Clean and preprocess text for sentiment analysis"""
@@ -112,12 +117,11 @@ class NewsSentimentAnalyzer:
     def get_news_sentiment(self, symbol, company_name):
         """Get news sentiment analysis for a stock"""
         cache_key = f"news_sentiment_{symbol}"
-        current_time = time.time()
         
         # Check cache
-        if (cache_key in self.cache and 
-            current_time - self.cache[cache_key]['timestamp'] < self.cache_duration):
-            return self.cache[cache_key]['data']
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         try:
             # Get news data (using mock data for now)
@@ -190,10 +194,7 @@ class NewsSentimentAnalyzer:
             }
             
             # Cache the result
-            self.cache[cache_key] = {
-                'data': result,
-                'timestamp': current_time
-            }
+            self.cache.set(cache_key, result)
             
             return result
             
@@ -0,0 +1,153 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from config.settings import DATA_CONFIG
+
+try:
+    import pyarrow  # noqa: F401 - required by DataFrame.to_parquet / read_parquet
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+    print("pyarrow not available - persistent OHLCV store disabled")
+
+
+# Calendar length of the yfinance periods that are not counted in trading sessions
+PERIOD_OFFSETS = {
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10)
+}
+
+# Periods yfinance counts in trading sessions rather than calendar time
+SESSION_PERIODS = {'1d': 1, '5d': 5}
+
+
+class OHLCVStore:
+    """Persistent columnar (Parquet) OHLCV store, one partition per symbol and interval.
+
+    Each partition is ``<root>/interval=<interval>/symbol=<symbol>/`` holding
+    ``bars.parquet`` and a small ``meta.json`` that records how far back the
+    stored history is known to be complete.
+    """
+
+    def __init__(self, root=None):
+        store_config = DATA_CONFIG['ohlcv_store']
+        self.root = root or store_config['path']
+        self.enabled = PARQUET_AVAILABLE and store_config['enabled']
+        self._lock = threading.Lock()
+        self._partition_locks = {}  # (symbol, interval) -> lock held across read-merge-write
+
+    def _partition_dir(self, symbol, interval):
+        """Directory holding a symbol/interval partition"""
+        return os.path.join(self.root, f"interval={interval}", f"symbol={symbol}")
+
+    def partition_lock(self, symbol, interval):
+        """Lock serialising read-merge-write cycles on one partition"""
+        with self._lock:
+            return self._partition_locks.setdefault((symbol, interval), threading.Lock())
+
+    def read(self, symbol, interval):
+        """Read the stored bars and metadata for a partition, (None, None) if missing"""
+        partition = self._partition_dir(symbol, interval)
+        bars_path = os.path.join(partition, 'bars.parquet')
+        meta_path = os.path.join(partition, 'meta.json')
+
+        with self._lock:
+            if not os.path.exists(bars_path):
+                return None, None
+            try:
+                data = pd.read_parquet(bars_path)
+                metadata = {}
+                if os.path.exists(meta_path):
+                    with open(meta_path, 'r') as f:
+                        metadata = json.load(f)
+                return data, metadata
+            except Exception as e:
+                print(f"Error reading OHLCV store for {symbol} ({interval}): {str(e)}")
+                return None, None
+
+    def write(self, symbol, interval, data, metadata):
+        """Atomically replace a partition with new bars and metadata"""
+        partition = self._partition_dir(symbol, interval)
+        bars_path = os.path.join(partition, 'bars.parquet')
+        meta_path = os.path.join(partition, 'meta.json')
+
+        metadata = dict(metadata)
+        metadata['rows'] = len(data)
+        metadata['last_bar'] = data.index[-1].isoformat() if len(data) else None
+        metadata['last_updated'] = datetime.now().isoformat()
+
+        with self._lock:
+            try:
+                os.makedirs(partition, exist_ok=True)
+                data.to_parquet(bars_path + '.tmp')
+                os.replace(bars_path + '.tmp', bars_path)
+                with open(meta_path + '.tmp', 'w') as f:
+                    json.dump(metadata, f, indent=2)
+                os.replace(meta_path + '.tmp', meta_path)
+                return True
+            except Exception as e:
+                print(f"Error writing OHLCV store for {symbol} ({interval}): {str(e)}")
+                return False
+
+    @staticmethod
+    def merge(existing, new):
+        """Append new bars, letting re-downloaded bars replace stored ones"""
+        if existing is None or existing.empty:
+            return new
+        if new is None or new.empty:
+            return existing
+        merged = pd.concat([existing, new])
+        merged = merged[~merged.index.duplicated(keep='last')]
+        return merged.sort_index()
+
+    @staticmethod
+    def period_start(period, now):
+        """Calendar start of a yfinance period, None for 'max' and session-counted periods"""
+        if period in PERIOD_OFFSETS:
+            return now - PERIOD_OFFSETS[period]
+        if period == 'ytd':
+            return now.normalize().replace(month=1, day=1)
+        return None
+
+    @classmethod
+    def covers(cls, data, metadata, period):
+        """Check whether stored history reaches back far enough for a period"""
+        if data is None or data.empty or not metadata:
+            return False
+        if metadata.get('full_history'):
+            return True
+        if period == 'max':
+            return False
+        if period in SESSION_PERIODS:
+            return data.index.normalize().nunique() >= SESSION_PERIODS[period]
+
+        now = pd.Timestamp.now(tz=data.index.tz)
+        coverage_start = pd.Timestamp(metadata.get('coverage_start'))
+        if coverage_start.tzinfo is None and data.index.tz is not None:
+            coverage_start = coverage_start.tz_localize(data.index.tz)
+        return coverage_start <= cls.period_start(period, now)
+
+    @classmethod
+    def slice_period(cls, data, period):
+        """Cut stored history down to the bars yfinance would return for a period"""
+        if data is None or data.empty or period == 'max':
+            return data
+        if period in SESSION_PERIODS:
+            sessions = data.index.normalize()
+            first_session = sessions.unique()[-SESSION_PERIODS[period]:][0]
+            return data[sessions >= first_session]
+
+        now = pd.Timestamp.now(tz=data.index.tz)
+        start = cls.period_start(period, now)
+        if start is None:
+            return data
+        return data[data.index >= start]
@@ -88,10 +88,13 @@ class PortfolioTracker:
         
         holdings = st.session_state[self.portfolio_key]['holdings']
         
+        # Refresh every holding's intraday data in parallel
+        latest_data = data_fetcher.fetch_parallel({holding['symbol'] for holding in holdings}, '1d')
+        
         for holding in holdings:
             try:
                 # Get current price
-                current_data = data_fetcher.get_stock_data(holding['symbol'], '1d')
+                current_data = latest_data.get(holding['symbol'])
                 if current_data is not None and not current_data.empty:
                     current_price = float(current_data['Close'].iloc[-1])
                     holding['current_price'] = current_price
@@ -254,13 +257,17 @@ class PortfolioTracker:
         
         triggered_alerts = []
         
+        # Refresh the intraday data of every symbol with a pending alert in parallel
+        pending_symbols = {alert['symbol'] for alert in st.session_state[self.alerts_key] if not alert['triggered']}
+        latest_data = data_fetcher.fetch_parallel(pending_symbols, '1d')
+        
         for alert in st.session_state[self.alerts_key]:
             if alert['triggered']:
                 continue
             
             try:
                 # Get current price
-                current_data = data_fetcher.get_stock_data(alert['symbol'], '1d')
+                current_data = latest_data.get(alert['symbol'])
                 if current_data is not None and not current_data.empty:
                     current_price = float(current_data['Close'].iloc[-1])
                     
@@ -0,0 +1,181 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from config.settings import PREDICTION_CONFIG
+
+PARALLEL_CONFIG = PREDICTION_CONFIG['parallel']
+
+
+def init_worker(registry_root):
+    """Build a worker process's engine up front, sharing the parent's model registry"""
+    from utils.engine import get_engine
+    from utils.model_registry import ModelRegistry
+
+    engine = get_engine()
+    if engine.model_registry.root != registry_root:
+        engine.model_registry = ModelRegistry(root=registry_root)
+    # Workers train synchronously; only the app process queues background training
+    engine.training_queue.enabled = False
+
+
+def _ready():
+    """No-op task used to get workers spawned"""
+    return os.getpid()
+
+
+def _predict_in_worker(model_name, data):
+    """Run one predictor in a worker process -> (result, seconds)"""
+    from utils.engine import get_engine
+
+    start = time.perf_counter()
+    result = get_engine().predict(model_name, data)
+    return result, time.perf_counter() - start
+
+
+class PredictionOrchestrator:
+    """Runs the selected predictors concurrently in a pool of worker processes.
+
+    The sklearn/XGBoost/Keras/Prophet fits are CPU-bound and would serialise
+    on the GIL in threads, so each prediction goes to a spawned worker with
+    its own engine. Workers share the on-disk model registry, so a model
+    trained in one worker is loaded, not retrained, by the others and by
+    the app process. Results are yielded as they complete; a model that
+    overruns its timeout (PREDICTION_CONFIG['parallel']['timeouts'],
+    counted from when a worker picks it up) is reported as failed and its
+    worker replaced. Without a usable pool the predictors run one after
+    another in this process.
+    """
+
+    POLL_INTERVAL = 0.5  # seconds between checks for queued models that have started
+
+    def __init__(self, engine, max_workers=None, timeouts=None, enabled=None):
+        self.engine = engine
+        self.enabled = PARALLEL_CONFIG['enabled'] if enabled is None else enabled
+        self.max_workers = (max_workers or PARALLEL_CONFIG['max_workers']
+                            or min(len(engine.predictors), os.cpu_count() or 1))
+        self.timeouts = dict(PARALLEL_CONFIG['timeouts'], **(timeouts or {}))
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def timeout_for(self, model_name):
+        """Seconds a model may take, including a first-use training run"""
+        return self.timeouts.get(model_name, PARALLEL_CONFIG['default_timeout'])
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                context = multiprocessing.get_context(PARALLEL_CONFIG['start_method'])
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context,
+                                                 initializer=init_worker,
+                                                 initargs=(self.engine.model_registry.root,))
+            return self._pool
+
+    def start(self):
+        """Spawn the workers ahead of the first prediction (they start in the background)"""
+        if not self.enabled or self.max_workers < 2 or self._pool is not None:
+            return
+        try:
+            pool = self._get_pool()
+            # Workers are spawned on demand, one per task that finds no idle worker
+            for _ in range(self.max_workers):
+                pool.submit(_ready)
+        except Exception as e:
+            print(f"Could not start prediction workers: {str(e)}")
+
+    def _discard_pool(self, pool):
+        """Stop a pool with stuck or dead workers; the next run starts a fresh one"""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        # The executor cannot cancel a running call, so end its workers directly
+        processes = list((getattr(pool, '_processes', None) or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def run(self, model_names, data):
+        """Yield (model name, result, error, seconds) for each model as it finishes.
+
+        `result` is the predictor's output dict, or None with `error` set
+        when the model failed or timed out.
+        """
+        model_names = list(model_names)
+        # Cold models answer with their fallback at once while they train in the background;
+        # models new bars have left behind get queued for catching up
+        for name in list(model_names):
+            start = time.perf_counter()
+            fallback = self.engine.schedule_training(name, data)
+            if fallback is not None:
+                model_names.remove(name)
+                yield name, fallback, None, time.perf_counter() - start
+
+        if not self.enabled or self.max_workers < 2 or len(model_names) < 2:
+            yield from self._run_inline(model_names, data)
+            return
+
+        try:
+            pool = self._get_pool()
+            futures = {pool.submit(_predict_in_worker, name, data): name for name in model_names}
+        except Exception as e:
+            print(f"Prediction pool unavailable, running models in-process: {str(e)}")
+            yield from self._run_inline(model_names, data)
+            return
+
+        started = time.perf_counter()
+        deadlines = {}  # Set when a model leaves the queue, so waiting for a free worker is not charged
+        pending = set(futures)
+        crashed = []
+        timed_out = False
+        while pending:
+            now = time.perf_counter()
+            for future in pending:
+                if future not in deadlines and future.running():
+                    deadlines[future] = now + self.timeout_for(futures[future])
+            running = [deadlines[future] for future in pending if future in deadlines]
+            timeout = min([self.POLL_INTERVAL] + [deadline - now for deadline in running])
+            done, pending = wait(pending, timeout=max(0.0, timeout), return_when=FIRST_COMPLETED)
+            for future in done:
+                name = futures[future]
+                try:
+                    result, seconds = future.result()
+                    yield name, result, None, seconds
+                except BrokenProcessPool:
+                    crashed.append(name)
+                except Exception as e:
+                    yield name, None, str(e), time.perf_counter() - started
+
+            now = time.perf_counter()
+            for future in [future for future in pending if deadlines.get(future, now + 1) <= now]:
+                pending.discard(future)
+                future.cancel()
+                timed_out = True
+                name = futures[future]
+                yield name, None, f"timed out after {self.timeout_for(name):.0f}s", now - started
+
+        if timed_out or crashed:
+            self._discard_pool(pool)
+        if crashed:
+            # A worker died (e.g. ran out of memory) and took the pool down with it
+            print(f"Prediction worker crashed, running {', '.join(crashed)} in-process")
+            yield from self._run_inline(crashed, data)
+
+    def _run_inline(self, model_names, data):
+        """Run the models one after another in this process"""
+        for name in model_names:
+            start = time.perf_counter()
+            try:
+                yield name, self.engine.predict(name, data), None, time.perf_counter() - start
+            except Exception as e:
+                yield name, None, str(e), time.perf_counter() - start
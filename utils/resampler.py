@@ -0,0 +1,75 @@
+import pandas as pd
+
+from config.settings import MARKET_CONFIG
+
+# yfinance interval -> pandas resample rule
+INTERVAL_RULES = {
+    '1m': '1min',
+    '2m': '2min',
+    '5m': '5min',
+    '15m': '15min',
+    '30m': '30min',
+    '60m': '60min',
+    '90m': '90min',
+    '1h': '60min',
+    '1d': '1D'
+}
+
+# How each column is combined when bars are merged; unknown columns keep their last value
+OHLCV_AGGREGATIONS = {
+    'Open': 'first',
+    'High': 'max',
+    'Low': 'min',
+    'Close': 'last',
+    'Adj Close': 'last',
+    'Volume': 'sum',
+    'Dividends': 'sum',
+    'Stock Splits': 'max'
+}
+
+
+def interval_timedelta(interval):
+    """Bar length of a yfinance interval as a Timedelta"""
+    return pd.Timedelta(INTERVAL_RULES[interval])
+
+
+def session_offset():
+    """Offset of the session open from midnight, so intraday buckets start at 09:15"""
+    hours, minutes = MARKET_CONFIG['trading_hours']['start'].split(':')
+    return pd.Timedelta(hours=int(hours), minutes=int(minutes))
+
+
+def bar_spacing(data):
+    """Typical spacing between consecutive bars, None if it cannot be told"""
+    if data is None or len(data) < 2:
+        return None
+    return pd.Series(data.index).diff().median()
+
+
+def resample_ohlcv(data, interval):
+    """Aggregate finer OHLCV bars into coarser `interval` bars.
+
+    Intraday buckets are anchored at the session open (09:15 IST) so derived
+    15m/30m/1h bars line up with the ones Yahoo serves; daily bars are
+    labelled at midnight in the data's timezone. Frames that are already at
+    (or coarser than) the requested interval are returned unchanged.
+    """
+    if data is None or data.empty:
+        return data
+
+    target = interval_timedelta(interval)
+    spacing = bar_spacing(data)
+    if spacing is not None and spacing >= target:
+        return data
+
+    aggregations = {col: OHLCV_AGGREGATIONS.get(col, 'last') for col in data.columns}
+    if interval == '1d':
+        resampler = data.resample(INTERVAL_RULES[interval])
+    else:
+        resampler = data.resample(INTERVAL_RULES[interval], origin='start_day', offset=session_offset())
+
+    resampled = resampler.agg(aggregations)
+    # Buckets outside the session (nights, weekends) have no trades
+    if 'Open' in resampled.columns:
+        resampled = resampled.dropna(subset=['Open'])
+    return resampled
@@ -0,0 +1,70 @@
+from config.settings import MODEL_PERSISTENCE
+
+INCREMENTAL_CONFIG = MODEL_PERSISTENCE['incremental']
+
+
+def return_volatility(data, window=None):
+    """Standard deviation of bar-to-bar returns over the most recent `window` bars"""
+    window = window or INCREMENTAL_CONFIG['window']
+    returns = data['Close'].iloc[-(window + 1):].astype(float).pct_change().dropna()
+    return float(returns.std()) if len(returns) > 1 else None
+
+
+class RetrainPolicy:
+    """Decides how a registered model catches up with bars that arrived after its cutoff.
+
+    ``decide`` returns one of
+
+    - ``'keep'``: too few new bars, or nothing forces a refit of a predictor
+      that cannot be updated (it keeps serving until one is forced);
+    - ``'update'``: warm start, i.e. continue training on the recent window;
+    - ``'refit'``: full retrain, forced when the last full fit is older than
+      ``max_model_age`` days of bars, when return volatility has drifted by
+      ``drift_threshold`` either way since then, or after ``max_updates``
+      updates in a row.
+
+    ``min_new_bars`` and ``max_model_age`` depend on the frame's bar
+    interval (``data.attrs['interval']``), so 5-minute models are not
+    caught up on every bar nor kept for as long as daily ones.
+
+    A feature-schema change needs no rule here: the registry keys models by
+    schema hash, so a new schema finds no model and trains from scratch.
+    """
+
+    def __init__(self, config=None, max_model_age=None):
+        self.config = dict(INCREMENTAL_CONFIG, **(config or {}))
+        self.max_model_age = max_model_age  # Days for every interval; None = per interval
+
+    def limits(self, interval):
+        """(new bars needed for a catch-up, days before a full refit) for a bar interval"""
+        min_new_bars = self.config['min_new_bars']
+        if isinstance(min_new_bars, dict):
+            min_new_bars = min_new_bars.get(interval, 1)
+        max_model_age = self.max_model_age or self.config['max_model_age'].get(
+            interval, MODEL_PERSISTENCE['max_model_age'])
+        return min_new_bars, max_model_age
+
+    def decide(self, metadata, data, new_bars, full_fit_at, can_update=True):
+        """-> (action, reason) for a model whose last full fit ended at bar `full_fit_at`"""
+        min_new_bars, max_model_age = self.limits(data.attrs.get('interval'))
+        if new_bars < min_new_bars:
+            return 'keep', f"{new_bars} new bars"
+
+        age = (data.index[-1] - full_fit_at).days
+        if age > max_model_age:
+            return 'refit', f"last full fit is {age} days old"
+
+        trained_volatility = metadata.get('return_volatility')
+        volatility = return_volatility(data, self.config['window'])
+        if trained_volatility and volatility:
+            drift = max(volatility / trained_volatility, trained_volatility / volatility)
+            if drift > self.config['drift_threshold']:
+                return 'refit', f"return volatility drifted {drift:.2f}x"
+
+        if metadata.get('updates', 0) >= self.config['max_updates']:
+            return 'refit', f"{metadata['updates']} incremental updates since the last full fit"
+        if not self.config['enabled']:
+            return 'refit', f"{new_bars} new bars (incremental updates disabled)"
+        if not can_update:
+            return 'keep', "predictor has no incremental mode"
+        return 'update', f"{new_bars} new bars"
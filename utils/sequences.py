@@ -0,0 +1,74 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def sliding_windows(values, length):
+    """Every `length`-row window of a (rows x features) array -> (rows - length + 1, length, features).
+
+    The result is a read-only strided view of `values`: no rows are copied,
+    so memory stays O(rows x features) whatever the window length.
+    """
+    values = np.asarray(values)
+    if values.ndim == 1:
+        values = values[:, None]
+    if len(values) < length:
+        return np.empty((0, length, values.shape[1]), dtype=values.dtype)
+    return sliding_window_view(values, length, axis=0).transpose(0, 2, 1)
+
+
+def make_sequences(values, targets, length):
+    """Training pairs (X, y): X[i] is the `length` rows before targets[i + length].
+
+    Same pairs as appending values[i - length:i] / targets[i] in a loop,
+    but X is a view of `values`.
+    """
+    return sliding_windows(values, length)[:-1], np.asarray(targets)[length:]
+
+
+def sequence_batches(windows, targets, batch_size=32, shuffle=False, seed=None):
+    """Keras dataset of (X, y) batches gathered from a window view.
+
+    Only one batch of windows is materialised at a time, so fit/predict
+    never turn the whole view into an (N x length x features) tensor.
+    Keras is imported here rather than at module level so the models can
+    pick their Keras backend first.
+    """
+    try:
+        from keras.utils import PyDataset as KerasDataset
+    except ImportError:
+        from keras.utils import Sequence as KerasDataset  # Keras 2
+
+    class WindowBatches(KerasDataset):
+        def __init__(self):
+            super().__init__()
+            self.order = np.arange(len(windows))
+            self.rng = np.random.default_rng(seed)
+            self.on_epoch_end()
+
+        def __len__(self):
+            return int(np.ceil(len(windows) / batch_size))
+
+        def __getitem__(self, batch):
+            rows = self.order[batch * batch_size:(batch + 1) * batch_size]
+            return (np.ascontiguousarray(windows[rows], dtype=np.float32),
+                    np.asarray(targets[rows], dtype=np.float32))
+
+        def on_epoch_end(self):
+            if shuffle:
+                self.rng.shuffle(self.order)
+
+    return WindowBatches()
+
+
+def fine_tune(model, windows, targets, epochs, recent, batch_size=32):
+    """Continue training a compiled Keras model on its last `recent` windows; returns the final loss.
+
+    The optimizer state saved with the model carries over, so a few epochs
+    on the newest bars adjust the weights instead of relearning them.
+    """
+    windows, targets = windows[-recent:], np.asarray(targets)[-recent:]
+    if len(windows) == 0:
+        raise ValueError("No windows to fine-tune on")
+    history = model.fit(sequence_batches(windows, targets, batch_size=batch_size, shuffle=True),
+                        epochs=epochs, verbose=0)
+    return history.history['loss'][-1]
@@ -0,0 +1,403 @@
+import copy
+import math
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from utils.technical_indicators import TechnicalIndicators, INDICATOR_COLUMNS, FLAG_COLUMNS
+from utils.frame_schema import compact_frame
+from config.settings import TECHNICAL_INDICATORS
+
+
+def _div(a, b):
+    """Division with Series semantics: x/0 -> +-inf and 0/0 -> nan instead of raising"""
+    try:
+        return a / b
+    except ZeroDivisionError:
+        if a == 0 or math.isnan(a):
+            return math.nan
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+
+
+def _finite(value):
+    """Map +-inf to nan, as add_all_indicators does for the whole frame"""
+    return value if math.isfinite(value) else math.nan
+
+
+class RollingStats:
+    """Fixed-size rolling window with O(1) mean/std updates (add/remove Welford).
+
+    Like pandas ``rolling(window)``, a value is only reported once the window
+    holds `window` non-NaN observations.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.nobs = 0
+        self._mean = 0.0
+        self._ssqdm = 0.0
+
+    def push(self, x):
+        self.values.append(x)
+        self._add(x)
+        if len(self.values) > self.window:
+            self._remove(self.values.popleft())
+
+    def seed(self, values):
+        for x in values[-self.window:]:
+            self.push(float(x))
+
+    def _add(self, x):
+        if math.isnan(x):
+            return
+        self.nobs += 1
+        delta = x - self._mean
+        self._mean += delta / self.nobs
+        self._ssqdm += delta * (x - self._mean)
+
+    def _remove(self, x):
+        if math.isnan(x):
+            return
+        self.nobs -= 1
+        if self.nobs == 0:
+            self._mean = 0.0
+            self._ssqdm = 0.0
+            return
+        delta = x - self._mean
+        self._mean -= delta / self.nobs
+        self._ssqdm -= delta * (x - self._mean)
+
+    def mean(self):
+        return self._mean if self.nobs >= self.window else math.nan
+
+    def std(self):
+        if self.nobs < self.window or self.nobs < 2:
+            return math.nan
+        return math.sqrt(max(self._ssqdm, 0.0) / (self.nobs - 1))
+
+    def mean_abs_deviation(self):
+        """Mean absolute deviation around the window mean (O(window), window is fixed)"""
+        if self.nobs < self.window:
+            return math.nan
+        window = np.fromiter(self.values, dtype=float, count=len(self.values))
+        return float(np.mean(np.abs(window - window.mean())))
+
+
+class RollingExtreme:
+    """Rolling max (or min) over a fixed window using a monotonic deque, amortised O(1)"""
+
+    def __init__(self, window, mode='max'):
+        self.window = window
+        self.sign = 1.0 if mode == 'max' else -1.0
+        self.candidates = deque()  # (position, signed value), values decreasing
+        self.position = 0
+
+    def push(self, x):
+        value = self.sign * x
+        while self.candidates and self.candidates[-1][1] <= value:
+            self.candidates.pop()
+        self.candidates.append((self.position, value))
+        if self.candidates[0][0] <= self.position - self.window:
+            self.candidates.popleft()
+        self.position += 1
+
+    def seed(self, values):
+        for x in values[-self.window:]:
+            self.push(float(x))
+
+    def value(self):
+        if self.position < self.window:
+            return math.nan
+        return self.sign * self.candidates[0][1]
+
+
+class EWMean:
+    """Exponentially weighted mean matching pandas ``ewm(span=...).mean()`` (adjust=True)"""
+
+    def __init__(self, span):
+        self.span = span
+        self.decay = 1.0 - 2.0 / (span + 1.0)
+        self.value = math.nan
+        self.weight = 0.0
+
+    def push(self, x):
+        if math.isnan(x):
+            return self.value
+        if self.weight == 0.0:
+            self.value = x
+        else:
+            decayed = self.decay * self.weight
+            self.value = (x + decayed * self.value) / (1.0 + decayed)
+        self.weight = 1.0 + self.decay * self.weight
+        return self.value
+
+    def seed(self, values):
+        series = pd.Series(values, dtype=float)
+        observations = int(series.notna().sum())
+        if observations == 0:
+            return
+        self.value = float(series.ewm(span=self.span).mean().iloc[-1])
+        self.weight = (1.0 - self.decay ** observations) / (1.0 - self.decay)
+
+
+class StreamingIndicators:
+    """Stateful counterpart of TechnicalIndicators.add_all_indicators.
+
+    ``warm_up(df)`` computes the batch indicators once and seeds the rolling
+    state from the tail of the history; each ``update(bar)`` then produces
+    every indicator for one new bar in constant time, independent of how long
+    the history is. Values match the batch implementation.
+    """
+
+    def __init__(self):
+        self.sma_20 = RollingStats(20)  # Also the Bollinger window
+        self.sma_50 = RollingStats(50)
+        self.ema_20 = EWMean(20)
+        self.ema_fast = EWMean(12)
+        self.ema_slow = EWMean(26)
+        self.macd_signal = EWMean(9)
+        self.rsi_gain = RollingStats(14)
+        self.rsi_loss = RollingStats(14)
+        self.high_max = RollingExtreme(14, 'max')  # Stochastic and Williams %R
+        self.low_min = RollingExtreme(14, 'min')
+        self.stoch_d = RollingStats(3)
+        self.atr = RollingStats(14)
+        self.volatility = RollingStats(20)
+        self.cci = RollingStats(20)
+        self.volume_sma = RollingStats(20)
+        self.closes = deque(maxlen=13)  # Momentum (10) and ROC (12) look-back
+        self.prev_close = math.nan
+        self.obv = 0.0
+        self.cum_pv = 0.0
+        self.cum_volume = 0.0
+        self.bars = 0
+
+    def warm_up(self, data):
+        """Seed the state from a history frame; returns the batch indicator frame for it"""
+        result = TechnicalIndicators().add_all_indicators(data)
+        if data is None or data.empty:
+            return result
+
+        close = data['Close'].to_numpy(dtype=float)
+        high = data['High'].to_numpy(dtype=float)
+        low = data['Low'].to_numpy(dtype=float)
+        volume = data['Volume'].to_numpy(dtype=float)
+        prev_close = np.r_[np.nan, close[:-1]]
+
+        self.sma_20.seed(close)
+        self.sma_50.seed(close)
+        self.ema_20.seed(close)
+        self.ema_fast.seed(close)
+        self.ema_slow.seed(close)
+        ema_fast = pd.Series(close).ewm(span=12).mean()
+        ema_slow = pd.Series(close).ewm(span=26).mean()
+        self.macd_signal.seed((ema_fast - ema_slow).to_numpy())
+
+        delta = close - prev_close
+        self.rsi_gain.seed(np.where(delta > 0, delta, 0.0))
+        self.rsi_loss.seed(np.where(delta < 0, -delta, 0.0))
+
+        self.high_max.seed(high)
+        self.low_min.seed(low)
+        tail = slice(-(self.stoch_d.window + self.high_max.window), None)
+        high_max = pd.Series(high[tail]).rolling(self.high_max.window).max().to_numpy()
+        low_min = pd.Series(low[tail]).rolling(self.low_min.window).min().to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            stoch_k = 100 * ((close[tail] - low_min) / (high_max - low_min))
+        self.stoch_d.seed(stoch_k)
+
+        true_range = np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+        self.atr.seed(true_range)
+        self.volatility.seed(close / prev_close - 1)
+        typical_price = (high + low + close) / 3
+        self.cci.seed(typical_price)
+        self.volume_sma.seed(volume)
+        self.closes.extend(close[-self.closes.maxlen:])
+
+        self.prev_close = float(close[-1])
+        self.obv = float(np.nan_to_num(np.sign(delta) * volume).cumsum()[-1])
+        self.cum_pv = float(np.cumsum(typical_price * volume)[-1])
+        self.cum_volume = float(np.cumsum(volume)[-1])
+        self.bars = len(data)
+
+        return result
+
+    def update(self, bar):
+        """Advance the state by one bar (mapping with Open/High/Low/Close/Volume); returns its indicators"""
+        close = float(bar['Close'])
+        high = float(bar['High'])
+        low = float(bar['Low'])
+        volume = float(bar['Volume'])
+        prev_close = self.prev_close
+        values = {}
+
+        # Moving averages
+        self.sma_20.push(close)
+        self.sma_50.push(close)
+        values['SMA_20'] = self.sma_20.mean()
+        values['SMA_50'] = self.sma_50.mean()
+        values['EMA_20'] = self.ema_20.push(close)
+
+        # RSI (the first bar has no change and counts as zero gain/loss)
+        delta = close - prev_close
+        self.rsi_gain.push(delta if delta > 0 else 0.0)
+        self.rsi_loss.push(-delta if delta < 0 else 0.0)
+        rs = _div(self.rsi_gain.mean(), self.rsi_loss.mean())
+        values['RSI'] = 100 - _div(100, 1 + rs)
+
+        # MACD
+        macd = self.ema_fast.push(close) - self.ema_slow.push(close)
+        macd_signal = self.macd_signal.push(macd)
+        values['MACD'] = macd
+        values['MACD_Signal'] = macd_signal
+        values['MACD_Histogram'] = macd - macd_signal
+
+        # Bollinger Bands
+        std = self.sma_20.std()
+        values['BB_Upper'] = values['SMA_20'] + std * 2
+        values['BB_Lower'] = values['SMA_20'] - std * 2
+        values['BB_Middle'] = values['SMA_20']
+
+        # Stochastic and Williams %R
+        self.high_max.push(high)
+        self.low_min.push(low)
+        high_max = self.high_max.value()
+        low_min = self.low_min.value()
+        stoch_k = 100 * _div(close - low_min, high_max - low_min)
+        self.stoch_d.push(stoch_k)
+        values['Stoch_K'] = stoch_k
+        values['Stoch_D'] = self.stoch_d.mean()
+        values['Williams_R'] = -100 * _div(high_max - close, high_max - low_min)
+
+        # ATR (undefined true range on the first bar, like the batch shift())
+        true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+        if math.isnan(prev_close):
+            true_range = math.nan
+        self.atr.push(true_range)
+        values['ATR'] = self.atr.mean()
+
+        # OBV and VWAP
+        if not math.isnan(delta):
+            self.obv += (delta > 0) * volume - (delta < 0) * volume
+        values['OBV'] = self.obv
+        typical_price = (high + low + close) / 3
+        self.cum_pv += typical_price * volume
+        self.cum_volume += volume
+        values['VWAP'] = _div(self.cum_pv, self.cum_volume)
+
+        # Volatility, momentum and rate of change
+        self.volatility.push(_div(close, prev_close) - 1)
+        values['Volatility'] = self.volatility.std()
+        self.closes.append(close)
+        close_10 = self.closes[-11] if len(self.closes) > 10 else math.nan
+        close_12 = self.closes[-13] if len(self.closes) > 12 else math.nan
+        values['Momentum'] = close - close_10
+        values['ROC'] = _div(close - close_12, close_12) * 100
+
+        # CCI
+        self.cci.push(typical_price)
+        values['CCI'] = _div(typical_price - self.cci.mean(), 0.015 * self.cci.mean_abs_deviation())
+
+        # Derived signals
+        values['Price_Above_SMA20'] = int(close > values['SMA_20'])
+        values['Price_Above_SMA50'] = int(close > values['SMA_50'])
+        values['SMA20_Above_SMA50'] = int(values['SMA_20'] > values['SMA_50'])
+        values['BB_Position'] = _div(close - values['BB_Lower'], values['BB_Upper'] - values['BB_Lower'])
+        values['RSI_Overbought'] = int(values['RSI'] > 70)
+        values['RSI_Oversold'] = int(values['RSI'] < 30)
+
+        # Volume analysis
+        self.volume_sma.push(volume)
+        values['Volume_SMA'] = self.volume_sma.mean()
+        values['Volume_Ratio'] = _div(volume, values['Volume_SMA'])
+
+        self.prev_close = close
+        self.bars += 1
+
+        return {column: (value if column in FLAG_COLUMNS else _finite(value))
+                for column, value in values.items()}
+
+    def peek(self, bar):
+        """Indicators for a bar that is still forming, without advancing the state"""
+        return copy.deepcopy(self).update(bar)
+
+
+class IndicatorStream:
+    """Keeps an indicator frame for one symbol/period current as bars arrive.
+
+    The last bar of a live feed may still be forming, so the streaming state
+    is committed up to the second-to-last bar and the final row is computed
+    with ``peek``. A refresh only streams the bars after the last committed
+    one; the history is recomputed in batch when it no longer lines up (first
+    use, a window that starts on a different bar, revised prices, or a gap
+    longer than ``max_incremental_bars``). OBV, VWAP and the warm-up periods
+    are counted from the first bar, so a window that slid forward cannot
+    reuse the state built over the bars it dropped.
+    """
+
+    def __init__(self, max_incremental_bars=None, compact=False):
+        self.max_incremental_bars = max_incremental_bars or TECHNICAL_INDICATORS['streaming_max_bars']
+        self.compact = compact  # Keep the frame in the compact (float32/int8) schema
+        self.indicators = None
+        self.frame = None
+        self._lock = threading.Lock()
+
+    def __sizeof__(self):
+        # Lets the byte-budgeted caches account for the frame this stream holds
+        if self.frame is None:
+            return object.__sizeof__(self)
+        return object.__sizeof__(self) + int(self.frame.memory_usage(index=True, deep=True).sum())
+
+    def refresh(self, data):
+        """Return data with every indicator column, streaming only the bars that are new"""
+        with self._lock:
+            if data is None or data.empty:
+                return data
+            if not self._continues(data):
+                return self._rebuild(data)
+
+            committed_last = self.frame.index[-2]
+            new_bars = data[data.index > committed_last]
+            rows = [self.indicators.update(bar) for _, bar in new_bars.iloc[:-1].iterrows()]
+            rows.append(self.indicators.peek(new_bars.iloc[-1]))
+
+            new_rows = new_bars.replace([np.inf, -np.inf], np.nan)
+            new_rows = pd.concat([new_rows, pd.DataFrame(rows, index=new_bars.index)], axis=1)
+            history = self.frame.loc[data.index[0]:committed_last]
+            self.frame = compact_frame(pd.concat([history, new_rows[self.frame.columns]]),
+                                       FLAG_COLUMNS, enabled=self.compact)
+            self.frame.attrs = dict(data.attrs)  # Keep the symbol/interval tags for fingerprinting
+            return self.frame
+
+    def _continues(self, data):
+        """Check whether data extends the stored frame without rewriting committed history"""
+        if self.frame is None or len(self.frame) < 2 or list(data.columns) != list(self.frame.columns[:len(data.columns)]):
+            return False
+        if data.index[0] != self.frame.index[0]:
+            return False
+        committed_last = self.frame.index[-2]
+        if committed_last not in data.index or data.index[-1] < self.frame.index[-1]:
+            return False
+        if len(data.loc[committed_last:]) - 1 > self.max_incremental_bars:
+            return False
+        stored = self.frame.loc[committed_last, ['Open', 'High', 'Low', 'Close', 'Volume']]
+        fresh = data.loc[committed_last, ['Open', 'High', 'Low', 'Close', 'Volume']]
+        return np.allclose(stored.to_numpy(dtype=float), fresh.to_numpy(dtype=float), equal_nan=True)
+
+    def _rebuild(self, data):
+        """Batch-compute the whole frame and reseed the streaming state"""
+        self.indicators = StreamingIndicators()
+        if len(data) < 2:
+            self.frame = self.indicators.warm_up(data)
+            return self.frame
+
+        self.frame = self.indicators.warm_up(data.iloc[:-1])
+        last = data.iloc[[-1]].replace([np.inf, -np.inf], np.nan)
+        last_row = pd.DataFrame([self.indicators.peek(data.iloc[-1])], index=data.index[-1:])
+        self.frame = compact_frame(pd.concat([self.frame, pd.concat([last, last_row], axis=1)[self.frame.columns]]),
+                                   FLAG_COLUMNS, enabled=self.compact)
+        self.frame.attrs = dict(data.attrs)
+        return self.frame
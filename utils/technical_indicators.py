@@ -1,11 +1,169 @@
+import hashlib
+import re
+from collections import ChainMap
+
 import pandas as pd
 import numpy as np
 
+from utils.indicator_kernels import (resolve_backend, rolling_mad, rolling_max, rolling_min, rolling_mean, rolling_std,
+                                     ewm_mean, true_range, wilder_smooth, rolling_mean_windows, rolling_std_windows,
+                                     ewm_mean_windows, lag_windows)
+from utils.cache import LRUCache, frame_fingerprint
+from utils.frame_schema import snapshot
+from config.settings import TECHNICAL_INDICATORS, CACHE_CONFIG
+
+# Columns produced by add_all_indicators, in output order
+INDICATOR_COLUMNS = [
+    'SMA_20', 'SMA_50', 'EMA_20', 'RSI', 'MACD', 'MACD_Signal', 'MACD_Histogram',
+    'BB_Upper', 'BB_Lower', 'BB_Middle', 'Stoch_K', 'Stoch_D', 'Williams_R', 'ATR',
+    'OBV', 'VWAP', 'Volatility', 'Momentum', 'ROC', 'CCI',
+    'Price_Above_SMA20', 'Price_Above_SMA50', 'SMA20_Above_SMA50', 'BB_Position',
+    'RSI_Overbought', 'RSI_Oversold', 'Volume_SMA', 'Volume_Ratio'
+]
+
+# Flag columns are integers in the output
+FLAG_COLUMNS = ['Price_Above_SMA20', 'Price_Above_SMA50', 'SMA20_Above_SMA50',
+                'RSI_Overbought', 'RSI_Oversold']
+
+
+PANEL_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Derived frames keyed by the content of their input, shared by every TechnicalIndicators
+INDICATOR_MEMO = LRUCache(max_bytes=CACHE_CONFIG['indicator_memo']['max_bytes'],
+                          max_entries=CACHE_CONFIG['indicator_memo']['max_entries'],
+                          name='indicator_memo')
+
+
+def _like(template, values):
+    """Wrap a kernel result with the labels of the Series/DataFrame it was computed from"""
+    if isinstance(template, pd.DataFrame):
+        return pd.DataFrame(values, index=template.index, columns=template.columns)
+    return pd.Series(values, index=template.index)
+
+
+def _finite_frame(frame):
+    """Map +-inf to NaN like add_indicators, without copying frames that have none"""
+    values = frame.to_numpy()
+    if values.dtype.kind == 'f' and np.isinf(values).any():
+        return frame.mask(np.isinf(values))
+    return frame
+
+
+def to_panel(data, symbols=None):
+    """Align OHLCV data for many symbols into {field: DataFrame(time x symbols)}.
+    
+    Accepts a {symbol: OHLCV DataFrame} mapping (as DataFetcher.get_many
+    returns), a DataFrame with (field, symbol) or (symbol, field) MultiIndex
+    columns (as yfinance downloads), or a {field: 2-D array or wide DataFrame}
+    mapping. Symbols are aligned on the union of their timestamps; bars a
+    symbol does not have are NaN.
+    """
+    if isinstance(data, pd.DataFrame):
+        if not isinstance(data.columns, pd.MultiIndex):
+            raise ValueError("Panel DataFrames need (field, symbol) MultiIndex columns")
+        field_level = 0 if set(data.columns.get_level_values(0)) & set(PANEL_FIELDS) else 1
+        return {field: data.xs(field, axis=1, level=field_level).astype(float)
+                for field in PANEL_FIELDS if field in data.columns.get_level_values(field_level)}
+    
+    if not data:
+        return {}
+    
+    first = next(iter(data.values()))
+    if isinstance(first, np.ndarray):
+        # Raw (time x symbols) arrays
+        return {field: pd.DataFrame(np.asarray(values, dtype=float), columns=symbols)
+                for field, values in data.items()}
+    if all(key in PANEL_FIELDS for key in data):
+        return {field: frame.astype(float) for field, frame in data.items()}
+    
+    # {symbol: OHLCV frame}
+    frames = {symbol: frame for symbol, frame in data.items() if frame is not None and not frame.empty}
+    if not frames:
+        return {}
+    combined = pd.concat({symbol: frame[[f for f in PANEL_FIELDS if f in frame.columns]]
+                          for symbol, frame in frames.items()}, axis=1).sort_index()
+    return {field: combined.xs(field, axis=1, level=1).astype(float)
+            for field in PANEL_FIELDS if field in combined.columns.get_level_values(1)}
+
+
+class IndicatorSpec:
+    """One node of the indicator graph: the columns it reads and how to compute it"""
+    
+    def __init__(self, inputs, compute):
+        self.inputs = list(inputs)
+        self.compute = compute
+
 class TechnicalIndicators:
     """Technical indicators calculator for stock analysis"""
     
-    def __init__(self):
-        pass
+    def __init__(self, backend=None):
+        # Kernel backend for the rolling primitives (see TECHNICAL_INDICATORS['kernel_backend'])
+        self.backend = resolve_backend(backend)
+        self.registry = self._build_registry()
+        # Parameters that change the output, part of every memo key
+        self.params_key = hashlib.blake2b(repr((self.backend, sorted(TECHNICAL_INDICATORS.items()))).encode(),
+                                          digest_size=8).hexdigest()
+    
+    def _memoized(self, kind, data, compute, columns=None):
+        """compute() cached by the content of data; hits share the cached frame's data.
+        
+        Callers get a shallow copy, so adding or replacing columns is safe;
+        writing into existing values in place would change the shared entry.
+        """
+        key = f"{kind}:{self.params_key}:{frame_fingerprint(data, columns)}"
+        result = INDICATOR_MEMO.get(key)
+        if result is None:
+            result = compute()
+            INDICATOR_MEMO.set(key, result)
+        return result.copy(deep=False)
+    
+    def _kernel(self, kernel, series, *args):
+        """Run an array kernel over a Series (or a time x symbols panel frame) and keep its labels"""
+        return _like(series, kernel(series.to_numpy(dtype=float), *args, backend=self.backend))
+    
+    def _panel_kernels(self, frame):
+        """Time x symbols frames use whole-array kernels instead of pandas' per-column loops"""
+        return isinstance(frame, pd.DataFrame) and self.backend != 'pandas'
+    
+    def _rolling_mean(self, series, window):
+        if self._panel_kernels(series):
+            return self._kernel(rolling_mean, series, window)
+        return series.rolling(window=window).mean()
+    
+    def _rolling_std(self, series, window):
+        if self._panel_kernels(series):
+            return self._kernel(rolling_std, series, window)
+        return series.rolling(window=window).std()
+    
+    def _ewm_mean(self, series, span):
+        if self._panel_kernels(series):
+            return self._kernel(ewm_mean, series, span)
+        return series.ewm(span=span).mean()
+    
+    def _rolling_max(self, series, window):
+        if self.backend == 'pandas':
+            return series.rolling(window=window).max()
+        return self._kernel(rolling_max, series, window)
+    
+    def _rolling_min(self, series, window):
+        if self.backend == 'pandas':
+            return series.rolling(window=window).min()
+        return self._kernel(rolling_min, series, window)
+    
+    def _smooth(self, series, window, smoothing):
+        """Simple rolling mean (default) or Wilder's smoothing"""
+        if smoothing == 'wilder':
+            if self.backend == 'pandas':
+                seeded = series.copy()
+                first = seeded.first_valid_index()
+                if first is None:
+                    return seeded
+                start = seeded.index.get_loc(first)
+                seeded.iloc[:start + window - 1] = np.nan
+                seeded.iloc[start + window - 1] = series.iloc[start:start + window].mean()
+                return seeded.ewm(alpha=1 / window, adjust=False).mean()
+            return self._kernel(wilder_smooth, series, window)
+        return self._rolling_mean(series, window)
     
     def check_data_sufficiency(self, data, min_periods=50):
         """Check if data has sufficient periods for meaningful technical analysis"""
@@ -19,17 +177,17 @@ class TechnicalIndicators:
     
     def calculate_sma(self, data, window=20):
         """Calculate Simple Moving Average"""
-        return data['Close'].rolling(window=window).mean()
+        return self._rolling_mean(data['Close'], window)
     
     def calculate_ema(self, data, window=20):
         """Calculate Exponential Moving Average"""
-        return data['Close'].ewm(span=window).mean()
+        return self._ewm_mean(data['Close'], window)
     
-    def calculate_rsi(self, data, window=14):
-        """Calculate Relative Strength Index"""
+    def calculate_rsi(self, data, window=14, smoothing='sma'):
+        """Calculate Relative Strength Index (smoothing='wilder' for Wilder's RSI)"""
         delta = data['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
+        gain = self._smooth(delta.where(delta > 0, 0), window, smoothing)
+        loss = self._smooth(-delta.where(delta < 0, 0), window, smoothing)
         rs = gain / loss
         rsi = 100 - (100 / (1 + rs))
         return rsi
@@ -39,42 +197,92 @@ class TechnicalIndicators:
         ema_fast = self.calculate_ema(data, fast)
         ema_slow = self.calculate_ema(data, slow)
         macd = ema_fast - ema_slow
-        macd_signal = macd.ewm(span=signal).mean()
+        macd_signal = self._ewm_mean(macd, signal)
         macd_histogram = macd - macd_signal
         return macd, macd_signal, macd_histogram
     
     def calculate_bollinger_bands(self, data, window=20, num_std=2):
         """Calculate Bollinger Bands"""
         sma = self.calculate_sma(data, window)
-        std = data['Close'].rolling(window=window).std()
+        std = self._rolling_std(data['Close'], window)
         upper_band = sma + (std * num_std)
         lower_band = sma - (std * num_std)
         return upper_band, lower_band, sma
     
     def calculate_stochastic(self, data, k_window=14, d_window=3):
         """Calculate Stochastic Oscillator"""
-        low_min = data['Low'].rolling(window=k_window).min()
-        high_max = data['High'].rolling(window=k_window).max()
+        low_min = self._rolling_min(data['Low'], k_window)
+        high_max = self._rolling_max(data['High'], k_window)
         k_percent = 100 * ((data['Close'] - low_min) / (high_max - low_min))
-        d_percent = k_percent.rolling(window=d_window).mean()
+        d_percent = self._rolling_mean(k_percent, d_window)
         return k_percent, d_percent
     
     def calculate_williams_r(self, data, window=14):
         """Calculate Williams %R"""
-        high_max = data['High'].rolling(window=window).max()
-        low_min = data['Low'].rolling(window=window).min()
+        high_max = self._rolling_max(data['High'], window)
+        low_min = self._rolling_min(data['Low'], window)
         williams_r = -100 * ((high_max - data['Close']) / (high_max - low_min))
         return williams_r
     
-    def calculate_atr(self, data, window=14):
-        """Calculate Average True Range"""
-        high_low = data['High'] - data['Low']
-        high_close = np.abs(data['High'] - data['Close'].shift())
-        low_close = np.abs(data['Low'] - data['Close'].shift())
-        true_range = np.maximum(high_low, np.maximum(high_close, low_close))
-        atr = true_range.rolling(window=window).mean()
+    def calculate_atr(self, data, window=14, smoothing='sma'):
+        """Calculate Average True Range (smoothing='wilder' for Wilder's ATR)"""
+        if self.backend == 'pandas':
+            high_low = data['High'] - data['Low']
+            high_close = np.abs(data['High'] - data['Close'].shift())
+            low_close = np.abs(data['Low'] - data['Close'].shift())
+            tr = np.maximum(high_low, np.maximum(high_close, low_close))
+        else:
+            tr = _like(data['Close'], true_range(data['High'].to_numpy(dtype=float), data['Low'].to_numpy(dtype=float),
+                                                 data['Close'].to_numpy(dtype=float), backend=self.backend))
+        atr = self._smooth(tr, window, smoothing)
         return atr
     
+    def _window_block(self, series, kernel, windows):
+        """Run a multi-window kernel and label its columns with the windows"""
+        windows = list(windows)
+        return pd.DataFrame(kernel(series.to_numpy(dtype=float), windows, backend=self.backend),
+                            index=series.index, columns=windows)
+    
+    def calculate_sma_windows(self, data, windows, column='Close'):
+        """Simple moving averages for several windows at once (one column per window)"""
+        def compute():
+            if self.backend == 'pandas':
+                return pd.DataFrame({w: data[column].rolling(window=w).mean() for w in windows}, index=data.index)
+            return self._window_block(data[column], rolling_mean_windows, windows)
+        return self._memoized(f"sma:{list(windows)}", data, compute, [column])
+    
+    def calculate_ema_windows(self, data, windows, column='Close'):
+        """Exponential moving averages for several spans at once"""
+        def compute():
+            if self.backend == 'pandas':
+                return pd.DataFrame({w: data[column].ewm(span=w).mean() for w in windows}, index=data.index)
+            return self._window_block(data[column], ewm_mean_windows, windows)
+        return self._memoized(f"ema:{list(windows)}", data, compute, [column])
+    
+    def calculate_std_windows(self, data, windows, column='Close'):
+        """Rolling standard deviations for several windows at once"""
+        def compute():
+            if self.backend == 'pandas':
+                return pd.DataFrame({w: data[column].rolling(window=w).std() for w in windows}, index=data.index)
+            return self._window_block(data[column], rolling_std_windows, windows)
+        return self._memoized(f"std:{list(windows)}", data, compute, [column])
+    
+    def calculate_lags(self, data, lags, column='Close'):
+        """The column shifted by each lag at once"""
+        if self.backend == 'pandas':
+            return pd.DataFrame({lag: data[column].shift(lag) for lag in lags}, index=data.index)
+        return self._window_block(data[column], lag_windows, lags)
+    
+    def calculate_momentum_windows(self, data, windows, column='Close'):
+        """Price momentum for several windows at once"""
+        lagged = self.calculate_lags(data, windows, column)
+        return lagged.rsub(data[column], axis=0)
+    
+    def calculate_roc_windows(self, data, windows, column='Close'):
+        """Rate of Change for several windows at once"""
+        lagged = self.calculate_lags(data, windows, column)
+        return lagged.rsub(data[column], axis=0).div(lagged) * 100
+    
     def calculate_obv(self, data):
         """Calculate On-Balance Volume"""
         obv = (np.sign(data['Close'].diff()) * data['Volume']).fillna(0).cumsum()
@@ -89,7 +297,7 @@ class TechnicalIndicators:
     def calculate_volatility(self, data, window=20):
         """Calculate price volatility (standard deviation of returns)"""
         returns = data['Close'].pct_change()
-        volatility = returns.rolling(window=window).std()
+        volatility = self._rolling_std(returns, window)
         return volatility
     
     def calculate_momentum(self, data, window=10):
@@ -105,93 +313,158 @@ class TechnicalIndicators:
     def calculate_cci(self, data, window=20):
         """Calculate Commodity Channel Index"""
         typical_price = (data['High'] + data['Low'] + data['Close']) / 3
-        sma_tp = typical_price.rolling(window=window).mean()
-        mad = typical_price.rolling(window=window).apply(lambda x: np.mean(np.abs(x - x.mean())))
+        sma_tp = self._rolling_mean(typical_price, window)
+        if self.backend == 'pandas':
+            mad = typical_price.rolling(window=window).apply(lambda x: np.mean(np.abs(x - x.mean())))
+        else:
+            mad = self._kernel(rolling_mad, typical_price, window)
         cci = (typical_price - sma_tp) / (0.015 * mad)
         return cci
     
-    def add_all_indicators(self, data):
-        """Add all technical indicators to the dataframe"""
-        df = data.copy()
+    def _build_registry(self):
+        """Indicator graph: each column with its inputs, parameters from TECHNICAL_INDICATORS.
         
-        # Check data sufficiency
-        is_sufficient, message = self.check_data_sufficiency(data, min_periods=20)
-        if not is_sufficient:
-            print(f"Warning: {message}. Some indicators may not be reliable.")
+        Every column is computed by its calculate_* method, which reads the
+        values mapping like a frame, so single frames and (time x symbols)
+        panels go through the same code. Methods returning several series
+        are evaluated once into a tuple intermediate.
+        """
+        p = TECHNICAL_INDICATORS
+        bb, k, wr = p['bollinger_period'], p['stochastic_k'], p['williams_r_period']
+        ohlc = ['High', 'Low', 'Close']
         
-        try:
-            # Moving Averages
-            df['SMA_20'] = self.calculate_sma(df, 20)
-            df['SMA_50'] = self.calculate_sma(df, 50)
-            df['EMA_20'] = self.calculate_ema(df, 20)
-            
-            # RSI
-            df['RSI'] = self.calculate_rsi(df)
-            
-            # MACD
-            macd, macd_signal, macd_histogram = self.calculate_macd(df)
-            df['MACD'] = macd
-            df['MACD_Signal'] = macd_signal
-            df['MACD_Histogram'] = macd_histogram
-            
-            # Bollinger Bands
-            bb_upper, bb_lower, bb_middle = self.calculate_bollinger_bands(df)
-            df['BB_Upper'] = bb_upper
-            df['BB_Lower'] = bb_lower
-            df['BB_Middle'] = bb_middle
-            
-            # Stochastic
-            stoch_k, stoch_d = self.calculate_stochastic(df)
-            df['Stoch_K'] = stoch_k
-            df['Stoch_D'] = stoch_d
-            
-            # Williams %R
-            df['Williams_R'] = self.calculate_williams_r(df)
-            
-            # ATR
-            df['ATR'] = self.calculate_atr(df)
-            
-            # OBV
-            df['OBV'] = self.calculate_obv(df)
-            
-            # VWAP
-            df['VWAP'] = self.calculate_vwap(df)
-            
-            # Volatility
-            df['Volatility'] = self.calculate_volatility(df)
-            
-            # Momentum
-            df['Momentum'] = self.calculate_momentum(df)
-            
-            # Rate of Change
-            df['ROC'] = self.calculate_roc(df)
-            
-            # CCI
-            df['CCI'] = self.calculate_cci(df)
-            
-            # Additional derived indicators
-            df['Price_Above_SMA20'] = (df['Close'] > df['SMA_20']).astype(int)
-            df['Price_Above_SMA50'] = (df['Close'] > df['SMA_50']).astype(int)
-            df['SMA20_Above_SMA50'] = (df['SMA_20'] > df['SMA_50']).astype(int)
-            
-            # Bollinger Band position
-            df['BB_Position'] = (df['Close'] - df['BB_Lower']) / (df['BB_Upper'] - df['BB_Lower'])
+        # Intermediates (leading underscore) are shared between columns but never written out
+        return {
+            '_MACD': IndicatorSpec(['Close'], lambda v: self.calculate_macd(
+                v, p['macd_fast'], p['macd_slow'], p['macd_signal'])),
+            '_Bollinger': IndicatorSpec(['Close'], lambda v: self.calculate_bollinger_bands(
+                v, bb, p['bollinger_std'])),
+            '_Stochastic': IndicatorSpec(ohlc, lambda v: self.calculate_stochastic(v, k, p['stochastic_d'])),
             
-            # RSI signals
-            df['RSI_Overbought'] = (df['RSI'] > 70).astype(int)
-            df['RSI_Oversold'] = (df['RSI'] < 30).astype(int)
+            'RSI': IndicatorSpec(['Close'], lambda v: self.calculate_rsi(v, p['rsi_period'])),
+            'MACD': IndicatorSpec(['_MACD'], lambda v: v['_MACD'][0]),
+            'MACD_Signal': IndicatorSpec(['_MACD'], lambda v: v['_MACD'][1]),
+            'MACD_Histogram': IndicatorSpec(['_MACD'], lambda v: v['_MACD'][2]),
+            'BB_Upper': IndicatorSpec(['_Bollinger'], lambda v: v['_Bollinger'][0]),
+            'BB_Lower': IndicatorSpec(['_Bollinger'], lambda v: v['_Bollinger'][1]),
+            'BB_Middle': IndicatorSpec(['_Bollinger'], lambda v: v['_Bollinger'][2]),
+            'Stoch_K': IndicatorSpec(['_Stochastic'], lambda v: v['_Stochastic'][0]),
+            'Stoch_D': IndicatorSpec(['_Stochastic'], lambda v: v['_Stochastic'][1]),
+            'Williams_R': IndicatorSpec(ohlc, lambda v: self.calculate_williams_r(v, wr)),
+            'ATR': IndicatorSpec(ohlc, lambda v: self.calculate_atr(v, p['atr_period'])),
+            'OBV': IndicatorSpec(['Close', 'Volume'], self.calculate_obv),
+            'VWAP': IndicatorSpec(ohlc + ['Volume'], self.calculate_vwap),
+            'Volatility': IndicatorSpec(['Close'], lambda v: self.calculate_volatility(v, p['volatility_period'])),
+            'Momentum': IndicatorSpec(['Close'], lambda v: self.calculate_momentum(v, p['momentum_period'])),
+            'ROC': IndicatorSpec(['Close'], lambda v: self.calculate_roc(v, p['roc_period'])),
+            'CCI': IndicatorSpec(ohlc, lambda v: self.calculate_cci(v, p['cci_period'])),
             
-            # Volume analysis
-            df['Volume_SMA'] = df['Volume'].rolling(window=20).mean()
-            df['Volume_Ratio'] = df['Volume'] / df['Volume_SMA']
+            # Derived signals
+            'Price_Above_SMA20': IndicatorSpec(['Close', 'SMA_20'], lambda v: (v['Close'] > v['SMA_20']).astype(np.int8)),
+            'Price_Above_SMA50': IndicatorSpec(['Close', 'SMA_50'], lambda v: (v['Close'] > v['SMA_50']).astype(np.int8)),
+            'SMA20_Above_SMA50': IndicatorSpec(['SMA_20', 'SMA_50'], lambda v: (v['SMA_20'] > v['SMA_50']).astype(np.int8)),
+            'BB_Position': IndicatorSpec(['Close', 'BB_Upper', 'BB_Lower'], lambda v: (
+                v['Close'] - v['BB_Lower']) / (v['BB_Upper'] - v['BB_Lower'])),
+            'RSI_Overbought': IndicatorSpec(['RSI'], lambda v: (v['RSI'] > 70).astype(np.int8)),
+            'RSI_Oversold': IndicatorSpec(['RSI'], lambda v: (v['RSI'] < 30).astype(np.int8)),
+            'Volume_SMA': IndicatorSpec(['Volume'], lambda v: self._rolling_mean(v['Volume'], p['volume_sma_period'])),
+            'Volume_Ratio': IndicatorSpec(['Volume', 'Volume_SMA'], lambda v: v['Volume'] / v['Volume_SMA'])
+        }
+    
+    def _spec(self, name):
+        """Registry entry for a column; SMA_<n> and EMA_<n> exist for any window"""
+        if name in self.registry:
+            return self.registry[name]
+        match = re.fullmatch(r'(SMA|EMA)_(\d+)', name)
+        if match is None:
+            return None
+        window = int(match.group(2))
+        if match.group(1) == 'SMA':
+            return IndicatorSpec(['Close'], lambda v: self.calculate_sma(v, window))
+        return IndicatorSpec(['Close'], lambda v: self.calculate_ema(v, window))
+    
+    def resolve(self, columns):
+        """Requested columns plus everything they depend on, inputs before the columns that use them"""
+        order, seen = [], set()
+        
+        def visit(name):
+            if name in seen:
+                return
+            seen.add(name)
+            spec = self._spec(name)
+            if spec is None:
+                return  # Raw OHLCV input
+            for dependency in spec.inputs:
+                visit(dependency)
+            order.append(name)
+        
+        for column in columns:
+            visit(column)
+        return order
+    
+    def _evaluate(self, values, columns):
+        """Compute the subgraph behind `columns` into values.maps[0]; inputs come from values.maps[1]"""
+        for column in columns:
+            if self._spec(column) is None and column not in values:
+                print(f"Unknown technical indicator: {column}")
+        
+        for name in self.resolve(columns):
+            spec = self._spec(name)
+            if any(dependency not in values for dependency in spec.inputs):
+                continue  # An input failed or is missing from the data
+            try:
+                values[name] = spec.compute(values)
+            except Exception as e:
+                print(f"Error calculating {name}: {str(e)}")
+        
+        computed = values.maps[0]
+        return {column: computed[column] for column in columns if column in computed}
+    
+    def add_indicators(self, data, columns):
+        """Add only the requested indicator columns, computing each shared intermediate once.
+        
+        Results are memoized by the content of `data`, so charts, models and
+        analytics asking for the same indicators on the same bars share one
+        computation (see _memoized for what callers may modify).
+        """
+        columns = list(columns)
+        
+        def compute():
+            df = snapshot(data)
+            for column, values in self._evaluate(ChainMap({}, df), columns).items():
+                df[column] = values
             
-        except Exception as e:
-            print(f"Error calculating technical indicators: {str(e)}")
+            # Clean up any infinity or NaN values
+            return df.replace([np.inf, -np.inf], np.nan)
         
-        # Clean up any infinity or NaN values
-        df = df.replace([np.inf, -np.inf], np.nan)
+        return self._memoized(f"indicators:{columns}", data, compute)
+    
+    def add_panel_indicators(self, data, columns=None):
+        """Compute indicators for many symbols at once.
+        
+        `data` is anything to_panel accepts. Every indicator is evaluated on
+        whole (time x symbols) frames, so the cost is a handful of array
+        operations per column rather than a Python loop over symbols. Returns
+        {column: DataFrame indexed by time with one column per symbol}.
+        Symbols trading on the same calendar get exactly the values
+        add_indicators gives them one at a time; rolling windows of a symbol
+        with missing bars span those NaN rows.
+        """
+        panel = to_panel(data)
+        if not panel:
+            return {}
+        columns = list(columns or INDICATOR_COLUMNS)
+        results = self._evaluate(ChainMap({}, panel), columns)
+        return {column: _finite_frame(frame) for column, frame in results.items()}
+    
+    def add_all_indicators(self, data):
+        """Add all technical indicators to the dataframe"""
+        # Check data sufficiency
+        is_sufficient, message = self.check_data_sufficiency(data, min_periods=20)
+        if not is_sufficient:
+            print(f"Warning: {message}. Some indicators may not be reliable.")
         
-        return df
+        return self.add_indicators(data, INDICATOR_COLUMNS)
     
     def get_trading_signals(self, data):
         """Generate trading signals based on technical indicators"""
@@ -0,0 +1,130 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.prediction_orchestrator import init_worker
+from config.settings import PREDICTION_CONFIG
+
+TRAINING_CONFIG = PREDICTION_CONFIG['background_training']
+
+ACTIVE = ('queued', 'running')
+
+
+def _train_in_worker(model_name, data):
+    """Train and register a model in a worker process -> seconds taken"""
+    from utils.engine import get_engine
+
+    start = time.perf_counter()
+    if not get_engine().train(model_name, data):
+        raise RuntimeError(f"{model_name} did not train (library unavailable or not enough data)")
+    return time.perf_counter() - start
+
+
+class TrainingQueue:
+    """Trains per-symbol models in background worker processes.
+
+    A (model, symbol, interval) that is cold, or that new bars have left
+    behind, gets one job, however many requests ask for it while it is
+    queued or running. Workers bring the model up to date with
+    StockTrendEngine.train and write it to the shared model registry; when
+    a job finishes the engine picks the new model up on its next
+    prediction. Until then cold models are served the predictor's fallback
+    and stale ones their previous model. A failed job is not retried for
+    ``retry_after`` seconds.
+    """
+
+    def __init__(self, engine, max_workers=None, enabled=None, retry_after=None):
+        self.engine = engine
+        self.enabled = TRAINING_CONFIG['enabled'] if enabled is None else enabled
+        self.max_workers = max_workers or TRAINING_CONFIG['max_workers']
+        self.retry_after = TRAINING_CONFIG['retry_after'] if retry_after is None else retry_after
+        self.jobs = {}  # (model, symbol, interval) -> job record
+        self.generation = 0  # Bumped whenever a job trains a model, so callers know to re-predict
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        if self._pool is None:
+            context = multiprocessing.get_context(PREDICTION_CONFIG['parallel']['start_method'])
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context,
+                                             initializer=init_worker,
+                                             initargs=(self.engine.model_registry.root,))
+        return self._pool
+
+    def submit(self, model_name, data):
+        """Make sure a model for the frame's symbol is training.
+
+        Returns False when the caller should train synchronously instead
+        (queue disabled, or the frame does not say which symbol it holds).
+        """
+        symbol, interval = data.attrs.get('symbol'), data.attrs.get('interval')
+        if not self.enabled or not symbol or not interval or data.empty:
+            return False
+
+        key = (model_name, symbol, interval)
+        with self._lock:
+            job = self.jobs.get(key)
+            if job is not None:
+                if job['status'] in ACTIVE:
+                    return True
+                if job['status'] == 'failed' and time.time() - job['finished'] < self.retry_after:
+                    return True
+
+            job = {'model': model_name, 'symbol': symbol, 'interval': interval, 'status': 'queued',
+                   'rows': len(data), 'submitted': time.time(), 'finished': None, 'seconds': None,
+                   'error': None}
+            try:
+                future = self._get_pool().submit(_train_in_worker, model_name, data)
+            except Exception as e:
+                print(f"Could not queue {model_name} training for {symbol}: {str(e)}")
+                self._pool = None
+                return False
+            job['future'] = future
+            self.jobs[key] = job
+        future.add_done_callback(lambda done: self._finished(key, job, done))
+        return True
+
+    def _finished(self, key, job, future):
+        """Record a finished job and hot-swap the trained model in"""
+        try:
+            seconds, error = future.result(), None
+            # Swap the model in before the job reads as done, so no request sees neither
+            self.engine.model_trained(*key)
+        except BrokenProcessPool as e:
+            seconds, error = None, f"training worker crashed: {str(e)}"
+            with self._lock:
+                self._pool = None  # The next job starts a fresh pool
+        except Exception as e:
+            seconds, error = None, str(e) or type(e).__name__
+
+        if error:
+            print(f"Background training of {key[0]} for {key[1]} failed: {error}")
+        with self._lock:
+            job.update(status='failed' if error else 'done', error=error, seconds=seconds, finished=time.time())
+            if not error:
+                self.generation += 1
+
+    def status(self):
+        """Job records, newest first, for display"""
+        with self._lock:
+            jobs = list(self.jobs.values())
+        records = []
+        for job in sorted(jobs, key=lambda job: job['submitted'], reverse=True):
+            record = {name: value for name, value in job.items() if name != 'future'}
+            if record['status'] == 'queued' and job['future'].running():
+                record['status'] = 'running'
+            records.append(record)
+        return records
+
+    def active(self):
+        """Number of jobs queued or running"""
+        return sum(1 for job in self.status() if job['status'] in ACTIVE)
+
+    def shutdown(self):
+        """Stop the worker processes (running jobs are abandoned)"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)